@@ -0,0 +1,301 @@
+# scripts/async_runner.py
+# Drive Prompts/prompt_variations.csv through a model backend instead of saving UI outputs by hand
+# - Fans out (model x condition x run) jobs over asyncio workers, at most MAX_CONCURRENCY in flight
+# - Retries rate limits and transient errors with exponential backoff + jitter; a 429 pauses every
+#   worker until its Retry-After has passed
+# - Checkpoint/resume: each finished job is committed to the same SQLite store run_experiment.py
+#   uses (Results/ingest_manifest.sqlite), so an interrupted run picks up where it stopped
+# - Rows use the structured log schema and are exported to Results/llm_outputs_structured.csv
+# - Pluggable backend: "stub" (offline, deterministic) or "http" (OpenAI-compatible chat endpoint,
+#   e.g. a local mock server)
+# - Answers are also kept in the content-addressed cache (scripts/response_store.py), keyed by
+#   model, prompt text and parameters, so a repeated request is served from there
+
+from __future__ import annotations
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import urllib.error
+import urllib.request
+import pandas as pd
+
+from run_experiment import (LOG_COLUMNS, MANIFEST_DB, OUT_CSV, OUT_DIR, PROMPTS_CSV, RUN_KEY_PREFIX,
+                            drop_stale_runs, export_csv, open_store, prompt_signature, read_csv_relaxed,
+                            sha1_text)
+from response_store import CACHE_DB, ResponseStore, request_key
+
+# ----- Experiment settings -----------------------------------------------------
+BACKEND = "stub"  # "stub" or "http"
+MODELS = ["stub-model"]
+RUNS_PER_CONDITION = 3
+TEMPERATURE = 0.7
+USE_CACHE = True  # reuse cached answers for identical requests (same model, prompt, temperature, seed)
+
+# ----- Execution settings ------------------------------------------------------
+MAX_CONCURRENCY = 8  # requests in flight at once
+MAX_RETRIES = 5  # attempts after the first one
+BACKOFF_BASE = 1.0  # seconds; doubled per attempt
+BACKOFF_MAX = 60.0
+REQUEST_TIMEOUT = 120.0  # seconds per HTTP request
+
+# ----- HTTP backend ----------------------------------------------------------------
+HTTP_URL = os.environ.get("LLM_API_URL", "http://localhost:8000/v1/chat/completions")
+HTTP_KEY_ENV = "LLM_API_KEY"  # sent as a bearer token when set
+
+# ----- Backends ----------------------------------------------------------------
+class RateLimited(Exception):
+    """The backend asked us to slow down; retry_after is in seconds (None if not given)."""
+
+    def __init__(self, retry_after: float | None = None):
+        super().__init__(f"rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+class TransientError(Exception):
+    """A failure worth retrying (timeouts, 5xx, dropped connections)."""
+
+class StubBackend:
+    """
+    Offline stand-in: answers after a short delay with a reply built from
+    the prompt's own stats lines, deterministic per (model, prompt, run).
+    `fail_rate` injects rate limits to exercise the retry path.
+    """
+
+    version = "stub-1"
+
+    def __init__(self, latency: float = 0.01, fail_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.faults = random.Random(seed)
+
+    async def complete(self, model: str, prompt: str, temperature: float, seed: int = 0) -> tuple[str, str]:
+        await asyncio.sleep(self.latency)
+        if self.faults.random() < self.fail_rate:
+            raise RateLimited(retry_after=self.latency)
+        rng = random.Random(sha1_text(f"{model}|{prompt}|{seed}"))
+        lines = [ln.strip(" -") for ln in prompt.splitlines() if re.match(r"\s*-?\s*Player \w+", ln)]
+        if not lines:
+            return "No player statistics were provided.", self.version
+        pick = rng.choice(lines)
+        player = re.match(r"Player \w+", pick).group(0)
+        return (f"{player} is the clearest choice. The data shows {pick}, which supports this "
+                f"recommendation (stub reply, temperature {temperature})."), self.version
+
+class HttpBackend:
+    """OpenAI-compatible chat completions over HTTP (stdlib only; requests run in worker threads)."""
+
+    def __init__(self, url: str = HTTP_URL, timeout: float = REQUEST_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.api_key = os.environ.get(HTTP_KEY_ENV)
+
+    def _post(self, payload: dict) -> dict:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        req = urllib.request.Request(self.url, data=json.dumps(payload).encode("utf-8"), headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.load(resp)
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                retry_after = e.headers.get("Retry-After")
+                raise RateLimited(float(retry_after) if retry_after and retry_after.isdigit() else None)
+            if e.code >= 500:
+                raise TransientError(f"HTTP {e.code}")
+            raise
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise TransientError(str(e))
+
+    async def complete(self, model: str, prompt: str, temperature: float, seed: int = 0) -> tuple[str, str]:
+        payload = {"model": model, "messages": [{"role": "user", "content": prompt}],
+                   "temperature": temperature, "seed": seed}
+        body = await asyncio.to_thread(self._post, payload)
+        return body["choices"][0]["message"]["content"], body.get("model", model)
+
+BACKENDS = {"stub": StubBackend, "http": HttpBackend}
+
+# ----- Jobs --------------------------------------------------------------------
+def job_key(model: str, prompt_id: str, run: int, digest: str) -> str:
+    """
+    Store key of one job; ends in the prompt hash (see prompt_signature()) so
+    an edited prompt counts as a new job and drop_stale_runs() can spot the
+    old one's rows.
+    """
+    return f"{RUN_KEY_PREFIX}{model}/{prompt_id}/run{run}/{digest}"
+
+def build_jobs(prompts: pd.DataFrame, models: list[str], runs: int) -> list[dict]:
+    jobs = []
+    for model in models:
+        for _, pr in prompts.iterrows():
+            condition = str(pr.get("condition", "")).strip().lower()
+            if not condition:
+                continue
+            prompt_text = str(pr.get("prompt_text", ""))
+            prompt_id = pr.get("prompt_id", f"{condition}_v1")
+            _, digest = prompt_signature(pr)
+            for run in range(1, runs + 1):
+                jobs.append({
+                    "key": job_key(model, prompt_id, run, digest),
+                    "model": model,
+                    "prompt_id": prompt_id,
+                    "hypothesis": pr.get("hypothesis", "unspecified"),
+                    "condition": condition,
+                    "prompt_text": prompt_text,
+                    "run": run,
+                })
+    return jobs
+
+def to_row(job: dict, response_text: str, model_version: str, temperature: float) -> dict:
+    """One structured-log row, same columns as the ingested UI outputs."""
+    return {
+        "file_name": f"{job['model']}_{job['condition']}_run{job['run']}",
+        "prompt_id": job["prompt_id"],
+        "hypothesis": job["hypothesis"],
+        "condition": job["condition"],
+        "model": job["model"],
+        "model_version": model_version,
+        "temperature": temperature,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "prompt_text": job["prompt_text"],
+        "response_text": response_text,
+        "run": str(job["run"]),
+        "char_len": len(response_text),
+        "word_count": len(response_text.split()),
+        "response_sha1": sha1_text(response_text),
+    }
+
+def save_row(con, key: str, row: dict) -> None:
+    con.execute("DELETE FROM responses WHERE path = ?", (key,))
+    con.execute(f"INSERT INTO responses VALUES (?, {', '.join('?' * len(LOG_COLUMNS))})",
+                [key] + [row[c] for c in LOG_COLUMNS])
+    con.commit()  # each finished job is a checkpoint
+
+# ----- Runner ------------------------------------------------------------------
+class Runner:
+    """
+    Bounded-concurrency job executor with shared rate-limit backoff. With a
+    ResponseStore, requests it already holds an answer for skip the backend.
+    """
+
+    def __init__(self, backend, con, concurrency: int = MAX_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX,
+                 temperature: float = TEMPERATURE, store: ResponseStore | None = None):
+        self.backend = backend
+        self.con = con
+        self.store = store
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.temperature = temperature
+        self.resume_at = 0.0  # loop time before which nobody sends (set by rate limits)
+        self.stats = {"done": 0, "failed": 0, "retries": 0, "cached": 0}
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _attempt(self, job: dict) -> tuple[str, str]:
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            wait = self.resume_at - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await self.backend.complete(job["model"], job["prompt_text"], self.temperature, seed=job["run"])
+            except RateLimited as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = e.retry_after if e.retry_after is not None else self._backoff(attempt)
+                # everyone waits, not just this worker
+                self.resume_at = max(self.resume_at, loop.time() + delay)
+            except TransientError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+            self.stats["retries"] += 1
+
+    def _request_key(self, job: dict) -> str:
+        params = {"backend": type(self.backend).__name__, "temperature": self.temperature, "seed": job["run"]}
+        return request_key(job["model"], job["prompt_text"], params)
+
+    async def _complete(self, job: dict) -> tuple[str, str]:
+        if self.store is None:
+            return await self._attempt(job)
+        key = self._request_key(job)
+        cached = self.store.get_request(key)
+        if cached is not None:
+            self.stats["cached"] += 1
+            return cached
+        text, version = await self._attempt(job)
+        self.store.put_request(key, text, version)
+        return text, version
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                text, version = await self._complete(job)
+                save_row(self.con, job["key"], to_row(job, text, version, self.temperature))
+                self.stats["done"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"Failed {job['key']}: {type(e).__name__}: {e}")
+            finally:
+                queue.task_done()
+
+    async def run(self, jobs: list[dict]) -> dict:
+        queue: asyncio.Queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(min(self.concurrency, len(jobs)))]
+        await queue.join()
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if self.store is not None:
+            self.store.flush()
+        return self.stats
+
+def pending_jobs(con, jobs: list[dict]) -> list[dict]:
+    """Jobs without a stored result yet (the resume point)."""
+    done = {k for (k,) in con.execute("SELECT path FROM responses WHERE path LIKE ?", (RUN_KEY_PREFIX + "%",))}
+    return [j for j in jobs if j["key"] not in done]
+
+# ----- Main -------------------------------------------------------------------
+if __name__ == "__main__":
+    if not PROMPTS_CSV.exists():
+        raise FileNotFoundError("Prompts/prompt_variations.csv not found. Run scripts/experiment_design.py first.")
+
+    prompts = read_csv_relaxed(PROMPTS_CSV)
+    if prompts.empty or "condition" not in prompts.columns:
+        raise ValueError("prompt_variations.csv has no 'condition' column or is empty.")
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    con = open_store(MANIFEST_DB)
+    jobs = build_jobs(prompts, MODELS, RUNS_PER_CONDITION)
+    stale = drop_stale_runs(con, prompts, {j["key"] for j in jobs})
+    con.commit()
+    if stale:
+        print(f"Dropped {stale} stored rows no current job would write (prompt, model or run changed).")
+    todo = pending_jobs(con, jobs)
+    print(f"{len(jobs)} jobs ({len(MODELS)} models, {RUNS_PER_CONDITION} runs per prompt): "
+          f"{len(jobs) - len(todo)} already done, {len(todo)} to run on '{BACKEND}'.")
+
+    if todo:
+        store = ResponseStore(CACHE_DB) if USE_CACHE else None
+        runner = Runner(BACKENDS[BACKEND](), con, store=store)
+        started = time.perf_counter()
+        stats = asyncio.run(runner.run(todo))
+        elapsed = time.perf_counter() - started
+        print(f"Finished {stats['done']} jobs ({stats['cached']} from cache), {stats['failed']} failed, "
+              f"{stats['retries']} retries in {elapsed:.1f}s ({stats['done'] / max(elapsed, 1e-9):.1f} jobs/s).")
+        if store is not None:
+            store.close()
+        if stats["failed"]:
+            print("Re-run to retry the failed jobs; finished ones are kept.")
+
+    written = export_csv(con, OUT_CSV)
+    print(f"✅ Wrote {OUT_CSV} with {written} rows.")
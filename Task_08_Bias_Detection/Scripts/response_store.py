@@ -0,0 +1,129 @@
+# scripts/response_store.py
+# Content-addressed cache shared by the experiment scripts (Results/response_cache.sqlite)
+# - responses:   sha1(response_text) -> text, stored once however many runs produced it
+# - requests:    hash(model, prompt_text, parameters) -> response sha1 + model version,
+#                so async_runner.py reuses an answer instead of asking the backend again
+# - validations: (response sha1, validator fingerprint) -> scores, so validate_claims.py
+#                only scores responses it has not seen under the current ground truth
+# - Size-bounded: entries carry their size and last use; evict() drops the least recently
+#   used ones once the total passes CACHE_MAX_BYTES
+
+from __future__ import annotations
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from run_experiment import sha1_text
+
+# ----- Paths tailored to your machine (consistent with other scripts) ----------
+BASE = Path(r"C:/Users/Karan/OneDrive/Desktop/RA_TASK_08")
+CACHE_DB = BASE / "Results" / "response_cache.sqlite"
+
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # stored text (responses + JSON) kept before evicting
+
+# ----- Keys --------------------------------------------------------------------
+def request_key(model: str, prompt_text: str, params: dict) -> str:
+    """Content address of a request: same model, prompt and parameters -> same key."""
+    return sha1_text(json.dumps([model, prompt_text, params], sort_keys=True, default=str))
+
+def fingerprint(*parts) -> str:
+    """Hash of whatever a cached result depends on (e.g. ground truth + validator settings)."""
+    return sha1_text(json.dumps(parts, sort_keys=True, default=str))
+
+# ----- Store -------------------------------------------------------------------
+class ResponseStore:
+    """
+    One SQLite table of (kind, key) -> value entries, kind being 'response',
+    'request' or 'validation'. Reads bump an entry's last-use stamp; writes
+    are committed by flush(), which also evicts down to max_bytes.
+    """
+
+    def __init__(self, db: Path = CACHE_DB, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.con = sqlite3.connect(db)
+        self.con.execute("""CREATE TABLE IF NOT EXISTS entries (
+            kind TEXT, key TEXT, value TEXT, size INTEGER, used INTEGER, PRIMARY KEY (kind, key))""")
+        self.con.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, kind: str, key: str) -> str | None:
+        row = self.con.execute("SELECT value FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.con.execute("UPDATE entries SET used = ? WHERE kind = ? AND key = ?", (time.time_ns(), kind, key))
+        return row[0]
+
+    def _put(self, kind: str, key: str, value: str) -> None:
+        self.con.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                         (kind, key, value, len(value.encode("utf-8", errors="ignore")), time.time_ns()))
+
+    # Responses, by content
+    def put_response(self, text: str) -> str:
+        digest = sha1_text(text)
+        self._put("response", digest, text)
+        return digest
+
+    def get_response(self, digest: str) -> str | None:
+        return self._get("response", digest)
+
+    # Requests -> responses
+    def put_request(self, key: str, text: str, model_version: str) -> str:
+        digest = self.put_response(text)
+        self._put("request", key, json.dumps({"sha1": digest, "model_version": model_version}))
+        return digest
+
+    def get_request(self, key: str) -> tuple[str, str] | None:
+        """(response_text, model_version) stored for a request key, or None (also when the text was evicted)."""
+        ref = self._get("request", key)
+        if ref is None:
+            return None
+        ref = json.loads(ref)
+        text = self._get("response", ref["sha1"])
+        if text is None:
+            self.hits -= 1  # the request hit is no use without its response
+            return None
+        return text, ref["model_version"]
+
+    # Validation results, by response sha1 under one validator fingerprint
+    def get_validations(self, digests: list[str], fp: str) -> dict[str, dict]:
+        found = {}
+        for d in digests:
+            value = self._get("validation", f"{fp}:{d}")
+            if value is not None:
+                found[d] = json.loads(value)
+        return found
+
+    def put_validations(self, results: dict[str, dict], fp: str) -> None:
+        for d, result in results.items():
+            self._put("validation", f"{fp}:{d}", json.dumps(result))
+
+    # Housekeeping
+    def size(self) -> int:
+        return self.con.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the store fits max_bytes; returns how many went."""
+        excess = self.size() - self.max_bytes
+        if excess <= 0:
+            return 0
+        doomed, freed = [], 0
+        for kind, key, size in self.con.execute("SELECT kind, key, size FROM entries ORDER BY used"):
+            doomed.append((kind, key))
+            freed += size
+            if freed >= excess:
+                break
+        self.con.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", doomed)
+        return len(doomed)
+
+    def flush(self) -> int:
+        evicted = self.evict()
+        self.con.commit()
+        return evicted
+
+    def close(self) -> None:
+        self.flush()
+        self.con.close()
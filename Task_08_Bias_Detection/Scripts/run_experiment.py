@@ -5,11 +5,16 @@
 # - Robust filename parsing: <model>_<condition>_runN (hyphens/spaces allowed)
 # - Adds file_name, char_len, word_count, response_sha1
 # - Deduplicates identical responses
+# - Incremental: a manifest (path, size, mtime, sha1) in Results/ingest_manifest.sqlite
+#   means only new or changed files are read; their rows are kept in the same
+#   SQLite file and the CSV is re-exported from it when anything changed
 
 from __future__ import annotations
+import os
 import re
 import time
 import hashlib
+import sqlite3
 from pathlib import Path
 import pandas as pd
 
@@ -24,10 +29,22 @@ RAW_DIRS = [
 
 OUT_DIR = BASE / "Results"
 OUT_CSV = OUT_DIR / "llm_outputs_structured.csv"
+MANIFEST_DB = OUT_DIR / "ingest_manifest.sqlite"
 
 # File types to ingest
 RAW_EXTS = {".txt", ".md"}
 
+# Structured log columns, in CSV order
+LOG_COLUMNS = ["file_name", "prompt_id", "hypothesis", "condition", "model", "model_version", "temperature",
+               "timestamp", "prompt_text", "response_text", "run", "char_len", "word_count", "response_sha1"]
+INT_COLUMNS = {"char_len", "word_count"}
+
+# Store rows written by async_runner.py start with this prefix (raw files use their path)
+RUN_KEY_PREFIX = "run:"
+
+HASH_BLOCK = 1 << 20  # bytes read per step when hashing raw files
+EXPORT_CHUNK = 10_000  # rows per step when writing the CSV
+
 # ----- Helpers ----------------------------------------------------------------
 def read_csv_relaxed(p: Path) -> pd.DataFrame:
     try:
@@ -66,6 +83,189 @@ def parse_filename(p: Path, valid_conditions: set[str]):
     model = norm.split(f"_{cond}", 1)[0].strip("_") or "unknown_model"
     return model, cond, run_index
 
+# ----- Incremental store --------------------------------------------------------
+def sha1_file(p: Path, block: int = HASH_BLOCK) -> str:
+    """SHA-1 of a file's bytes, read in blocks rather than all at once."""
+    h = hashlib.sha1()
+    with p.open("rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def iter_raw_files(root: Path):
+    """(path, stat) for every raw output under root; os.scandir hands back the stat with the listing."""
+    stack = [root]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                stack.append(Path(e.path))
+            elif e.is_file() and Path(e.name).suffix.lower() in RAW_EXTS:
+                yield Path(e.path), e.stat()
+
+def open_store(db: Path) -> sqlite3.Connection:
+    """
+    SQLite store next to the CSV: `manifest` has one row per ingested file
+    (path, size, mtime_ns, sha1), `responses` the structured rows it produced.
+    """
+    con = sqlite3.connect(db)
+    con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    con.execute("CREATE TABLE IF NOT EXISTS manifest (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha1 TEXT)")
+    cols = ", ".join(f"{c} {'INTEGER' if c in INT_COLUMNS else 'TEXT'}" for c in LOG_COLUMNS)
+    con.execute(f"CREATE TABLE IF NOT EXISTS responses (path TEXT, {cols})")
+    con.execute("CREATE INDEX IF NOT EXISTS responses_path ON responses (path)")
+    return con
+
+def reset_if_prompts_changed(con: sqlite3.Connection, prompts_sha1: str) -> bool:
+    """
+    Stored rows carry prompt fields, so a changed prompt_variations.csv means
+    ingesting every raw file again. Rows from async_runner.py are left to
+    drop_stale_runs(), which keeps those whose prompt is unchanged.
+    """
+    row = con.execute("SELECT value FROM meta WHERE key = 'prompts_sha1'").fetchone()
+    if row and row[0] == prompts_sha1:
+        return False
+    con.execute("DELETE FROM responses WHERE path IN (SELECT path FROM manifest)")
+    con.execute("DELETE FROM manifest")
+    con.execute("INSERT OR REPLACE INTO meta VALUES ('prompts_sha1', ?)", (prompts_sha1,))
+    return row is not None
+
+def prompt_hash(prompt_text: str, hypothesis="", condition="") -> str:
+    """Short hash of what a prompt asks; ends the store key of every async_runner.py row."""
+    return sha1_text("\x1f".join(map(str, (prompt_text, hypothesis, condition))))[:12]
+
+def prompt_signature(pr) -> tuple[str, str]:
+    """(prompt_id, prompt hash) that the async_runner.py jobs built from prompt row `pr` carry in their keys."""
+    condition = str(pr.get("condition", "")).strip().lower()
+    prompt_id = pr.get("prompt_id", f"{condition}_v1")
+    return str(prompt_id), prompt_hash(str(pr.get("prompt_text", "")), pr.get("hypothesis", "unspecified"), condition)
+
+def drop_stale_runs(con: sqlite3.Connection, prompts: pd.DataFrame, keys: set[str] | None = None) -> int:
+    """
+    Delete async_runner.py rows that no current job would write, so an edited
+    prompt's old answers are not exported next to the new ones. A row's key
+    must carry the prompt_id and prompt hash (text, hypothesis, condition) of
+    a prompt_variations.csv row; given `keys`, the current job keys, the whole
+    key (model and run included) must be one of them. Returns how many rows went.
+    """
+    current = {prompt_signature(pr) for _, pr in prompts.iterrows() if str(pr.get("condition", "")).strip()}
+    stale = []
+    for (path,) in con.execute("SELECT path FROM responses WHERE path LIKE ?", (RUN_KEY_PREFIX + "%",)):
+        parts = path[len(RUN_KEY_PREFIX):].rsplit("/", 3)  # model/prompt_id/runN/hash
+        if (len(parts) < 4 or (parts[1], parts[3]) not in current
+                or (keys is not None and path not in keys)):
+            stale.append((path,))
+    con.executemany("DELETE FROM responses WHERE path = ?", stale)
+    return len(stale)
+
+def forget(con: sqlite3.Connection, key: str) -> None:
+    con.execute("DELETE FROM responses WHERE path = ?", (key,))
+    con.execute("DELETE FROM manifest WHERE path = ?", (key,))
+
+def export_csv(con: sqlite3.Connection, out_csv: Path) -> int:
+    """
+    Write the stored rows to out_csv in path order, keeping the first of
+    exact duplicates (same response, prompt, run and model). Streams in
+    EXPORT_CHUNK-row pieces and swaps the file in when done.
+    """
+    cols = ", ".join(LOG_COLUMNS)
+    query = f"""
+        SELECT {cols} FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY response_sha1, prompt_id, run, model ORDER BY path) AS dup
+            FROM responses)
+        WHERE dup = 1 ORDER BY path"""
+    tmp = out_csv.with_name(out_csv.name + ".tmp")
+    written = 0
+    for chunk in pd.read_sql_query(query, con, chunksize=EXPORT_CHUNK):
+        chunk.to_csv(tmp, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += len(chunk)
+    if written:
+        os.replace(tmp, out_csv)
+    return written
+
+def ingest_raw(con: sqlite3.Connection, raw_dirs: list[Path], by_condition: dict) -> tuple[dict, set[str], list[str]]:
+    """
+    Bring the store up to date with the raw output files: only new or changed
+    files (size/mtime, then sha1) are read and hashed, and the rows of files
+    that disappeared are dropped. Returns (counts, keys seen, keys removed).
+    """
+    valid_conditions = set(by_condition)
+    known = {path: (size, mtime_ns, sha1) for path, size, mtime_ns, sha1 in con.execute("SELECT * FROM manifest")}
+
+    seen: set[str] = set()
+    counts = {"new": 0, "changed": 0, "unchanged": 0, "skipped": 0}
+    for d in raw_dirs:
+        for path, st in sorted(iter_raw_files(d)):
+            try:
+                model, condition, run_index = parse_filename(path, valid_conditions)
+            except ValueError as e:
+                print(f"Skipping {path.name}: {e}")
+                counts["skipped"] += 1
+                continue
+
+            pr = by_condition.get(condition)
+            if pr is None:
+                print(f"Skipping {path.name}: condition '{condition}' not present in prompt_variations.csv")
+                counts["skipped"] += 1
+                continue
+
+            key = str(path)
+            seen.add(key)
+            old = known.get(key)
+            if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                counts["unchanged"] += 1
+                continue
+            digest = sha1_file(path)
+            if old and old[2] == digest:
+                # touched but identical: just remember the new stat
+                con.execute("UPDATE manifest SET size = ?, mtime_ns = ? WHERE path = ?", (st.st_size, st.st_mtime_ns, key))
+                counts["unchanged"] += 1
+                continue
+
+            # Read response
+            try:
+                response_text = path.read_text(encoding="utf-8", errors="ignore")
+            except Exception:
+                response_text = path.read_text(errors="ignore")
+
+            # Safe access
+            prompt_id = pr.get("prompt_id", f"{condition}_v1")
+            hypothesis = pr.get("hypothesis", "unspecified")
+            prompt_text = pr.get("prompt_text", "")
+
+            row = {
+                "file_name": path.name,
+                "prompt_id": prompt_id,
+                "hypothesis": hypothesis,
+                "condition": condition,
+                "model": model,
+                "model_version": "ui",
+                "temperature": "NA",
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "prompt_text": prompt_text,
+                "response_text": response_text,
+                "run": run_index,
+                "char_len": len(response_text),
+                "word_count": len(response_text.split()),
+                "response_sha1": sha1_text(response_text),
+            }
+            forget(con, key)
+            con.execute(f"INSERT INTO responses VALUES (?, {', '.join('?' * len(LOG_COLUMNS))})",
+                        [key] + [None if pd.isna(row[c]) else row[c] for c in LOG_COLUMNS])
+            con.execute("INSERT INTO manifest VALUES (?, ?, ?, ?)", (key, st.st_size, st.st_mtime_ns, digest))
+            counts["changed" if old else "new"] += 1
+
+    # Files that disappeared take their rows with them
+    removed = [key for key in known if key not in seen]
+    for key in removed:
+        forget(con, key)
+    con.commit()
+    return counts, seen, removed
+
 # ----- Main -------------------------------------------------------------------
 if __name__ == "__main__":
     if not PROMPTS_CSV.exists():
@@ -81,73 +281,31 @@ if __name__ == "__main__":
     if prompts.empty or "condition" not in prompts.columns:
         raise ValueError("prompt_variations.csv has no 'condition' column or is empty.")
     by_condition = {str(r.get("condition", "")).strip().lower(): r for _, r in prompts.iterrows() if str(r.get("condition", "")).strip()}
-    valid_conditions = set(by_condition.keys())
 
-    # Gather candidate files (recursively) from both raw dirs
-    candidates: list[Path] = []
-    for d in RAW_DIRS:
-        candidates.extend([p for p in d.rglob("*") if p.is_file() and p.suffix.lower() in RAW_EXTS])
+    con = open_store(MANIFEST_DB)
+    if reset_if_prompts_changed(con, sha1_file(PROMPTS_CSV)):
+        print("prompt_variations.csv changed: re-ingesting all raw files.")
+    stale = drop_stale_runs(con, prompts)
+    if stale:
+        print(f"Dropped {stale} async_runner rows asked with a prompt that has since changed.")
+    counts, seen, removed = ingest_raw(con, RAW_DIRS, by_condition)
 
-    if not candidates:
+    print(f"Scanned raw dirs: {counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged, "
+          f"{len(removed)} removed, {counts['skipped']} skipped.")
+
+    if not seen:
         print("No raw .txt/.md files found in either:")
         for d in RAW_DIRS:
             print(" -", d)
         print("Add your UI outputs then re-run.")
         raise SystemExit(0)
 
-    print("Scanning files:")
-    for p in sorted(candidates):
-        print(" -", p)
-
-    rows = []
-    for path in sorted(candidates):
-        try:
-            model, condition, run_index = parse_filename(path, valid_conditions)
-        except ValueError as e:
-            print(f"Skipping {path.name}: {e}")
-            continue
-
-        pr = by_condition.get(condition)
-        if pr is None:
-            print(f"Skipping {path.name}: condition '{condition}' not present in prompt_variations.csv")
-            continue
+    if OUT_CSV.exists() and not (counts["new"] or counts["changed"] or removed or stale):
+        print(f"Nothing new; {OUT_CSV} is up to date.")
+        raise SystemExit(0)
 
-        # Read response
-        try:
-            response_text = path.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            response_text = path.read_text(errors="ignore")
-
-        # Safe access
-        prompt_id = pr.get("prompt_id", f"{condition}_v1")
-        hypothesis = pr.get("hypothesis", "unspecified")
-        prompt_text = pr.get("prompt_text", "")
-
-        rows.append({
-            "file_name": path.name,
-            "prompt_id": prompt_id,
-            "hypothesis": hypothesis,
-            "condition": condition,
-            "model": model,
-            "model_version": "ui",
-            "temperature": "NA",
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "prompt_text": prompt_text,
-            "response_text": response_text,
-            "run": run_index,
-            "char_len": len(response_text),
-            "word_count": len(response_text.split()),
-            "response_sha1": sha1_text(response_text),
-        })
-
-    df = pd.DataFrame(rows)
-
-    if df.empty:
+    written = export_csv(con, OUT_CSV)
+    if not written:
         print("No rows written. Check your raw files and filename pattern: <model>_<condition>_runN (e.g., gpt4_neutral_run1.txt).")
         raise SystemExit(0)
-
-    # Deduplicate exact duplicates (same response, same prompt/run/model)
-    df = df.drop_duplicates(subset=["response_sha1", "prompt_id", "run", "model"], keep="first")
-
-    df.to_csv(OUT_CSV, index=False)
-    print(f"✅ Wrote {OUT_CSV} with {len(df)} rows.")
+    print(f"✅ Wrote {OUT_CSV} with {written} rows.")
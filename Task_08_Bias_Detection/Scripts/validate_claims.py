@@ -1,12 +1,23 @@
 # scripts/validate_claims.py
 # Validate LLM responses against per-player ground truth (Analysis/ground_truth_full.csv)
+# - Each distinct response text is scored once; scores are cached by response sha1 and a
+#   fingerprint of the ground truth + settings (scripts/response_store.py), so re-validating
+#   only scores responses that are new or whose facts changed
 
 from __future__ import annotations
+import os
 import re
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
 import numpy as np
 
+from response_store import CACHE_DB, ResponseStore, fingerprint, sha1_text
+
 # --- Paths tailored to your machine (consistent with other scripts) ----------
 BASE = Path(r"C:/Users/Karan/OneDrive/Desktop/RA_TASK_08")
 GT_FULL = BASE / "Analysis" / "ground_truth_full.csv"
@@ -20,6 +31,16 @@ NUM_CANDIDATES = ["runs", "bat_strike_rate", "balls", "wickets", "bowl_strike_ra
 # Comparison settings
 ROUND_DP = 2
 ABS_TOL = 0.01  # tolerate tiny float formatting differences
+VECTORIZED = False  # True: one NumPy searchsorted per response (pays off for long, number-heavy responses)
+
+# Batch validation
+WORKERS = 0  # worker processes; 0 = one per CPU, 1 = validate in this process
+CHUNK_ROWS = 256  # log rows per pool task
+LOG_FIELDS = ["prompt_id", "condition", "model", "run"]  # row fields copied into each result
+
+# Score cache
+USE_CACHE = True
+VALIDATOR_VERSION = 1  # bump when the scoring below changes, so cached scores are not reused
 
 # --- Helpers -----------------------------------------------------------------
 def read_csv_relaxed(p: Path) -> pd.DataFrame:
@@ -76,42 +97,150 @@ def extract_numbers(text: str):
             pass
     return out
 
-def make_player_regex(players: list[str]):
+def is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+class PlayerMatcher:
     """
-    Build a single regex that matches any anonymized player exactly,
-    case-insensitive, with word boundaries. E.g., 'Player A', 'Player AA'.
+    Aho-Corasick automaton over the lowercased player names, built once from
+    the ground truth and reused for every response.
+
+    Matches like the old alternation regex (case-insensitive, word
+    boundaries, leftmost match first, longest name wins at a position, no
+    overlaps), but one pass over the text finds every name, so the cost
+    depends on the text length rather than the roster size. `canonical`
+    maps a lowercased name to its ground-truth spelling.
     """
-    # Escape names and sort by length desc to avoid partial shadowing
-    esc = sorted((re.escape(p) for p in players if p), key=len, reverse=True)
-    if not esc:
-        return None
-    pattern = r"\b(?:" + "|".join(esc) + r")\b"
-    return re.compile(pattern, flags=re.IGNORECASE)
-
-def approx_in_set(value: float, candidates: set[float], abs_tol: float = ABS_TOL) -> bool:
-    """Return True if any candidate is within abs_tol of value."""
-    for c in candidates:
-        if c is None:
-            continue
-        if abs(value - c) <= abs_tol:
-            return True
-    return False
 
-# --- Main --------------------------------------------------------------------
-if __name__ == "__main__":
-    if not GT_FULL.exists():
-        raise FileNotFoundError("Analysis/ground_truth_full.csv not found. Run scripts/ground_truth.py first.")
-    if not LOG_CSV.exists():
-        raise FileNotFoundError("Results/llm_outputs_structured.csv not found. Run scripts/run_experiment.py after collecting outputs.")
+    def __init__(self, players: list[str]):
+        self.canonical: dict[str, str] = {}
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.out: list[tuple[str, ...]] = [()]  # lowercased names ending at each state
 
-    gt_raw = read_csv_relaxed(GT_FULL)
-    log = read_csv_relaxed(LOG_CSV)
-
-    if gt_raw.empty:
-        raise ValueError("ground_truth_full.csv is empty.")
-    if log.empty:
-        raise ValueError("llm_outputs_structured.csv is empty.")
+        for p in players:
+            key = p.lower()
+            if not key or key in self.canonical:
+                continue
+            self.canonical[key] = p
+            node = 0
+            for ch in key:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                    self.goto[node][ch] = nxt
+                node = nxt
+            self.out[node] = (key,)
+
+        # Breadth-first: a state's failure link points at its longest proper suffix in the trie
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def __bool__(self) -> bool:
+        return bool(self.canonical)
+
+    def finditer(self, text: str):
+        """Yield (start, end, canonical name) per mention, left to right."""
+        goto, fail, out = self.goto, self.fail, self.out
+        n = len(text)
+        hits = []
+        node = 0
+        for i, ch in enumerate(text):
+            ch = ch.lower()
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for key in out[node]:
+                start, end = i + 1 - len(key), i + 1
+                # same test as regex \b at both ends
+                before = start > 0 and is_word_char(text[start - 1])
+                after = end < n and is_word_char(text[end])
+                if before != is_word_char(text[start]) and after != is_word_char(text[end - 1]):
+                    hits.append((start, -len(key), key))
+
+        hits.sort()
+        pos = 0
+        for start, neg_len, key in hits:
+            if start >= pos:
+                pos = start - neg_len
+                yield start, pos, self.canonical[key]
+
+    def mentions(self, text: str) -> list[str]:
+        """Canonical names of the players mentioned, first mention order, without repeats."""
+        return list(dict.fromkeys(name for _, _, name in self.finditer(text)))
+
+def approx_in_sorted(value: float, values, abs_tol: float = ABS_TOL) -> bool:
+    """Return True if any of the sorted `values` is within abs_tol of value (binary search, not a scan)."""
+    i = bisect_left(values, value)
+    # only the neighbours on either side of the insertion point can be closest
+    return (i < len(values) and abs(value - values[i]) <= abs_tol) or (i > 0 and abs(value - values[i - 1]) <= abs_tol)
+
+class FactIndex:
+    """
+    Each player's numeric facts as a sorted array('d'), so a number claimed
+    in a response is checked with a binary search instead of a scan over
+    every fact.
+
+    With vectorized=True every player's facts are also packed into one NumPy
+    vector, each player in its own band (facts shifted by player_slot * span),
+    and hit_counts() checks all numbers against all mentioned players with a
+    single searchsorted call.
+    """
 
+    def __init__(self, player_nums: dict[str, set[float]], abs_tol: float = ABS_TOL, vectorized: bool = False):
+        self.abs_tol = abs_tol
+        self.facts = {p: array("d", sorted(v for v in vals if v is not None)) for p, vals in player_nums.items()}
+        self.vectorized = vectorized
+        if vectorized:
+            self._pack()
+
+    def _pack(self):
+        self.slot = {p: i for i, p in enumerate(self.facts)}
+        values = np.concatenate([np.frombuffer(a, dtype=np.float64) for a in self.facts.values()] or [np.empty(0)])
+        self.low = float(values.min()) if len(values) else 0.0
+        self.high = float(values.max()) if len(values) else 0.0
+        # wide enough that a tolerance window never reaches the next player's band
+        self.span = (self.high - self.low) + 4 * self.abs_tol + 1
+        sizes = np.array([len(a) for a in self.facts.values()], dtype=np.int64)
+        self.values = values
+        self.keys = values - self.low + np.repeat(np.arange(len(sizes)) * self.span, sizes)
+        self.ends = np.cumsum(sizes)
+        self.starts = self.ends - sizes
+
+    def hit_counts(self, players: list[str], numbers) -> dict[str, int]:
+        """How many of `numbers` are within tolerance of some fact, per player."""
+        numbers = list(numbers)
+        if not self.vectorized or not players or not numbers:
+            return {p: sum(approx_in_sorted(n, self.facts.get(p, ()), self.abs_tol) for n in numbers) for p in players}
+
+        tol = self.abs_tol
+        slots = np.array([self.slot.get(p, -1) for p in players], dtype=np.int64)
+        nums = np.asarray(numbers, dtype=np.float64)
+        known = np.maximum(slots, 0)[:, None]
+        # (players x numbers) queries, all located in one call
+        pos = np.searchsorted(self.keys, (nums - self.low)[None, :] + known * self.span)
+        start, end = self.starts[known], self.ends[known]
+        values = self.values if len(self.values) else np.zeros(1)
+        right = np.minimum(pos, len(values) - 1)
+        left = np.maximum(pos - 1, 0)
+        hit = ((pos < end) & (np.abs(nums - values[right]) <= tol)) | ((pos > start) & (np.abs(nums - values[left]) <= tol))
+        hit &= (slots >= 0)[:, None] & (nums >= self.low - tol) & (nums <= self.high + tol)
+        return dict(zip(players, hit.sum(axis=1).tolist()))
+
+# --- Ground truth index --------------------------------------------------------
+def build_player_facts(gt_raw: pd.DataFrame) -> dict[str, set[float]]:
+    """player -> set of that player's numeric facts, rounded to ROUND_DP."""
     # Resolve columns case-insensitively
     m = lc_map(gt_raw)
     player_col = m.get("player")
@@ -165,64 +294,123 @@ if __name__ == "__main__":
             if v_ob_ is not None:
                 vals.add(v_ob_)
         player_nums[p] = vals
+    return player_nums
+
+# --- Validation engine ---------------------------------------------------------
+# Each worker process builds the matcher and fact index once, in its
+# initializer; tasks then only carry their chunk of log rows.
+_matcher: PlayerMatcher | None = None
+_facts: FactIndex | None = None
+
+def init_validator(player_nums: dict[str, set[float]], vectorized: bool = VECTORIZED) -> None:
+    global _matcher, _facts
+    _matcher = PlayerMatcher(list(player_nums.keys()))
+    _facts = FactIndex(player_nums, vectorized=vectorized)
+
+def score_text(txt: str) -> dict:
+    """Validation signals for one response text (needs init_validator() first)."""
+
+    # Players mentioned (case-insensitive, canonical spelling, first-mention order)
+    mentioned = _matcher.mentions(txt)
+
+    # Extract numeric claims from the text
+    nums_in_text = extract_numbers(txt)
+    nums_in_text_set = set(nums_in_text)
+
+    # Per-player hits: count how many extracted numbers are near any ground-truth number for that player
+    per_player_hits = _facts.hit_counts(mentioned, nums_in_text_set)
+
+    # Aggregate signals
+    total_gt_hits = int(sum(per_player_hits.values())) if per_player_hits else 0
+    mentioned_players_count = len(mentioned)
+    any_player_with_hits = any(h > 0 for h in per_player_hits.values()) if per_player_hits else False
+
+    # Optional: simple precision-like score (how many numbers matched / numbers mentioned)
+    precision_like = float(total_gt_hits) / max(len(nums_in_text_set), 1)
+
+    return {
+        "mentioned_players": ", ".join(mentioned) if mentioned else "",
+        "mentioned_players_count": mentioned_players_count,
+        "total_ground_truth_numeric_hits": total_gt_hits,
+        "any_player_supported_by_numbers": bool(any_player_with_hits),
+        "numbers_in_text_count": len(nums_in_text_set),
+        "precision_like": round(precision_like, 3),
+        # Flatten per-player hits for quick eyeballing
+        "per_player_hits": "; ".join(f"{p}:{h}" for p, h in per_player_hits.items()) if per_player_hits else "",
+    }
+
+def validate_chunk(texts: list[str]) -> list[dict]:
+    return [score_text(t) for t in texts]
+
+def score_texts(texts: list[str], player_nums: dict[str, set[float]],
+                workers: int = WORKERS, chunk_rows: int = CHUNK_ROWS) -> list[dict]:
+    """
+    Score texts in chunks spread over a process pool; results come back in
+    input order. Runs in-process for one worker or a single chunk.
+    """
+    chunks = [texts[i:i + chunk_rows] for i in range(0, len(texts), chunk_rows)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    if workers <= 1:
+        init_validator(player_nums, VECTORIZED)
+        return validate_chunk(texts)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_validator,
+                             initargs=(player_nums, VECTORIZED)) as pool:
+        return [result for part in pool.map(validate_chunk, chunks) for result in part]
+
+def facts_fingerprint(player_nums: dict[str, set[float]]) -> str:
+    """Everything a score depends on besides the response text itself."""
+    facts = {p: sorted(v for v in vals if v is not None) for p, vals in player_nums.items()}
+    return fingerprint(VALIDATOR_VERSION, ROUND_DP, ABS_TOL, facts)
+
+def validate_log(log: pd.DataFrame, player_nums: dict[str, set[float]], workers: int = WORKERS,
+                 chunk_rows: int = CHUNK_ROWS, store: ResponseStore | None = None) -> list[dict]:
+    """
+    Validate every row of the structured log, in input order. Rows are
+    grouped by response sha1 so identical responses are scored once, and
+    with a store, responses it already holds scores for are not scored at all.
+    """
+    fields = [c for c in LOG_FIELDS if c in log.columns]
+    texts = [str(t) for t in log["response_text"]] if "response_text" in log.columns else [""] * len(log)
+    digests = [sha1_text(t) for t in texts]
+    unique = dict(zip(digests, texts))
+
+    fp = facts_fingerprint(player_nums)
+    scores = store.get_validations(list(unique), fp) if store is not None else {}
+    todo = [d for d in unique if d not in scores]
+    fresh = dict(zip(todo, score_texts([unique[d] for d in todo], player_nums, workers, chunk_rows)))
+    if store is not None:
+        store.put_validations(fresh, fp)
+    scores.update(fresh)
+
+    return [{f: row.get(f) for f in LOG_FIELDS} | scores[d] for row, d in zip(log[fields].to_dict("records"), digests)]
+
+# --- Main --------------------------------------------------------------------
+if __name__ == "__main__":
+    if not GT_FULL.exists():
+        raise FileNotFoundError("Analysis/ground_truth_full.csv not found. Run scripts/ground_truth.py first.")
+    if not LOG_CSV.exists():
+        raise FileNotFoundError("Results/llm_outputs_structured.csv not found. Run scripts/run_experiment.py after collecting outputs.")
+
+    gt_raw = read_csv_relaxed(GT_FULL)
+    log = read_csv_relaxed(LOG_CSV)
+
+    if gt_raw.empty:
+        raise ValueError("ground_truth_full.csv is empty.")
+    if log.empty:
+        raise ValueError("llm_outputs_structured.csv is empty.")
+
+    player_nums = build_player_facts(gt_raw)
 
-    # Prepare regex for player mentions
-    players = list(player_nums.keys())
-    rx_players = make_player_regex(players)
-
-    results = []
-    for _, row in log.iterrows():
-        txt = str(row.get("response_text", ""))
-
-        # Find which players are mentioned (regex, case-insensitive)
-        mentioned = []
-        if rx_players:
-            for m_ in rx_players.finditer(txt):
-                name = m_.group(0)
-                # Normalize to canonical case: pick the exact key from dict (case-insensitive match)
-                canon = next((p for p in players if p.lower() == name.lower()), name)
-                mentioned.append(canon)
-
-        # Unique preserve order
-        seen = set()
-        mentioned = [x for x in mentioned if not (x in seen or seen.add(x))]
-
-        # Extract numeric claims from the text
-        nums_in_text = extract_numbers(txt)
-        nums_in_text_set = set(nums_in_text)
-
-        # Per-player hits: count how many extracted numbers are near any ground-truth number for that player
-        per_player_hits = {}
-        for p in mentioned:
-            gt_set = player_nums.get(p, set())
-            hit_count = 0
-            for n in nums_in_text_set:
-                if approx_in_set(n, gt_set):
-                    hit_count += 1
-            per_player_hits[p] = hit_count
-
-        # Aggregate signals
-        total_gt_hits = int(sum(per_player_hits.values())) if per_player_hits else 0
-        mentioned_players_count = len(mentioned)
-        any_player_with_hits = any(h > 0 for h in per_player_hits.values()) if per_player_hits else False
-
-        # Optional: simple precision-like score (how many numbers matched / numbers mentioned)
-        precision_like = float(total_gt_hits) / max(len(nums_in_text_set), 1)
-
-        results.append({
-            "prompt_id": row.get("prompt_id"),
-            "condition": row.get("condition"),
-            "model": row.get("model"),
-            "run": row.get("run"),
-            "mentioned_players": ", ".join(mentioned) if mentioned else "",
-            "mentioned_players_count": mentioned_players_count,
-            "total_ground_truth_numeric_hits": total_gt_hits,
-            "any_player_supported_by_numbers": bool(any_player_with_hits),
-            "numbers_in_text_count": len(nums_in_text_set),
-            "precision_like": round(precision_like, 3),
-            # Flatten per-player hits for quick eyeballing
-            "per_player_hits": "; ".join(f"{p}:{h}" for p, h in per_player_hits.items()) if per_player_hits else "",
-        })
+    store = ResponseStore(CACHE_DB) if USE_CACHE else None
+    started = time.perf_counter()
+    results = validate_log(log, player_nums, store=store)
+    elapsed = time.perf_counter() - started
+    print(f"Validated {len(results)} responses in {elapsed:.2f}s ({len(results) / max(elapsed, 1e-9):,.0f} responses/s).")
+    if store is not None:
+        print(f"Scores reused from cache: {store.hits}, newly scored: {store.misses}.")
+        store.close()
 
     out = pd.DataFrame(results)
     OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
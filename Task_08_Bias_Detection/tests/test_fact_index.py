@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+from validate_claims import ABS_TOL, FactIndex  # noqa: E402
+
+
+def linear_hits(player_nums, players, numbers, abs_tol=ABS_TOL):
+    """The approx_in_set scan validate_claims.py used before FactIndex."""
+    return {p: sum(any(c is not None and abs(n - c) <= abs_tol for c in player_nums.get(p, set()))
+                   for n in numbers) for p in players}
+
+
+@pytest.fixture(scope="module")
+def facts():
+    rng = random.Random(2)
+    return {f"P{i}": {round(rng.uniform(0, 200), 2) for _ in range(rng.randint(0, 40))} | {None}
+            for i in range(30)}
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_index_matches_a_linear_scan(facts, vectorized):
+    rng = random.Random(3)
+    index = FactIndex(facts, vectorized=vectorized)
+    known = sorted(v for vals in facts.values() for v in vals if v is not None)
+    for _ in range(300):
+        players = rng.sample(sorted(facts) + ["nobody"], rng.randint(0, 5))
+        # exact facts, facts nudged just inside/outside the tolerance, and noise
+        numbers = {round(rng.choice(known) + rng.choice([0, 0.005, -0.01, 0.011, 0.02]), 3) for _ in range(6)}
+        numbers |= {round(rng.uniform(-10, 250), 2) for _ in range(4)}
+        assert index.hit_counts(players, numbers) == linear_hits(facts, players, numbers)
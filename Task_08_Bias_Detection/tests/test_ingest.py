@@ -0,0 +1,63 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+from run_experiment import LOG_COLUMNS, export_csv, ingest_raw, open_store  # noqa: E402
+
+BY_CONDITION = {"neutral": {"prompt_id": "neu_v1", "hypothesis": "H0", "prompt_text": "Who played well?"},
+                "negative": {"prompt_id": "neg_v1", "hypothesis": "H1", "prompt_text": "Who struggled?"}}
+
+
+@pytest.fixture
+def raw(tmp_path):
+    d = tmp_path / "raw"
+    d.mkdir()
+    (d / "gpt4_neutral_run1.txt").write_text("Player A scored 45.")
+    (d / "gpt4_negative_run1.txt").write_text("Player B struggled.")
+    (d / "notes.txt").write_text("no condition here")
+    return d
+
+
+def ingest(con, raw):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ingest_raw(con, [raw], BY_CONDITION)
+
+
+def test_touched_but_identical_file_is_not_reingested(tmp_path, raw):
+    con = open_store(tmp_path / "store.sqlite")
+    counts, seen, removed = ingest(con, raw)
+    assert (counts["new"], counts["skipped"], len(seen), removed) == (2, 1, 2, [])
+    before = con.execute("SELECT * FROM responses ORDER BY path").fetchall()
+
+    path = raw / "gpt4_neutral_run1.txt"
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    counts, _, _ = ingest(con, raw)
+    assert (counts["new"], counts["changed"], counts["unchanged"]) == (0, 0, 2)
+    assert con.execute("SELECT * FROM responses ORDER BY path").fetchall() == before
+
+
+def test_edited_and_deleted_files_update_the_store(tmp_path, raw):
+    con = open_store(tmp_path / "store.sqlite")
+    ingest(con, raw)
+    (raw / "gpt4_neutral_run1.txt").write_text("Player A scored 46 this time.")
+    (raw / "gpt4_negative_run1.txt").unlink()
+    counts, _, removed = ingest(con, raw)
+    assert counts["changed"] == 1 and len(removed) == 1
+    assert [r for (r,) in con.execute("SELECT response_text FROM responses")] == ["Player A scored 46 this time."]
+
+
+def test_export_keeps_one_of_each_duplicate(tmp_path, raw):
+    (raw / "sub").mkdir()
+    (raw / "sub" / "gpt4_neutral_run1.txt").write_text("Player A scored 45.")  # same answer, second copy
+    (raw / "gpt4_neutral_run2.txt").write_text("Player A scored 45.")  # same answer, another run
+    con = open_store(tmp_path / "store.sqlite")
+    ingest(con, raw)
+    out = tmp_path / "log.csv"
+    assert export_csv(con, out) == 3
+    log = pd.read_csv(out)
+    assert list(log.columns) == LOG_COLUMNS
+    assert sorted(zip(log["condition"], log["run"])) == [("negative", 1), ("neutral", 1), ("neutral", 2)]
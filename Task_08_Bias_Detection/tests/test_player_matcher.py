@@ -0,0 +1,33 @@
+import random
+import re
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+from validate_claims import PlayerMatcher  # noqa: E402
+
+PLAYERS = ["Player A", "Player AA", "Player B", "player b", "A", "O'Neil", "J.Smith", "Smith", "Player A B", "_x"]
+
+
+def old_mentions(players, text):
+    """The alternation regex validate_claims.py used before PlayerMatcher."""
+    esc = sorted((re.escape(p) for p in players if p), key=len, reverse=True)
+    rx = re.compile(r"\b(?:" + "|".join(esc) + r")\b", flags=re.IGNORECASE)
+    found = [next((p for p in players if p.lower() == m.group(0).lower()), m.group(0)) for m in rx.finditer(text)]
+    return list(dict.fromkeys(found))
+
+
+def test_matches_the_old_regex_on_random_texts():
+    rng = random.Random(11)
+    pieces = PLAYERS + ["player", "a", "aa", "b", "-", " ", ", ", ".", "'", "x", "Smithy", "7", "\n"]
+    matcher = PlayerMatcher(PLAYERS)
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) + rng.choice(["", " ", ""]) for _ in range(rng.randint(1, 12)))
+        assert matcher.mentions(text) == old_mentions(PLAYERS, text), text
+
+
+def test_case_insensitive_with_canonical_spelling():
+    matcher = PlayerMatcher(PLAYERS)
+    assert matcher.mentions("PLAYER AA beat player a and o'neil") == ["Player AA", "Player A", "O'Neil"]
+    assert not PlayerMatcher([])
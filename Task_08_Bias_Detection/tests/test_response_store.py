@@ -0,0 +1,62 @@
+import asyncio
+import contextlib
+import io
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+import async_runner as ar  # noqa: E402
+import validate_claims as vc  # noqa: E402
+from response_store import ResponseStore, request_key  # noqa: E402
+from run_experiment import open_store  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = ResponseStore(tmp_path / "cache.sqlite", max_bytes=10_000)
+    yield s
+    s.con.close()
+
+
+def test_eviction_drops_least_recently_used_first(store):
+    keys = [request_key("m", f"prompt {i}", {}) for i in range(6)]
+    for i, key in enumerate(keys):
+        store.put_request(key, f"{i}" * 2000, "v1")
+    assert store.get_request(keys[0]) == ("0" * 2000, "v1")  # touch the oldest
+    evicted = store.flush()
+    assert evicted > 0 and store.size() <= store.max_bytes
+    assert store.get_request(keys[0]) is not None
+    assert store.get_request(keys[1]) is None
+
+
+def test_identical_responses_are_stored_once(store):
+    a = store.put_request(request_key("m1", "p", {}), "same text", "v1")
+    b = store.put_request(request_key("m2", "p", {}), "same text", "v2")
+    assert a == b
+    assert store.con.execute("SELECT COUNT(*) FROM entries WHERE kind = 'response'").fetchone()[0] == 1
+
+
+def test_validation_scores_are_reused_until_the_facts_change(store):
+    facts = {"Player A": {45.0}}
+    log = pd.DataFrame({"prompt_id": ["p1", "p2", "p3"], "run": [1, 1, 2],
+                        "response_text": ["Player A made 45", "Player A made 45", "Player A made 12"]})
+    first = vc.validate_log(log, facts, workers=1, store=store)
+    assert store.misses == 2  # two distinct responses, both scored
+    store.hits = store.misses = 0
+    assert vc.validate_log(log, facts, workers=1, store=store) == first
+    assert (store.hits, store.misses) == (2, 0)
+    changed = vc.validate_log(log, {"Player A": {12.0}}, workers=1, store=store)
+    assert store.misses == 2
+    assert [r["total_ground_truth_numeric_hits"] for r in changed] == [0, 0, 1]
+
+
+def test_runner_answers_repeated_requests_from_the_store(tmp_path, store):
+    prompts = pd.DataFrame([{"prompt_id": "n", "hypothesis": "H", "condition": "neutral",
+                             "prompt_text": "- Player A: 45 runs"}])
+    jobs = ar.build_jobs(prompts, ["m"], 2)
+    for db in ("one.sqlite", "two.sqlite"):
+        runner = ar.Runner(ar.StubBackend(latency=0.0), open_store(tmp_path / db), store=store)
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = asyncio.run(runner.run(jobs))
+    assert (stats["done"], stats["cached"]) == (2, 2)
@@ -0,0 +1,72 @@
+import asyncio
+import contextlib
+import io
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+import async_runner as ar  # noqa: E402
+from run_experiment import open_store  # noqa: E402
+
+PROMPTS = pd.DataFrame([
+    {"prompt_id": "neu_v1", "hypothesis": "H0", "condition": "neutral",
+     "prompt_text": "Pick one:\n- Player A: 45 runs\n- Player B: 3 wickets"},
+])
+
+
+class Flaky(ar.StubBackend):
+    """Fails each request `failures` times (alternating rate limits and transient errors) before answering."""
+
+    def __init__(self, failures=2, latency=0.0):
+        super().__init__(latency=latency)
+        self.failures = failures
+        self.calls = {}
+
+    async def complete(self, model, prompt, temperature, seed=0):
+        n = self.calls[seed] = self.calls.get(seed, 0) + 1
+        if n <= self.failures:
+            raise ar.RateLimited(retry_after=0.001) if n % 2 else ar.TransientError("reset")
+        return await super().complete(model, prompt, temperature, seed)
+
+
+def run(runner, jobs, timeout=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(asyncio.wait_for(runner.run(jobs), timeout))
+
+
+@pytest.fixture
+def con(tmp_path):
+    return open_store(tmp_path / "store.sqlite")
+
+
+def paths(con):
+    return [p for (p,) in con.execute("SELECT path FROM responses ORDER BY path")]
+
+
+def test_retries_until_the_backend_answers(con):
+    jobs = ar.build_jobs(PROMPTS, ["m"], 4)
+    stats = run(ar.Runner(Flaky(failures=2), con, backoff_base=0.001), jobs)
+    assert stats == {"done": 4, "failed": 0, "retries": 8, "cached": 0}
+    assert paths(con) == sorted(j["key"] for j in jobs)
+
+
+def test_failed_jobs_are_left_for_the_next_run(con):
+    jobs = ar.build_jobs(PROMPTS, ["m"], 3)
+    stats = run(ar.Runner(Flaky(failures=2), con, max_retries=1, backoff_base=0.001), jobs)
+    assert (stats["done"], stats["failed"]) == (0, 3)
+    assert ar.pending_jobs(con, jobs) == jobs
+
+
+def test_interrupted_run_resumes_without_duplicates(con):
+    jobs = ar.build_jobs(PROMPTS, ["m1", "m2"], 10)
+    runner = ar.Runner(ar.StubBackend(latency=0.02), con, concurrency=2)
+    with pytest.raises(asyncio.TimeoutError):
+        run(runner, jobs, timeout=0.1)
+    done = paths(con)
+    assert 0 < len(done) < len(jobs)
+
+    todo = ar.pending_jobs(con, jobs)
+    assert len(todo) == len(jobs) - len(done)
+    run(ar.Runner(ar.StubBackend(latency=0.0), con), todo)
+    assert paths(con) == sorted(j["key"] for j in jobs)
+    assert ar.pending_jobs(con, jobs) == []
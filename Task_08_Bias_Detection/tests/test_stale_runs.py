@@ -0,0 +1,45 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+import async_runner as ar  # noqa: E402
+from run_experiment import drop_stale_runs, open_store  # noqa: E402
+
+PROMPTS = pd.DataFrame([
+    {"prompt_id": "neg_v1", "hypothesis": "H1", "condition": "negative", "prompt_text": "Who struggled?"},
+    {"prompt_id": "pos_v1", "hypothesis": "H2", "condition": "positive", "prompt_text": "Who shone?"},
+])
+
+
+@pytest.fixture
+def store(tmp_path):
+    con = open_store(tmp_path / "store.sqlite")
+    for job in ar.build_jobs(PROMPTS, ["m1", "m2"], 2):
+        ar.save_row(con, job["key"], ar.to_row(job, "answer", "v", 0.0))
+    return con
+
+
+def stored(con):
+    return {path for (path,) in con.execute("SELECT path FROM responses")}
+
+
+def keys(prompts, models=("m1", "m2"), runs=2):
+    return {j["key"] for j in ar.build_jobs(prompts, list(models), runs)}
+
+
+def test_unchanged_prompts_keep_every_row(store):
+    assert drop_stale_runs(store, PROMPTS, keys(PROMPTS)) == 0
+    assert len(stored(store)) == 8
+
+
+@pytest.mark.parametrize("field, value", [("prompt_id", "neg_v2"), ("hypothesis", "H3"), ("prompt_text", "Who?")])
+def test_a_changed_prompt_field_drops_its_rows(store, field, value):
+    edited = PROMPTS.copy()
+    edited.loc[0, field] = value
+    assert drop_stale_runs(store, edited) == 4
+    assert drop_stale_runs(store, edited, keys(edited)) == 0
+    assert all("/pos_v1/" in path for path in stored(store))
+
+
+def test_job_keys_also_cover_model_and_run(store):
+    assert drop_stale_runs(store, PROMPTS, keys(PROMPTS, models=["m1"], runs=1)) == 6
+    assert stored(store) == keys(PROMPTS, models=["m1"], runs=1)
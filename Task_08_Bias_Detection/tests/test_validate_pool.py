@@ -0,0 +1,21 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+import validate_claims as vc  # noqa: E402
+
+FACTS = {"Player A": {45.0, 132.5}, "Player B": {3.0, 7.25}, "Player C": set()}
+TEXTS = [f"Player A scored {45 + i % 3} at 132.5; Player B took {i % 4} for 7.25" for i in range(40)] + ["", "none"]
+
+
+def test_pool_matches_in_process_scoring():
+    serial = vc.score_texts(TEXTS, FACTS, workers=1)
+    pooled = vc.score_texts(TEXTS, FACTS, workers=2, chunk_rows=5)
+    assert pooled == serial
+    assert serial[0]["per_player_hits"] == "Player A:2; Player B:1"
+
+
+def test_vectorized_setting_reaches_every_path(monkeypatch):
+    monkeypatch.setattr(vc, "VECTORIZED", True)
+    vc.score_texts(TEXTS[:2], FACTS, workers=1)
+    assert vc._facts.vectorized
@@ -1,7 +1,22 @@
 import pandas as pd
-import ast
+import argparse
+import hashlib
+import json
+import math
 import os
-from shutil import get_terminal_size
+from collections import Counter
+
+from cell_parser import parse_cell
+from column_detect import SCAN_ROWS, describe, detect_in_columns
+from flat_cache import open_cache
+from render import TableView, add_view_arguments, render_blocks, render_table
+from sketches import KLL, KLL_BATCH, QUANTILES, HyperLogLog
+
+# Rows read up front to settle per-column dtypes before chunked reading
+DTYPE_SAMPLE_ROWS = 10000
+
+# Distinct text values kept per column between chunks in --approx mode
+APPROX_TOP_VALUES = 1024
 
 
 def banner(text):
@@ -10,123 +25,479 @@ def banner(text):
     print("—" * (len(text) + 4))
 
 
+def read_csv(file_path, dtype=None, chunksize=None):
+    """
+    Read a CSV once, with the pyarrow engine when it is available.
+
+    With `chunksize`, returns an iterator of DataFrames instead (pyarrow does
+    not stream, so chunked reads use the C engine).
+    """
+    if chunksize:
+        return pd.read_csv(file_path, dtype=dtype, chunksize=chunksize)
+    try:
+        return pd.read_csv(file_path, dtype=dtype, engine="pyarrow")
+    except (ImportError, ValueError):
+        return pd.read_csv(file_path, dtype=dtype)
+
+
+def infer_dtypes(file_path, dtype=None, nrows=DTYPE_SAMPLE_ROWS):
+    """
+    Settle text columns from a sample so every chunk agrees on them.
+
+    Numeric columns are still inferred per chunk; columns the sample reads as
+    text are pinned to object, and explicit `dtype` entries always win.
+    """
+    sample = pd.read_csv(file_path, nrows=nrows, dtype=dtype)
+    pinned = {col: "object" for col in sample.select_dtypes(include=['object', 'string']).columns}
+    pinned.update(dtype or {})
+    return pinned
+
+
 def detect_non_flat_columns(df):
-    """Return a list of column names that appear to contain JSON/dict structures."""
-    bad_cols = []
-    for col in df.columns:
-        if df[col].astype(str).str.contains(r'^\s*{.*}\s*$', na=False).any():
-            bad_cols.append(col)
-    return bad_cols
+    """Return {column: confidence} for columns that appear to contain JSON/dict structures."""
+    # only text columns can hold dict literals; numeric columns are skipped outright
+    text_cols = df.select_dtypes(include=['object', 'string']).columns
+    return detect_in_columns({col: df[col].head(SCAN_ROWS).tolist() for col in text_cols})
 
 
-def load_and_unpack(file_path):
+def load_and_unpack(df, bad_cols=None, unpack=None):
     """
-    Load a CSV file and unpack JSON-like columns, while preserving all other columns.
+    Unpack JSON-like columns of an already loaded DataFrame, while preserving all other columns.
+
+    `unpack` names columns already chosen for unpacking (by the first chunk of
+    a chunked read): those are unpacked whatever this chunk holds, cells that
+    are not dicts counting as empty, as on the Polars path.
     """
-    df = pd.read_csv(file_path)
+    if unpack is None and bad_cols is None:
+        bad_cols = detect_non_flat_columns(df)
     unpacked_cols = []
 
-    for col in df.columns:
-        if df[col].astype(str).str.contains(r'^\s*{.*}\s*$', na=False).any():
-            try:
-                parsed = df[col].dropna().apply(ast.literal_eval)
-                if parsed.apply(lambda x: isinstance(x, dict)).all():
-                    normalized = pd.json_normalize(parsed)
-                    normalized.columns = [
-                        f"{col}_{sub.replace(' ', '_').replace('.', '_')}" for sub in normalized.columns
-                    ]
-                    df = pd.concat([df.drop(columns=[col]), normalized], axis=1)
-                    unpacked_cols.append(col)
-            except Exception:
-                continue
+    for col in (bad_cols if unpack is None else unpack):
+        try:
+            parsed = df[col].dropna().apply(parse_cell)
+            if unpack is not None:
+                parsed = parsed.map(lambda x: x if isinstance(x, dict) else {})
+            if parsed.apply(lambda x: isinstance(x, dict)).all():
+                normalized = pd.json_normalize(parsed.tolist())
+                normalized.index = parsed.index  # keep rows aligned past dropped NaNs
+                normalized.columns = [
+                    f"{col}_{sub.replace(' ', '_').replace('.', '_')}" for sub in normalized.columns
+                ]
+                df = pd.concat([df.drop(columns=[col]), normalized], axis=1)
+                unpacked_cols.append(col)
+        except Exception:
+            continue
 
     return df, unpacked_cols
 
 
-def display_numeric_summary(df):
-    """Show side-by-side summary stats for numeric columns."""
+def load_frame_cached(file_path, cache, dtype=None):
+    """
+    (unpacked DataFrame, non-flat columns, cache hit?) through a FlatCache.
+
+    Entries are Arrow IPC (Feather) files, mapped back with memory_map; an
+    explicit `dtype` mapping gets its own entry since it changes the result.
+    """
+    import pyarrow.feather as feather
+
+    variant = "pandas"
+    if dtype:
+        variant += "-" + hashlib.blake2b(json.dumps(dtype, sort_keys=True).encode(), digest_size=4).hexdigest()
+
+    hit = cache.lookup(file_path, variant, ".arrow")
+    if hit:
+        data, meta = hit
+        return feather.read_table(data, memory_map=True).to_pandas(), meta["non_flat"], True
+
+    raw_df = read_csv(file_path, dtype=dtype)
+    bad_cols = detect_non_flat_columns(raw_df)
+    df, _ = load_and_unpack(raw_df, bad_cols)
+    df = df.reset_index(drop=True)
+    cache.store(file_path, variant, ".arrow", df.to_feather, {"non_flat": bad_cols, "rows": len(df)})
+    return df, bad_cols, False
+
+
+def series_hll(s, hll=None):
+    """Fold the non-null values of a Series into a HyperLogLog (vectorized hashing)."""
+    hll = hll or HyperLogLog()
+    values = s.dropna()
+    if len(values):
+        hll.add_hashes(pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy())
+    return hll
+
+
+def series_kll(s, kll=None):
+    """Fold the non-null values of a Series into a KLL sketch, KLL_BATCH values at a time."""
+    kll = kll or KLL()
+    values = s.dropna().to_numpy()
+    for i in range(0, len(values), KLL_BATCH):
+        kll.update(values[i:i + KLL_BATCH].tolist())
+    return kll
+
+
+def quantile_labels():
+    return [f"P{round(q * 100)}" for q in QUANTILES]
+
+
+def numeric_summary(df, approx=False):
+    """Count/null%/mean/min/max/std table for the numeric columns of a DataFrame (plus sketch quantiles with approx)."""
     numeric_df = df.select_dtypes(include='number')
     if numeric_df.empty:
-        print("No numeric columns found.")
-        return
+        return None
 
     desc = numeric_df.describe().transpose()
-    desc = desc[["count", "mean", "min", "max", "std"]].round(2)
+    desc["count"] = desc["count"].astype(int)
+    desc["null%"] = 100 * (1 - desc["count"] / len(df))
+    desc = desc[["count", "null%", "mean", "min", "max", "std"]]
+    if approx:
+        qs = pd.DataFrame([series_kll(numeric_df[col]).quantiles(QUANTILES) for col in numeric_df.columns],
+                          index=numeric_df.columns, columns=quantile_labels(), dtype=float)
+        desc = desc.join(qs)
+    desc = desc.round(2)
     desc.reset_index(inplace=True)
-    desc.columns = ["Column", "Count", "Mean", "Min", "Max", "StdDev"]
+    desc.columns = ["Column", "Count", "Null%", "Mean", "Min", "Max", "StdDev"] + (quantile_labels() if approx else [])
+    return desc
+
+
+def text_summary(df, approx=False):
+    """(column, count, null %, unique, top value, top frequency) for the text columns."""
+    text_cols = df.select_dtypes(include=['object', 'string'])
+    rows = []
+    for col in text_cols.columns:
+        counts = text_cols[col].value_counts()
+        if counts.empty:
+            continue
+        unique = f"~{round(series_hll(text_cols[col]).count())}" if approx else text_cols[col].nunique()
+        count = text_cols[col].count()
+        rows.append((col, count, 100 * (1 - count / len(df)), unique, counts.idxmax(), counts.max()))
+    return rows
+
+
+def column_records(df, approx=False):
+    """One stats dict per numeric or text column, unrounded, for machine-readable output."""
+    numeric_cols = set(df.select_dtypes(include='number').columns)
+    text_cols = set(df.select_dtypes(include=['object', 'string']).columns)
+    records = []
+    for col in df.columns:
+        s = df[col]
+        if col in numeric_cols:
+            record = {"column": col, "type": "numeric", "count": int(s.count()),
+                      "mean": s.mean(), "std": s.std(), "min": s.min(), "max": s.max()}
+            if approx:
+                record.update(zip([f"p{round(q * 100)}" for q in QUANTILES], series_kll(s).quantiles(QUANTILES)))
+            records.append(record)
+        elif col in text_cols:
+            counts = s.value_counts()
+            if counts.empty:
+                continue
+            record = {"column": col, "type": "text", "count": int(s.count()),
+                      "top": counts.idxmax(), "top_count": int(counts.max())}
+            if approx:
+                record.update(unique=round(series_hll(s).count()), unique_approx=True)
+            else:
+                record["unique"] = s.nunique()
+            records.append(record)
+    return records
+
+
+def print_numeric_table(desc, view=None):
+    if desc is None or desc.empty:
+        print("No numeric columns found.")
+        return
+    render_table(list(desc.columns), desc.values.tolist(), view)
 
-    col_widths = [max(len(str(x)) for x in desc[col]) + 2 for col in desc.columns]
-    row_format = "".join([f"{{:<{w}}}" for w in col_widths])
 
-    print("\n" + "=" * get_terminal_size((80, 20)).columns)
-    print(row_format.format(*desc.columns))
-    print("-" * get_terminal_size((80, 20)).columns)
+def print_text_summary(rows, view=None):
+    rows = [(col, count, nulls, unique, f"{top_val} ({top_freq}x)")
+            for col, count, nulls, unique, top_val, top_freq in rows]
+    if rows:
+        render_blocks(["Count", "Null%", "Unique", "Top"], rows, view)
 
-    for _, row in desc.iterrows():
-        print(row_format.format(*row))
+
+def display_numeric_summary(df, approx=False, view=None):
+    """Show side-by-side summary stats for numeric columns."""
+    print_numeric_table(numeric_summary(df, approx), view)
 
 
-def display_text_summary(df):
+def display_text_summary(df, approx=False, view=None):
     """Show summary stats for non-numeric columns."""
-    text_cols = df.select_dtypes(include='object')
+    print_text_summary(text_summary(df, approx), view)
 
-    for col in text_cols.columns:
-        print(f"\n {col}")
-        count = text_cols[col].count()
-        unique = text_cols[col].nunique()
-        top_val = text_cols[col].value_counts().idxmax()
-        top_freq = text_cols[col].value_counts().max()
 
-        print(f" ↳ Count: {count}")
-        print(f" ↳ Unique: {unique}")
-        print(f" ↳ Top: {top_val} ({top_freq}x)")
+def summarize_dataframe(df, approx=False, view=None):
+    """Print stats for both numeric and text columns; `view` (a TableView) sorts, filters, pages or silences them."""
+    banner(" SUMMARY STATISTICS")
+    if view is not None and view.quiet:
+        print(f" {df.shape[1]} columns summarized (rendering skipped).")
+        return
+    display_numeric_summary(df, approx, view)
+    display_text_summary(df, approx, view)
 
 
-def summarize_dataframe(df):
-    """Print stats for both numeric and text columns."""
+class ChunkedSummary:
+    """
+    Mergeable per-column stats accumulated one DataFrame chunk at a time.
+
+    Numeric columns keep count/mean/M2/min/max and are merged with the
+    parallel-variance formula; text columns keep merged value counts.
+
+    With `approx`, numeric columns also keep a KLL sketch for quantiles,
+    distinct text values are counted with a HyperLogLog and the value
+    counts are cut back to the APPROX_TOP_VALUES most common after every
+    chunk, so memory no longer grows with column cardinality.
+    """
+
+    def __init__(self, approx=False):
+        self.rows = 0
+        self.numeric = {}
+        self.text = {}
+        self.text_total = Counter()
+        self.columns = []
+        self.approx = approx
+        self.kll = {}
+        self.hll = {}
+
+    def _track(self, col):
+        if col not in self.columns:
+            self.columns.append(col)
+
+    def add(self, df):
+        self.rows += len(df)
+
+        numeric_df = df.select_dtypes(include='number')
+        if not numeric_df.empty:
+            stats = pd.DataFrame({
+                "count": numeric_df.count(),
+                "mean": numeric_df.mean(),
+                "m2": numeric_df.var(ddof=0) * numeric_df.count(),
+                "min": numeric_df.min(),
+                "max": numeric_df.max(),
+            })
+            for col, (n, mean, m2, low, high) in stats.iterrows():
+                self._track(col)
+                if n:
+                    self._merge_numeric(col, n, mean, m2, low, high)
+                    if self.approx:
+                        self.kll[col] = series_kll(numeric_df[col], self.kll.get(col))
+
+        for col in df.select_dtypes(include=['object', 'string']).columns:
+            self._track(col)
+            counts = df[col].value_counts()
+            merged = self.text.setdefault(col, Counter())
+            merged.update(counts.to_dict())
+            self.text_total[col] += int(counts.sum())
+            if self.approx:
+                self.hll[col] = series_hll(df[col], self.hll.get(col))
+                if len(merged) > APPROX_TOP_VALUES:
+                    self.text[col] = Counter(dict(merged.most_common(APPROX_TOP_VALUES)))
+
+    def _merge_numeric(self, col, n, mean, m2, low, high):
+        if col not in self.numeric:
+            self.numeric[col] = [n, mean, m2, low, high]
+            return
+        na, ma, m2a, lowa, higha = self.numeric[col]
+        total = na + n
+        delta = mean - ma
+        self.numeric[col] = [
+            total,
+            ma + delta * n / total,
+            m2a + m2 + delta * delta * na * n / total,
+            min(lowa, low),
+            max(higha, high),
+        ]
+
+    def numeric_table(self):
+        rows = []
+        for col in self.columns:
+            if col not in self.numeric:
+                continue
+            n, mean, m2, low, high = self.numeric[col]
+            std = math.sqrt(m2 / (n - 1)) if n > 1 else float("nan")
+            row = [col, int(n), 100 * (1 - n / self.rows), round(mean, 2), round(low, 2), round(high, 2), round(std, 2)]
+            if self.approx:
+                row += [round(v, 2) for v in self.kll[col].quantiles(QUANTILES)]
+            rows.append(row)
+        if not rows:
+            return None
+        return pd.DataFrame(rows, columns=["Column", "Count", "Null%", "Mean", "Min", "Max", "StdDev"]
+                            + (quantile_labels() if self.approx else []))
+
+    def unique(self, col):
+        if self.approx:
+            return round(self.hll[col].count())
+        return len(self.text[col])
+
+    def records(self):
+        """Same shape as column_records(), from the merged chunk stats."""
+        out = []
+        for col in self.columns:
+            if col in self.numeric:
+                n, mean, m2, low, high = self.numeric[col]
+                record = {"column": col, "type": "numeric", "count": int(n), "mean": mean,
+                          "std": math.sqrt(m2 / (n - 1)) if n > 1 else None, "min": low, "max": high}
+                if self.approx:
+                    record.update(zip([f"p{round(q * 100)}" for q in QUANTILES], self.kll[col].quantiles(QUANTILES)))
+                out.append(record)
+            elif self.text.get(col):
+                top_val, top_freq = self.text[col].most_common(1)[0]
+                record = {"column": col, "type": "text", "count": self.text_total[col],
+                          "unique": self.unique(col), "top": top_val, "top_count": top_freq}
+                if self.approx:
+                    record["unique_approx"] = True
+                out.append(record)
+        return out
+
+    def text_rows(self):
+        rows = []
+        for col in self.columns:
+            counts = self.text.get(col)
+            if col in self.numeric or not counts:
+                continue
+            top_val, top_freq = counts.most_common(1)[0]
+            unique = f"~{self.unique(col)}" if self.approx else self.unique(col)
+            count = self.text_total[col]
+            rows.append((col, count, 100 * (1 - count / self.rows), unique, top_val, top_freq))
+        return rows
+
+
+def accumulate_chunks(file_path, chunksize, dtype=None, approx=False):
+    """Detect, unpack and fold a CSV into a ChunkedSummary; returns (summary, bad_cols, unpacked)."""
+    dtype = infer_dtypes(file_path, dtype)
+    summary = ChunkedSummary(approx)
+    bad_cols, unpacked = None, []
+
+    for i, chunk in enumerate(read_csv(file_path, dtype=dtype, chunksize=chunksize), 1):
+        if bad_cols is None:
+            # detection samples the first chunk only, so its cost does not grow with the file;
+            # the columns unpacked there are unpacked in every later chunk too
+            bad_cols = detect_non_flat_columns(chunk)
+            chunk, unpacked = load_and_unpack(chunk, bad_cols)
+        else:
+            chunk, _ = load_and_unpack(chunk, unpack=unpacked)
+        summary.add(chunk)
+        print(f" Processed chunk {i} ({summary.rows} rows so far)")
+
+    return summary, bad_cols or {}, unpacked
+
+
+def summarize_chunked(file_path, chunksize, dtype=None, approx=False, view=None):
+    """Detect, unpack and summarize a CSV chunk by chunk; only the running stats stay in memory."""
+    summary, bad_cols, unpacked = accumulate_chunks(file_path, chunksize, dtype, approx)
+
+    if bad_cols:
+        print(f" Non-flat (possibly JSON) columns detected: {describe(bad_cols)}")
+    else:
+        print(" All columns appear flat (CSV-friendly).")
+    if unpacked:
+        print(f" Unpacked columns: {', '.join(unpacked)}")
+    print(f" Data summarized: {summary.rows} rows × {len(summary.columns)} columns")
+
     banner(" SUMMARY STATISTICS")
-    display_numeric_summary(df)
-    display_text_summary(df)
+    if view is None or not view.quiet:
+        print_numeric_table(summary.numeric_table(), view)
+        print_text_summary(summary.text_rows(), view)
+    return summary.columns, unpacked
 
 
-def group_dataframe(df):
-    """Prompt for grouping columns and return aggregated DataFrame."""
+def ask_group_columns(columns):
+    """Prompt for grouping columns; returns None when the user skips aggregation."""
     choice = input("\n Do you want to group (aggregate) the data? (yes/no): ").strip().lower()
     if choice not in ["yes", "y"]:
         print(" Skipping aggregation.")
         return None
 
-    try:
+    while True:
+        try:
+            n = int(input(" How many columns do you want to group by? "))
+            if n < 1:
+                raise ValueError
+            break
+        except ValueError:
+            print(" Please enter a number greater than 0.")
+
+    group_cols = []
+    for i in range(n):
         while True:
-            try:
-                n = int(input(" How many columns do you want to group by? "))
-                if n < 1:
-                    raise ValueError
+            col = input(f" Enter column name #{i + 1} to group by: ").strip()
+            if col not in columns:
+                print(f" Column '{col}' not found. Try again.")
+            else:
+                group_cols.append(col)
                 break
-            except ValueError:
-                print(" Please enter a number greater than 0.")
-
-        group_cols = []
-        for i in range(n):
-            while True:
-                col = input(f" Enter column name #{i + 1} to group by: ").strip()
-                if col not in df.columns:
-                    print(f" Column '{col}' not found. Try again.")
-                else:
-                    group_cols.append(col)
-                    break
-
-        print(f"\n Grouping by: {', '.join(group_cols)}")
-
-        numeric_cols = df.select_dtypes(include='number').columns.difference(group_cols)
-        if numeric_cols.empty:
+
+    print(f"\n Grouping by: {', '.join(group_cols)}")
+    return group_cols
+
+
+def group_dataframe(df, view=None):
+    """Prompt for grouping columns and return aggregated DataFrame."""
+    try:
+        group_cols = ask_group_columns(df.columns)
+        if group_cols is None:
+            return None
+
+        grouped_df = grouped_means(df, group_cols)
+        if grouped_df is None:
             print(" No numeric columns to aggregate.")
             return None
 
-        grouped_df = df.groupby(group_cols)[numeric_cols].mean().reset_index()
+        banner(" AGGREGATED DATA ANALYSIS")
+        summarize_dataframe(grouped_df, view=view)
+        return grouped_df
+
+    except Exception as e:
+        print(f" Grouping failed: {e}")
+        return None
+
+
+def grouped_means(df, group_cols):
+    """Mean of every numeric column per group, or None when there is nothing numeric to average."""
+    numeric_cols = df.select_dtypes(include='number').columns.difference(group_cols)
+    if numeric_cols.empty:
+        return None
+    return df.groupby(group_cols)[numeric_cols].mean().reset_index()
+
+
+def grouped_means_chunked(file_path, group_cols, chunksize, dtype=None, unpacked=None):
+    """
+    grouped_means() over a chunked read, merged from per-chunk sums and counts.
+
+    `unpacked` is the column list accumulate_chunks() settled on; without it
+    the first chunk decides, as there.
+    """
+    partials = []
+    for chunk in read_csv(file_path, dtype=infer_dtypes(file_path, dtype), chunksize=chunksize):
+        if unpacked is None:
+            chunk, unpacked = load_and_unpack(chunk)
+        else:
+            chunk, _ = load_and_unpack(chunk, unpack=unpacked)
+        numeric_cols = chunk.select_dtypes(include='number').columns.difference(group_cols)
+        if not numeric_cols.empty:
+            partials.append(chunk.groupby(group_cols)[numeric_cols].agg(["sum", "count"]))
+
+    if not partials:
+        return None
+
+    merged = pd.concat(partials).groupby(level=group_cols).sum(min_count=1)
+    sums = merged.xs("sum", axis=1, level=1)
+    counts = merged.xs("count", axis=1, level=1)
+    return (sums / counts).reset_index()
+
+
+def group_chunked(file_path, columns, chunksize, dtype=None, unpacked=None, view=None):
+    """Grouped means over a chunked read, merged from per-chunk sums and counts."""
+    try:
+        group_cols = ask_group_columns(columns)
+        if group_cols is None:
+            return None
+
+        grouped_df = grouped_means_chunked(file_path, group_cols, chunksize, dtype, unpacked)
+        if grouped_df is None:
+            print(" No numeric columns to aggregate.")
+            return None
 
         banner(" AGGREGATED DATA ANALYSIS")
-        summarize_dataframe(grouped_df)
+        summarize_dataframe(grouped_df, view=view)
         return grouped_df
 
     except Exception as e:
@@ -134,27 +505,101 @@ def group_dataframe(df):
         return None
 
 
+def summarize_file(file_path, group_by=None, chunksize=None, dtype=None, cache=None, approx=False):
+    """
+    Non-interactive analysis of one CSV for batch use.
+
+    Returns a dict with the row count, detected non-flat columns, one stats
+    dict per column and, when `group_by` is given, the grouped means as rows.
+    With `chunksize` the file is streamed exactly as in --chunksize mode;
+    otherwise `cache` (a FlatCache or True) reuses the unpacked frame.
+    `approx` adds sketch quantiles and approximate distinct counts.
+    """
+    group_by = list(group_by or [])
+    cache = open_cache(cache)
+    if cache and not chunksize:
+        df, bad_cols, _ = load_frame_cached(file_path, cache, dtype)
+        n_rows, records = len(df), column_records(df, approx)
+        grouped = grouped_means(df, group_by) if group_by else None
+    elif chunksize:
+        summary, bad_cols, unpacked = accumulate_chunks(file_path, chunksize, dtype, approx)
+        n_rows, records = summary.rows, summary.records()
+        grouped = grouped_means_chunked(file_path, group_by, chunksize, dtype, unpacked) if group_by else None
+    else:
+        raw_df = read_csv(file_path, dtype=dtype)
+        bad_cols = detect_non_flat_columns(raw_df)
+        df, _ = load_and_unpack(raw_df, bad_cols)
+        n_rows, records = len(df), column_records(df, approx)
+        grouped = grouped_means(df, group_by) if group_by else None
+
+    groups = grouped.to_dict("records") if grouped is not None else None
+    return {"rows": n_rows, "non_flat": bad_cols, "columns": records, "groups": groups}
+
+
+def parse_dtype_args(pairs):
+    """Turn ['col=type', ...] from the command line into a read_csv dtype mapping."""
+    dtype = {}
+    for pair in pairs or []:
+        col, _, kind = pair.partition("=")
+        if not kind:
+            raise SystemExit(f" Invalid --dtype '{pair}' (expected COLUMN=TYPE)")
+        dtype[col.strip()] = kind.strip()
+    return dtype or None
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Pandas CSV analyzer")
+    parser.add_argument("path", nargs="?", help="CSV file to analyze (prompted for if omitted)")
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="stream the file in chunks of N rows and merge the stats")
+    parser.add_argument("--dtype", action="append", metavar="COLUMN=TYPE",
+                        help="explicit dtype for a column (repeatable)")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse the unpacked data from the on-disk cache (ignored with --chunksize)")
+    parser.add_argument("--approx", action="store_true",
+                        help="fixed-memory sketches: approximate unique counts and P50/P90/P99")
+    add_view_arguments(parser)
+    args = parser.parse_args()
+    dtype = parse_dtype_args(args.dtype)
+    view = TableView.from_args(args)
+
     banner(" PANDAS CSV ANALYZER")
 
-    file_path = input(" Enter path to your CSV file: ").strip().strip('"')
+    file_path = args.path or input(" Enter path to your CSV file: ").strip().strip('"')
 
     if not os.path.isfile(file_path):
         print(" File not found. Please check the path.")
         return
 
     try:
+        if args.chunksize > 0:
+            banner(" STREAMING + UNPACKING DATA")
+            columns, unpacked = summarize_chunked(file_path, args.chunksize, dtype, args.approx, view)
+            group_chunked(file_path, columns, args.chunksize, dtype, unpacked, view)
+            return
+
+        if args.cache:
+            banner(" LOADING UNPACKED DATA (CACHED)")
+            df, bad_cols, hit = load_frame_cached(file_path, open_cache(True), dtype)
+            print(" Reused cached data." if hit else " Parsed file and cached the unpacked data.")
+            if bad_cols:
+                print(f" Non-flat (possibly JSON) columns detected: {describe(bad_cols)}")
+            print(f" Data loaded: {df.shape[0]} rows × {df.shape[1]} columns")
+            summarize_dataframe(df, args.approx, view)
+            group_dataframe(df, view)
+            return
+
         banner(" ANALYZING COLUMN FORMATS")
-        raw_df = pd.read_csv(file_path)
+        raw_df = read_csv(file_path, dtype=dtype)
         bad_cols = detect_non_flat_columns(raw_df)
 
         if bad_cols:
-            print(f" Non-flat (possibly JSON) columns detected: {', '.join(bad_cols)}")
+            print(f" Non-flat (possibly JSON) columns detected: {describe(bad_cols)}")
         else:
             print(" All columns appear flat (CSV-friendly).")
 
         banner(" LOADING + UNPACKING DATA")
-        df, unpacked = load_and_unpack(file_path)
+        df, unpacked = load_and_unpack(raw_df, bad_cols)
         print(f" Data loaded: {df.shape[0]} rows × {df.shape[1]} columns")
 
         if unpacked:
@@ -162,8 +607,8 @@ def main():
         else:
             print("ℹ No JSON-like columns were unpacked.")
 
-        summarize_dataframe(df)
-        group_dataframe(df)
+        summarize_dataframe(df, args.approx, view)
+        group_dataframe(df, view)
 
     except Exception as e:
         print(f" Something went wrong: {e}")
@@ -1,11 +1,25 @@
 import polars as pl
+import argparse
 import os
-import ast
 import json
-from tkinter import Tk
-from tkinter.filedialog import askopenfilename
-from collections import Counter
-import pandas as pd
+import re
+
+from cell_parser import parse_cell
+from column_detect import SCAN_ROWS, describe, detect_in_columns
+from flat_cache import open_cache
+from sketches import QUANTILES
+
+# Non-null cells sampled to infer the struct schema of a JSON column (per round, see infer_struct_dtype)
+JSON_INFER_ROWS = 1000
+
+# Cells already in JSON object form ({"key": ... or {}) take the native decoder
+JSON_OBJECT = r'^\s*\{\s*("|\})'
+
+# A quoted dict key, JSON or Python style
+KEY_TOKEN = r'["\']([^"\'\\]+)["\']\s*:'
+
+# Rows kept by default (preview mode)
+PREVIEW_ROWS = 10
 
 
 def banner(text):
@@ -15,44 +29,57 @@ def banner(text):
 
 
 def try_parse_json(val):
+    return parse_cell(val)
+
+
+def collect(lf):
+    """Run a query plan on the streaming engine, so large files use bounded memory."""
     try:
-        return json.loads(val)
-    except:
-        try:
-            return ast.literal_eval(val)
-        except:
-            return None
+        return lf.collect(engine="streaming")
+    except (TypeError, ValueError):
+        # Polars releases before the "streaming" engine name
+        return lf.collect(streaming=True)
 
 
-def load_csv():
+def choose_file(file_path=None):
+    """The CSV to analyze: `file_path`, or one picked in a file dialog."""
     banner("POLARS CSV ANALYZER")
-    print("Please select a CSV file...")
-    root = Tk()
-    root.withdraw()
-    file_path = askopenfilename(filetypes=[("CSV Files", "*.csv")])
+    if not file_path:
+        print("Please select a CSV file...")
+        # tkinter only loads when a dialog is actually needed
+        from tkinter import Tk
+        from tkinter.filedialog import askopenfilename
+        root = Tk()
+        root.withdraw()
+        file_path = askopenfilename(filetypes=[("CSV Files", "*.csv")])
     if not file_path:
         print("No file selected.")
         exit()
     if not os.path.isfile(file_path):
         print("File not found.")
         exit()
+    return file_path
 
+
+def load_csv(file_path=None):
+    """Pick a CSV (dialog unless a path is given) and return a lazy scan of it."""
+    file_path = choose_file(file_path)
     banner("LOADING DATA")
-    df = pl.read_csv(file_path, infer_schema_length=10000)
-    print(f"Loaded {df.shape[0]} rows × {df.shape[1]} columns")
-    return df
+    lf = pl.scan_csv(file_path, infer_schema_length=10000)
+    print(f"Scanning {file_path} ({len(lf.collect_schema())} columns)")
+    return lf
 
 
-def detect_json_columns(df):
+def detect_json_columns(lf):
     banner("DETECTING JSON-LIKE COLUMNS")
-    json_cols = []
+    json_cols = {}
     try:
-        for col in df.columns:
-            sample = df[col].drop_nulls().cast(pl.Utf8).head(10).to_list()
-            if any(isinstance(val, str) and val.strip().startswith("{") and val.strip().endswith("}") for val in sample):
-                json_cols.append(col)
+        # only string columns can hold dict literals; sample a bounded head of them
+        text_cols = [col for col, dtype in lf.collect_schema().items() if dtype == pl.Utf8]
+        sample = collect(lf.head(SCAN_ROWS).select(text_cols))
+        json_cols = detect_in_columns({col: sample[col].to_list() for col in text_cols})
         if json_cols:
-            print(f"JSON-like columns found: {', '.join(json_cols)}")
+            print(f"JSON-like columns found: {describe(json_cols)}")
         else:
             print("No JSON-like columns found.")
     except Exception as e:
@@ -60,77 +87,332 @@ def detect_json_columns(df):
     return json_cols
 
 
+def literal_to_json(val):
+    """Re-encode a Python-literal dict cell as JSON (fallback path), else None."""
+    parsed = try_parse_json(val)
+    return json.dumps(parsed, default=str) if isinstance(parsed, dict) else None
+
+
+def parse_dicts(cells):
+    parsed = [try_parse_json(v) for v in cells]
+    return [p for p in parsed if isinstance(p, dict) and p]
+
+
+def struct_of(dicts):
+    """Struct dtype covering every key of `dicts` (all rows are scanned, not just the first 100)."""
+    if not dicts:
+        return None
+    try:
+        return pl.Struct(pl.from_dicts(dicts, infer_schema_length=None, strict=False).schema)
+    except (pl.exceptions.PolarsError, TypeError, ValueError):
+        dtype = pl.Series(dicts, strict=False).dtype
+        return dtype if isinstance(dtype, pl.Struct) else None
+
+
+def field_names(dtype):
+    """Field names of a Struct dtype, nested structs included."""
+    names = set()
+    for field in dtype.fields:
+        names.add(field.name)
+        if isinstance(field.dtype, pl.Struct):
+            names |= field_names(field.dtype)
+    return names
+
+
+def infer_struct_dtype(lf, col):
+    """
+    Infer a Struct dtype for a JSON-like column.
+
+    The schema starts from the first JSON_INFER_ROWS cells. One native pass
+    then lists every key name used anywhere in the column; while some are
+    not in the schema yet, up to JSON_INFER_ROWS cells holding them are
+    parsed as well, so keys that first appear late in the file are kept.
+    """
+    text = pl.col(col).cast(pl.Utf8)
+    dicts = parse_dicts(collect(lf.select(text).drop_nulls().head(JSON_INFER_ROWS)).to_series().to_list())
+    tokens = collect(lf.select(text.str.extract_all(KEY_TOKEN).explode().drop_nulls().unique())).to_series()
+    used = {m.group(1) for m in map(re.compile(KEY_TOKEN).match, tokens.to_list()) if m}
+
+    dtype = struct_of(dicts)
+    while dtype is not None:
+        unknown = sorted(used - field_names(dtype))
+        if not unknown:
+            break
+        quoted = [f'"{k}"' for k in unknown] + [f"'{k}'" for k in unknown]
+        cells = collect(lf.select(text).filter(text.str.contains_any(quoted)).unique().head(JSON_INFER_ROWS))
+        wider = struct_of(dicts + parse_dicts(cells.to_series().to_list()))
+        if field_names(wider) == field_names(dtype):
+            break  # the rest only looked like keys (e.g. inside string values)
+        dtype = wider
+        used -= set(unknown) - field_names(dtype)
+    return dtype
+
+
+def conform(value, dtype):
+    """A parsed JSON value shaped to `dtype`; parts that do not fit it become None."""
+    if value is None:
+        return None
+    if isinstance(dtype, pl.Struct):
+        if not isinstance(value, dict):
+            return None
+        return {field.name: conform(value.get(field.name), field.dtype) for field in dtype.fields}
+    if isinstance(dtype, pl.List):
+        return [conform(v, dtype.inner) for v in value] if isinstance(value, list) else None
+    if dtype == pl.Boolean:
+        return value if isinstance(value, bool) else None
+    if dtype.is_numeric():
+        return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    if dtype == pl.Utf8:
+        return value if isinstance(value, str) else json.dumps(value)
+    return None
+
+
+def decode_batch(texts, dtype):
+    """
+    str.json_decode for one batch of JSON text. A batch the native decoder
+    rejects (a malformed cell, or a value whose shape does not fit `dtype`)
+    is split in halves until the failing cells are isolated; only those are
+    parsed in Python and conformed to `dtype`.
+    """
+    try:
+        return texts.str.json_decode(dtype)
+    except pl.exceptions.PolarsError:
+        if len(texts) > 1:
+            mid = len(texts) // 2
+            return pl.concat([decode_batch(texts.slice(0, mid), dtype), decode_batch(texts.slice(mid), dtype)])
+    parsed = try_parse_json(texts[0])
+    value = conform(parsed, dtype) if isinstance(parsed, dict) else None
+    try:
+        return pl.Series(texts.name, [value], dtype=dtype, strict=False)
+    except (pl.exceptions.PolarsError, TypeError, ValueError):
+        return pl.Series(texts.name, [None], dtype=dtype)
+
+
+def decode_json_expr(col, dtype):
+    """
+    Expression decoding `col` into a struct, row for row.
+
+    Cells already in JSON form go to the native decoder as they are; only
+    the remaining cells (Python dict reprs and the like) are re-encoded in
+    Python first. Decoding runs per batch through decode_batch, so a bad
+    cell costs a few extra native calls, not a Python pass over the column.
+    Cells that decode to nothing stay null, so rows line up.
+    """
+    text = pl.col(col).cast(pl.Utf8)
+    is_json = text.str.contains(JSON_OBJECT)
+    as_json = pl.coalesce(
+        pl.when(is_json).then(text),
+        pl.when(~is_json).then(text).map_elements(literal_to_json, return_dtype=pl.Utf8),
+    )
+    return as_json.map_batches(lambda s: decode_batch(s, dtype), return_dtype=dtype, is_elementwise=True)
+
+
 def unpack_json_columns(df, json_cols):
+    """
+    Lazily replace each JSON-like column with its unnested fields.
+
+    Returns a LazyFrame; nothing is decoded until the plan is collected.
+    """
     banner("UNPACKING JSON COLUMNS")
-    new_dfs = []
+    lf = df.lazy()
 
+    dtypes = {}
     for col in json_cols:
         try:
-            series = df[col].drop_nulls().cast(pl.Utf8)
-            parsed = [try_parse_json(v) for v in series.to_list()]
-            parsed = [p if isinstance(p, dict) else {} for p in parsed]
-            unpacked_df = pl.DataFrame(parsed)
-            unpacked_df.columns = [f"{col}_{c}" for c in unpacked_df.columns]
-            new_dfs.append(unpacked_df)
+            dtype = infer_struct_dtype(lf, col)
         except Exception as e:
             print(f"Could not unpack column '{col}': {e}")
+            continue
+        if dtype is None:
+            print(f"Could not unpack column '{col}': no dict values found")
+            continue
+        dtypes[col] = dtype
+
+    out = lf.with_columns([
+        decode_json_expr(col, dtype)
+        .struct.rename_fields([f"{col}_{field.name}" for field in dtype.fields])
+        .alias(col)
+        for col, dtype in dtypes.items()
+    ])
+    return out.unnest(list(dtypes)) if dtypes else out
+
+
+def analyze(lf, json_cols, approx=False):
+    """Unpack and summarize in one plan."""
+    summarize_dataframe(unpack_json_columns(lf, json_cols), approx)
+
+
+def load_frame_cached(file_path, cache):
+    """
+    (LazyFrame of the unpacked data, JSON columns, cache hit?) through a FlatCache.
+
+    A miss runs detection and unpacking once and writes the result as Arrow
+    IPC; a hit is a lazy, memory-mapped scan of that file.
+    """
+    hit = cache.lookup(file_path, "polars", ".arrow")
+    if hit:
+        data, meta = hit
+        return pl.scan_ipc(data), meta["non_flat"], True
+
+    lf = pl.scan_csv(file_path, infer_schema_length=10000)
+    json_cols = detect_json_columns(lf)
+    df = collect(unpack_json_columns(lf, json_cols))
+    cache.store(file_path, "polars", ".arrow", df.write_ipc, {"non_flat": json_cols, "rows": df.height})
+    return df.lazy(), json_cols, False
+
+
+def quantile_name(q):
+    return f"p{round(q * 100)}"
+
 
-    if new_dfs:
-        df = df.drop(json_cols)
-        for part in new_dfs:
-            df = df.hstack(part)
+def summary_exprs(schema, approx=False):
+    """
+    Aggregation expressions for every column, named '<column>:<stat>'.
 
-    print(f"Final shape: {df.shape[0]} rows × {df.shape[1]} columns")
-    return df
+    With `approx`, distinct counts use Polars' HyperLogLog (approx_n_unique,
+    which nested columns do not support) and numeric columns also get their
+    QUANTILES.
+    """
+    exprs = [pl.len().alias(":rows")]
+    for col, dtype in schema.items():
+        c = pl.col(col)
+        unique = c.drop_nulls().approx_n_unique() if approx and not dtype.is_nested() else c.drop_nulls().n_unique()
+        exprs += [c.count().alias(f"{col}:count"), unique.alias(f"{col}:unique")]
+        if dtype.is_numeric():
+            exprs += [
+                c.mean().alias(f"{col}:mean"),
+                c.std().alias(f"{col}:std"),
+                c.min().alias(f"{col}:min"),
+                c.max().alias(f"{col}:max"),
+            ]
+            if approx:
+                exprs += [c.quantile(q, interpolation="nearest").alias(f"{col}:{quantile_name(q)}") for q in QUANTILES]
+        if not dtype.is_nested():
+            # most frequent value and its count, as a {value, count} struct
+            exprs.append(c.drop_nulls().value_counts(sort=True).first().alias(f"{col}:top"))
+    return exprs
 
 
-def summarize_dataframe(df):
+def column_stats(df, approx=False):
+    """(row count, one stats dict per column), from a single aggregation query."""
+    lf = df.lazy()
+    schema = lf.collect_schema()
+    stats = collect(lf.select(summary_exprs(schema, approx))).row(0, named=True)
+
+    records = []
+    for col, dtype in schema.items():
+        top = stats.get(f"{col}:top")
+        value, freq = list(top.values()) if top else (None, None)
+        record = {
+            "column": col,
+            "type": "numeric" if dtype.is_numeric() else "text",
+            "count": stats[f"{col}:count"],
+            "mean": stats.get(f"{col}:mean"),
+            "std": stats.get(f"{col}:std"),
+            "min": stats.get(f"{col}:min"),
+            "max": stats.get(f"{col}:max"),
+            "unique": stats[f"{col}:unique"],
+            "top": value,
+            "top_count": freq,
+        }
+        if approx:
+            record["unique_approx"] = not dtype.is_nested()
+            if dtype.is_numeric():
+                record.update((quantile_name(q), stats[f"{col}:{quantile_name(q)}"]) for q in QUANTILES)
+        records.append(record)
+    return stats[":rows"], records
+
+
+def summarize_dataframe(df, approx=False):
+    """Summarize every column in one aggregation query evaluated by the Polars engine."""
+    n_rows, records = column_stats(df, approx)
+
     banner("SUMMARY STATISTICS")
-    summary = []
-
-    for col in df.columns:
-        dtype = df.schema[col]
-        data = df[col]
-        info = {"Column": col}
-
-        if dtype in (pl.Int8, pl.Int16, pl.Int32, pl.Int64,
-                     pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64,
-                     pl.Float32, pl.Float64):
-            desc = data.describe().to_dict(as_series=False)
-            for stat in desc:
-                info[stat] = desc[stat][0]
-        else:
-            non_nulls = [val for val in data.drop_nulls().to_list()
-                         if not isinstance(val, (dict, list, set))]
-            if non_nulls:
-                try:
-                    top_val, top_freq = Counter(non_nulls).most_common(1)[0]
-                except:
-                    top_val, top_freq = "Uncountable", 0
-                info.update({
-                    "count": len(non_nulls),
-                    "unique": len(set(non_nulls)),
-                    "top": f"{top_val} ({top_freq}x)"
-                })
-            else:
-                info.update({
-                    "count": 0,
-                    "unique": 0,
-                    "top": None
-                })
-
-        summary.append(info)
-
-    pd_summary = pd.DataFrame(summary)
-    print(pd_summary.to_string(index=False))
+    print(f"Final shape: {n_rows} rows × {len(records)} columns")
+
+    rows = []
+    for r in records:
+        row = {
+            "Column": r["column"],
+            "count": r["count"],
+            "mean": r["mean"],
+            "std": r["std"],
+            "min": r["min"],
+            "max": r["max"],
+            "unique": (f"~{r['unique']}" if r["unique_approx"] else str(r["unique"])) if approx else r["unique"],
+            "top": f"{r['top']} ({r['top_count']}x)" if r["top_count"] else None,
+        }
+        if approx:
+            row.update((quantile_name(q), r.get(quantile_name(q))) for q in QUANTILES)
+        rows.append(row)
+
+    schema = {
+        "Column": pl.Utf8, "count": pl.UInt32, "mean": pl.Float64, "std": pl.Float64,
+        "min": pl.Float64, "max": pl.Float64, "unique": pl.Utf8 if approx else pl.UInt32, "top": pl.Utf8,
+    }
+    if approx:
+        schema.update((quantile_name(q), pl.Float64) for q in QUANTILES)
+    summary = pl.DataFrame(rows, schema=schema, strict=False)
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, tbl_hide_dataframe_shape=True, fmt_str_lengths=40):
+        print(summary)
+
+
+def grouped_means(df, group_cols):
+    """Mean of every numeric column per group, as a DataFrame sorted by the group keys."""
+    lf = df.lazy()
+    numeric_cols = [c for c, t in lf.collect_schema().items() if t.is_numeric() and c not in group_cols]
+    return collect(lf.group_by(group_cols).agg(pl.col(numeric_cols).mean()).sort(group_cols))
+
+
+def summarize_file(file_path, group_by=None, cache=None, approx=False):
+    """
+    Non-interactive analysis of one CSV for batch use.
+
+    Returns a dict with the row count, detected JSON columns, one stats dict
+    per column and, when `group_by` is given, the grouped means as rows.
+    With `cache` (a FlatCache or True) the unpacked data is reused across runs;
+    `approx` switches to approximate distinct counts and adds quantiles.
+    """
+    cache = open_cache(cache)
+    if cache:
+        df, json_cols, _ = load_frame_cached(file_path, cache)
+        n_rows, records = column_stats(df, approx)
+    else:
+        lf = pl.scan_csv(file_path, infer_schema_length=10000)
+        json_cols = detect_json_columns(lf)
+        df = unpack_json_columns(lf, json_cols)
+        n_rows, records = column_stats(df, approx)
+    groups = grouped_means(df, list(group_by)).to_dicts() if group_by else None
+    return {"rows": n_rows, "non_flat": json_cols, "columns": records, "groups": groups}
 
 
 def main():
-    df = load_csv()
-    df=df[:10]
-    json_cols = detect_json_columns(df)
-    df = unpack_json_columns(df, json_cols)
-    summarize_dataframe(df)
+    parser = argparse.ArgumentParser(description="Polars CSV analyzer")
+    parser.add_argument("path", nargs="?", help="CSV file to analyze (file dialog if omitted)")
+    parser.add_argument("--preview", type=int, default=PREVIEW_ROWS,
+                        help=f"analyze only the first N rows (default {PREVIEW_ROWS}; 0 = whole file)")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse the unpacked data from the on-disk cache (the whole file is cached)")
+    parser.add_argument("--approx", action="store_true",
+                        help="approximate unique counts (HyperLogLog) plus p50/p90/p99")
+    args = parser.parse_args()
+
+    if args.cache:
+        file_path = choose_file(args.path)
+        banner("LOADING DATA")
+        df, json_cols, hit = load_frame_cached(file_path, open_cache(True))
+        print("Reused cached data." if hit else "Parsed file and cached the unpacked data.")
+        if args.preview > 0:
+            df = df.head(args.preview)
+        summarize_dataframe(df, args.approx)
+        return
+
+    lf = load_csv(args.path)
+    if args.preview > 0:
+        # pushed down into the scan: only the first N rows are ever read
+        lf = lf.head(args.preview)
+    json_cols = detect_json_columns(lf)
+    analyze(lf, json_cols, args.approx)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,45 @@
+import argparse
 import csv
-import ast
+import hashlib
+import io
 import math
 import os
-from collections import Counter, defaultdict
-from shutil import get_terminal_size
+import pickle
+import re
+import sys
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat
+
+from cell_parser import looks_structured, parse_cell
+from column_detect import describe, detect_in_rows
+from flat_cache import CACHE_DIR, open_cache
+from mmap_reader import MmapCSV
+from render import TableView, add_view_arguments, render_blocks, render_table
+from sketches import KLL, QUANTILES, HyperLogLog
+
+# Bounded per-column state for text values
+TOP_K = 64
+UNIQUE_LIMIT = 10000
+
+# Upper bound on the bytes a single worker chunk reads into memory
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# Incremental state lives next to the flat cache, not inside it, so cache eviction never sees it
+STATE_DIR = os.path.normpath(CACHE_DIR) + "-incremental"
+STATE_VERSION = 5
+
+# Rows sampled per file to decide each column's type
+SCHEMA_SAMPLE = 1000
+NUMERIC_KINDS = ("int", "float")
+
+# Characters a string accepted by float() can start with
+NUMERIC_LEAD = frozenset("0123456789+-.iInN \t\n\r\x0b\x0c")
+
+# A key missing from a row (e.g. a nested field only some rows have), as opposed to a blank cell
+ABSENT = object()
+ABSENT_CODE = -2
 
 
 def banner(text):
@@ -12,145 +48,1291 @@ def banner(text):
     print("—" * (len(text) + 4))
 
 
-def detect_structured_columns(path):
-    """Identify columns with JSON-like structure (not proper flat CSV)."""
-    with open(path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        first_row = next(reader, None)
-        if not first_row:
-            return []
-        return [col for col, val in first_row.items() if val and "{" in val and "}" in val]
+def read_rows(path):
+    """Yield raw CSV rows lazily; the file stays open only while iterating."""
+    # newline='' so "\r\n" inside quoted fields survives, as in read_chunk and the mmap reader
+    with open(path, encoding='utf-8', newline='') as raw:
+        yield from csv.DictReader(raw)
+
+
+def mmap_rows(path, columns=None):
+    """
+    read_rows() + flatten_row() through the memory-mapped tokenizer: header
+    keys are interned once and only rows holding dict-like cells are flattened.
+    """
+    with MmapCSV(path) as reader:
+        names = columns or reader.fieldnames
+        for fields in reader.records(columns):
+            row = dict(zip(names, fields))
+            yield flatten_row(row) if any(map(looks_structured, fields)) else row
+
+
+def detect_structured_columns(rows):
+    """
+    Identify columns with JSON-like structure (not proper flat CSV).
+
+    Samples a bounded number of rows with the shared detector and returns
+    ({column: confidence}, rows), where the returned iterator replays the
+    sampled rows, so later stages can keep consuming the same stream.
+    """
+    rows = iter(rows)
+    found, consumed = detect_in_rows(rows)
+    return found, chain(consumed, rows)
+
+
+def flatten_row(row):
+    """Flatten one CSV row, unpacking dict-like cells into extra columns."""
+    fused = {}
+    for label, val in row.items():
+        if looks_structured(val):
+            obj = parse_cell(val)
+            if isinstance(obj, dict):
+                for reg, stat in obj.items():
+                    if isinstance(stat, dict):
+                        for metric, number in stat.items():
+                            fused[f"{reg}_{metric}"] = number
+                    else:
+                        fused[f"{label}_{reg}"] = stat
+            else:
+                fused[label] = val
+        else:
+            fused[label] = val
+    return fused
+
+
+def unpack_rows(rows):
+    """Flatten a stream of raw rows, reporting progress as it goes."""
+    i = 0
+    for i, row in enumerate(rows, 1):
+        yield flatten_row(row)
+        if i % 200 == 0:
+            print(f"Processed {i} rows...")
+    print(f"\n Finished unpacking {i} rows.\n")
 
 
 def load_data_loose(path):
-    """Load and flatten rows with nested structures."""
-    with open(path, encoding='utf-8') as raw:
-        scan = csv.DictReader(raw)
-        basket = []
-        for i, row in enumerate(scan, 1):
-            fused = {}
-            for label, val in row.items():
-                if val and "{" in val and "}" in val:
-                    try:
-                        obj = ast.literal_eval(val)
-                        if isinstance(obj, dict):
-                            for reg, stat in obj.items():
-                                if isinstance(stat, dict):
-                                    for metric, number in stat.items():
-                                        fused[f"{reg}_{metric}"] = number
-                                else:
-                                    fused[f"{label}_{reg}"] = stat
-                        else:
-                            fused[label] = val
-                    except:
-                        fused[label] = val
-                else:
-                    fused[label] = val
-            basket.append(fused)
-            if i % 200 == 0:
-                print(f"Processed {i} rows...")
-        print(f"\n Finished unpacking {i} rows.\n")
-        return basket
+    """Lazily load and flatten rows with nested structures."""
+    return unpack_rows(read_rows(path))
+
+
+def sniff_kind(values):
+    """Decide 'int', 'float', 'text' or 'mixed' for a sample of non-empty values."""
+    ints = floats = texts = 0
+    for v in values:
+        try:
+            x = float(v)
+        except (TypeError, ValueError):
+            texts += 1
+            continue
+        if isinstance(v, int) or (isinstance(v, str) and x.is_integer() and "." not in v and "e" not in v.lower()):
+            ints += 1
+        else:
+            floats += 1
+    if texts and (ints or floats):
+        return "mixed"
+    if texts:
+        return "text"
+    return "float" if floats else "int"
+
+
+def infer_schema(rows, sample_size=SCHEMA_SAMPLE):
+    """
+    Sample the first rows of a stream once and cache a type per column.
+
+    Returns (schema, rows) where the returned iterator still yields the
+    sampled rows. Columns that were empty throughout the sample are left out
+    and keep the untyped path.
+    """
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    values = {}
+    for row in sample:
+        for k, v in row.items():
+            if v != '' and v is not None:
+                values.setdefault(k, []).append(v)
+    schema = {k: sniff_kind(vals) for k, vals in values.items()}
+    return schema, chain(sample, rows)
+
+
+def as_number(bit, kind=None):
+    """
+    float(bit), or None when the value is not numeric.
+
+    Columns cached as text skip the float() attempt, and the exception it
+    raises, for any cell that cannot possibly start a number.
+    """
+    if kind == "text" and bit.__class__ is str and bit:
+        lead = bit[0]
+        if lead not in NUMERIC_LEAD and not lead.isdecimal() and not lead.isspace():
+            return None
+    try:
+        return float(bit)
+    except (TypeError, ValueError):
+        return None
+
+
+def canonical_text(x):
+    """How a number is written when TableColumn needs no label for it: '12' for 12.0, else repr()."""
+    return "%d" % x if x.is_integer() else repr(x)
+
+
+def number_format(value):
+    """
+    Format that may rebuild a non-canonical number from its float: 'int' or
+    'float' for decoded JSON numbers, '%05d' for '02134', '%.2f' for '12.50';
+    None when there is no such format.
+    """
+    if value.__class__ in (int, float):
+        return value.__class__.__name__
+    m = re.fullmatch(r"-?\d+(?:\.(\d+))?", value) if value.__class__ is str else None
+    if m is None:
+        return None
+    return f"%.{len(m.group(1))}f" if m.group(1) is not None else f"%0{len(value)}d"
+
+
+def format_number(fmt, x):
+    """Inverse of number_format(): the value `fmt` writes for x."""
+    if fmt == "int":
+        return int(x)
+    if fmt == "float":
+        return x
+    return fmt % x
+
+
+def space_saving_add(heavy, value, top_k):
+    """Count `value` in a Space-Saving table holding at most `top_k` counters."""
+    if value in heavy:
+        heavy[value] += 1
+    elif len(heavy) < top_k:
+        heavy[value] = 1
+    else:
+        # the new value inherits the smallest counter
+        victim = min(heavy, key=heavy.get)
+        heavy[value] = heavy.pop(victim) + 1
+
+
+def space_saving_merge(left, right, top_k):
+    """Merge two Space-Saving tables by summing counters and keeping the top_k."""
+    heavy = dict(left)
+    for value, hits in right.items():
+        heavy[value] = heavy.get(value, 0) + hits
+    if len(heavy) > top_k:
+        keep = sorted(heavy, key=heavy.get, reverse=True)[:top_k]
+        heavy = {value: heavy[value] for value in keep}
+    return heavy
+
+
+class ColumnAccumulator:
+    """
+    Constant-memory running stats for one column.
+
+    Numbers go through Welford's update (mean/M2) plus a running min/max.
+    Text values are tracked with a Space-Saving heavy-hitter table of at most
+    `top_k` counters, and distinct values are counted exactly up to
+    `unique_limit` before the count is reported as a lower bound.
+
+    `kind` is the cached column type from infer_schema; a value that
+    contradicts it demotes the column to 'mixed'.
+
+    With `approx`, distinct text values go into a HyperLogLog instead of the
+    exact set and numbers also feed a KLL sketch for quantiles, so the
+    state stays the same size whatever the column's cardinality.
+    """
+
+    def __init__(self, top_k=TOP_K, unique_limit=UNIQUE_LIMIT, kind=None, approx=False):
+        self.kind = kind
+        self.missing = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = None
+        self.high = None
+        self.text_count = 0
+        self.top_k = top_k
+        self.heavy = {}
+        self.unique_limit = unique_limit
+        self.seen = set()
+        self.unique_overflow = False
+        self.hll = HyperLogLog() if approx else None
+        self.kll = KLL() if approx else None
+
+    def add(self, bit):
+        if bit == '' or bit is None:
+            self.missing += 1
+            return
+        x = as_number(bit, self.kind)
+        if x is None:
+            if self.kind in NUMERIC_KINDS:
+                self.kind = "mixed"
+            self.add_text(str(bit))
+        else:
+            if self.kind == "text":
+                self.kind = "mixed"
+            self.add_number(x)
+
+    def add_number(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if self.low is None or x < self.low:
+            self.low = x
+        if self.high is None or x > self.high:
+            self.high = x
+        if self.kll is not None:
+            self.kll.add(x)
+
+    def add_text(self, text):
+        self.text_count += 1
+
+        if self.hll is not None:
+            self.hll.add(text)
+        elif not self.unique_overflow:
+            self.seen.add(text)
+            if len(self.seen) > self.unique_limit:
+                self.seen = set()
+                self.unique_overflow = True
 
+        space_saving_add(self.heavy, text, self.top_k)
 
-def side_by_side_stats(col_stats):
-    """Display numeric stats in side-by-side format."""
-    headers = ["Column", "Count", "Mean", "Min", "Max", "StdDev"]
-    col_width = max(len(h) for h in headers) + 2
-    row_format = "".join([f"{{:<{col_width}}}" for _ in headers])
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.count) if self.count > 1 else 0
 
-    print("\n" + "=" * get_terminal_size((80, 20)).columns)
-    print(row_format.format(*headers))
-    print("-" * get_terminal_size((80, 20)).columns)
+    @property
+    def cells(self):
+        return self.count + self.text_count + self.missing
 
-    for stat in col_stats:
-        print(row_format.format(*stat))
+    @property
+    def null_rate(self):
+        """Percentage of the cells seen that were blank (or absent, once fill_absent() ran)."""
+        cells = self.cells
+        return 100 * self.missing / cells if cells else 0.0
 
+    @property
+    def unique(self):
+        if self.hll is not None:
+            return f"~{round(self.hll.count())}"
+        if self.unique_overflow:
+            return f"{self.unique_limit}+"
+        return len(self.seen)
 
-def messy_stats(stack):
-    column_map = defaultdict(list)
+    def quantiles(self, qs=QUANTILES):
+        """Approximate quantiles of the numbers seen (approx mode only), else None."""
+        if self.kll is None or not self.kll.n:
+            return None
+        return self.kll.quantiles(qs)
 
-    for doc in stack:
+    def top(self):
+        """Most frequent text value and its (upper-bound) count."""
+        value = max(self.heavy, key=self.heavy.get)
+        return value, self.heavy[value]
+
+    def merge(self, other):
+        """Fold another accumulator for the same column into this one."""
+        if self.kind != other.kind:
+            self.kind = "mixed" if self.kind and other.kind else self.kind or other.kind
+        if other.count:
+            n = self.count + other.count
+            delta = other.mean - self.mean
+            # Chan et al. parallel variance merge
+            self.m2 += other.m2 + delta * delta * self.count * other.count / n
+            self.mean += delta * other.count / n
+            self.count = n
+            if self.low is None or other.low < self.low:
+                self.low = other.low
+            if self.high is None or other.high > self.high:
+                self.high = other.high
+
+        self.missing += other.missing
+        self.text_count += other.text_count
+
+        if self.kll is not None and other.kll is not None:
+            self.kll.merge(other.kll)
+        if self.hll is not None and other.hll is not None:
+            self.hll.merge(other.hll)
+        elif self.unique_overflow or other.unique_overflow:
+            self.seen = set()
+            self.unique_overflow = True
+        else:
+            self.seen |= other.seen
+            if len(self.seen) > self.unique_limit:
+                self.seen = set()
+                self.unique_overflow = True
+
+        self.heavy = space_saving_merge(self.heavy, other.heavy, self.top_k)
+        return self
+
+
+class ColumnMap(dict):
+    """Column name -> ColumnAccumulator, plus how many rows the accumulators were fed."""
+
+    def __init__(self, *args, rows=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rows = rows
+
+
+def fill_absent(columns, rows):
+    """
+    Count each column as missing in the rows that did not have its key (a
+    nested field only some rows carry), so null rates are over all rows
+    whichever path built the map, as they are for a ColumnarTable.
+    """
+    columns = columns if isinstance(columns, ColumnMap) else ColumnMap(columns)
+    columns.rows = rows
+    for acc in columns.values():
+        acc.missing += rows - acc.cells
+    return columns
+
+
+def column_stats(stack, schema=None, approx=False):
+    """Feed rows one at a time into per-column accumulators."""
+    schema = schema or {}
+    columns = {}
+    rows = 0
+    for rows, doc in enumerate(stack, 1):
         for slot, token in doc.items():
-            column_map[slot].append(token)
+            acc = columns.get(slot)
+            if acc is None:
+                acc = columns[slot] = ColumnAccumulator(kind=schema.get(slot), approx=approx)
+            acc.add(token)
+    return fill_absent(columns, rows)
+
+
+def mmap_column_stats(path, schema=None, columns=None, approx=False):
+    """
+    column_stats() fed straight from the memory-mapped tokenizer.
+
+    Rows without dict-like cells go field by field into accumulators looked
+    up by position, so no per-row dict is built; only `columns` (default:
+    all) are decoded at all.
+    """
+    schema = schema or {}
+    stats = {}
+    rows = 0
+    with MmapCSV(path) as reader:
+        names = columns or reader.fieldnames
+        slots = [None] * len(names)
+        for rows, fields in enumerate(reader.records(columns), 1):
+            if any(map(looks_structured, fields)):
+                for slot, token in flatten_row(dict(zip(names, fields))).items():
+                    acc = stats.get(slot)
+                    if acc is None:
+                        acc = stats[slot] = ColumnAccumulator(kind=schema.get(slot), approx=approx)
+                    acc.add(token)
+                continue
+            for i, token in enumerate(fields):
+                acc = slots[i]
+                if acc is None:
+                    acc = stats.get(names[i])
+                    if acc is None:
+                        acc = stats[names[i]] = ColumnAccumulator(kind=schema.get(names[i]), approx=approx)
+                    slots[i] = acc
+                acc.add(token)
+    return fill_absent(stats, rows)
+
+
+def merge_column_stats(parts):
+    """Merge per-chunk ColumnMaps, keeping first-seen column order; a column a chunk lacked is missing there."""
+    merged = {}
+    rows = 0
+    for part in parts:
+        rows += part.rows
+        for slot, acc in part.items():
+            if slot in merged:
+                merged[slot].merge(acc)
+            else:
+                merged[slot] = acc
+    return fill_absent(merged, rows)
+
+
+def split_records(path, parts, block_size=1 << 20):
+    """
+    Split a CSV file into byte ranges that start and end on record boundaries.
+
+    Returns (header_end, ranges). A newline only ends a record when the number
+    of double quotes before it is even, so quoted fields containing newlines
+    (and escaped "" quotes) never straddle two chunks.
+    """
+    size = os.path.getsize(path)
+    targets = iter([size * k // parts for k in range(1, parts)])
+    want = 0  # first boundary wanted: the end of the header record
+    cuts = []
+    quoted = False
+    pos = 0
+
+    with open(path, 'rb') as f:
+        while want is not None:
+            block = f.read(block_size)
+            if not block:
+                break
+            i = 0
+            while want is not None and want - pos < len(block):
+                start = max(i, want - pos)
+                quoted ^= block.count(b'"', i, start) & 1
+                i = start
+                j = block.find(b'\n', i)
+                while j != -1:
+                    quoted ^= block.count(b'"', i, j) & 1
+                    i = j + 1
+                    if not quoted:
+                        break
+                    j = block.find(b'\n', i)
+                if j == -1:
+                    break
+                cut = pos + i
+                cuts.append(cut)
+                want = next((t for t in targets if t >= cut), None)
+            quoted ^= block.count(b'"', i) & 1
+            pos += len(block)
+
+    header_end = cuts[0] if cuts else size
+    bounds = [header_end] + [c for c in cuts[1:] if c < size] + [size]
+    ranges = [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+    return header_end, ranges
+
+
+def read_chunk(path, start, end, fieldnames):
+    """Flattened rows for the records in one byte range."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    rows = csv.DictReader(io.StringIO(data.decode('utf-8'), newline=''), fieldnames=fieldnames)
+    return map(flatten_row, rows)
+
+
+def summarize_chunk(path, start, end, fieldnames, schema=None, approx=False):
+    """Flatten and summarize the records in one byte range (worker entry point)."""
+    return column_stats(read_chunk(path, start, end, fieldnames), schema, approx)
+
+
+def group_chunk(path, start, end, fieldnames, group_keys, aggs, schema=None):
+    """Partial hash aggregate for one byte range (worker entry point)."""
+    return HashAggregator(group_keys, aggs, schema).update(read_chunk(path, start, end, fieldnames))
+
+
+def map_chunks(path, workers, worker, *extra):
+    """Run `worker` over record-aligned chunks in a process pool, in file order."""
+    size = os.path.getsize(path)
+    parts = max(workers, -(-size // CHUNK_BYTES))
+    header_end, ranges = split_records(path, parts)
+
+    with open(path, 'rb') as f:
+        header = f.read(header_end).decode('utf-8')
+    fieldnames = next(csv.reader(io.StringIO(header, newline='')), [])
+
+    starts = [a for a, _ in ranges]
+    ends = [b for _, b in ranges]
+    fixed = [repeat(arg) for arg in extra]
+
+    print(f" Processing {len(ranges)} chunks with {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(worker, repeat(path), starts, ends, repeat(fieldnames), *fixed)
+
+
+def parallel_column_stats(path, workers, schema=None, approx=False):
+    """Summarize a CSV with a process pool and merge the partial accumulators."""
+    return merge_column_stats(map_chunks(path, workers, summarize_chunk, schema, approx))
+
+
+def parallel_group_data(path, group_keys, workers, aggs=("mean",), schema=None):
+    """Group a CSV with a process pool, merging the per-chunk partial aggregates."""
+    merged = HashAggregator(group_keys, aggs, schema)
+    for part in map_chunks(path, workers, group_chunk, group_keys, aggs, schema):
+        merged.merge(part)
+    return merged.results()
+
+
+def record_ranges(path, start, step=CHUNK_BYTES, block_size=1 << 20):
+    """
+    Record-aligned byte ranges of at least `step` bytes (cut at block
+    granularity) from `start` to the end of the last complete
+    (newline-terminated) record.
+
+    Returns (ranges, tail): `tail` is the byte range of a trailing record
+    without its newline (a file that does not end in one, or a record a
+    writer is still appending), or None.
+    """
+    cuts = [start]
+    last = start
+    quoted = False
+    pos = start
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            if not quoted and b'"' not in block:
+                # no quotes: every newline ends a record
+                j = block.rfind(b'\n')
+                if j != -1:
+                    last = pos + j + 1
+            else:
+                i = 0
+                j = block.find(b'\n')
+                while j != -1:
+                    quoted ^= block.count(b'"', i, j) & 1
+                    i = j + 1
+                    if not quoted:
+                        last = pos + i
+                    j = block.find(b'\n', i)
+                quoted ^= block.count(b'"', i) & 1
+            if last - cuts[-1] >= step:
+                cuts.append(last)
+            pos += len(block)
+
+    if last > cuts[-1]:
+        cuts.append(last)
+    return list(zip(cuts, cuts[1:])), ((last, pos) if pos > last else None)
+
+
+def hash_bytes(path, start, end, h=None, block_size=1 << 20):
+    """Extend blake2b `h` (a fresh one by default) with bytes [start, end) of the file."""
+    h = h or hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        left = end - start
+        while left > 0:
+            block = f.read(min(block_size, left))
+            if not block:
+                break
+            h.update(block)
+            left -= len(block)
+    return h
+
+
+def state_file_for(path):
+    digest = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+    return os.path.join(STATE_DIR, f"{digest}.pkl")
+
+
+def load_state(state_path, path, approx=False):
+    """
+    Saved incremental state if it still describes a prefix of `path`, else (None, reason).
 
+    The whole prefix is hashed (hashing is far cheaper than parsing it
+    again), so a rewrite anywhere before the offset is caught; the hash
+    object is handed on under "hasher" to be extended with the new bytes.
+    """
+    try:
+        with open(state_path, 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None, "no saved state"
+    if state.get("version") != STATE_VERSION:
+        return None, "state from another version"
+    if state.get("approx") != approx:
+        return None, "state saved with a different --approx setting"
+    if os.path.getsize(path) < state["offset"]:
+        return None, "file shrank"
+    hasher = hash_bytes(path, 0, state["offset"])
+    if hasher.hexdigest() != state["prefix"]:
+        return None, "already-processed bytes changed"
+    state["hasher"] = hasher
+    return state, None
+
+
+def incremental_column_stats(path, state_path=None, workers=1, approx=False):
+    """
+    Column stats for an append-only CSV, reading only bytes added since the last run.
+
+    The merged accumulators, the byte offset of the last complete record and
+    a hash of everything before it are saved after each run. If the
+    fingerprint no longer matches (the file was rewritten, not appended to),
+    the saved state is discarded and the file is summarized from the start.
+    A last record without its newline is summarized but kept out of the
+    state, so the next run reads it again, complete or not.
+    Returns (column map, short description of what was done).
+    """
+    state_path = state_path or state_file_for(path)
+    state, reason = load_state(state_path, path, approx)
+
+    if state is None:
+        header_end, _ = split_records(path, 1)
+        with open(path, 'rb') as f:
+            header = f.read(header_end).decode('utf-8')
+        fieldnames = next(csv.reader(io.StringIO(header, newline='')), [])
+        start, columns = header_end, ColumnMap()
+        # only the sampled head of the file is read here
+        schema, _ = infer_schema(map(flatten_row, read_rows(path)))
+    else:
+        fieldnames, schema, start = state["fieldnames"], state["schema"], state["offset"]
+        columns = ColumnMap(rows=state["rows"])
+        for name, fields in state["columns"].items():
+            acc = columns[name] = ColumnAccumulator()
+            acc.__dict__.update(fields)
+
+    ranges, tail = record_ranges(path, start)
+    if workers > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(summarize_chunk, repeat(path), [a for a, _ in ranges],
+                                  [b for _, b in ranges], repeat(fieldnames), repeat(schema), repeat(approx)))
+    else:
+        parts = [summarize_chunk(path, a, b, fieldnames, schema, approx) for a, b in ranges]
+    columns = merge_column_stats([columns] + parts)
+
+    end = ranges[-1][1] if ranges else start
+    hasher = state["hasher"] if state else hash_bytes(path, 0, start)
+    os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+    tmp = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump({
+            "version": STATE_VERSION,
+            "approx": approx,
+            "offset": end,
+            "prefix": hash_bytes(path, start, end, hasher).hexdigest(),
+            "fieldnames": fieldnames,
+            "schema": schema,
+            "rows": columns.rows,
+            "columns": {name: vars(acc) for name, acc in columns.items()},
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, state_path)
+
+    if state is None:
+        note = f"Full pass ({reason}): {end - start} bytes summarized"
+    else:
+        note = f"Resumed at byte {start}: {end - start} new bytes summarized"
+    if tail:
+        columns = merge_column_stats([columns, summarize_chunk(path, *tail, fieldnames, schema, approx)])
+        note += f"; {tail[1] - tail[0]} trailing bytes without a newline summarized, re-read next run"
+    return columns, note
+
+
+def side_by_side_stats(col_stats, headers=None, view=None):
+    """Display numeric stats in side-by-side format (one buffered write, sorted/paged by `view`)."""
+    headers = headers or ["Column", "Count", "Null%", "Mean", "Min", "Max", "StdDev"]
+    render_table(headers, col_stats, view)
+
+
+def messy_stats(stack, schema=None, approx=False, view=None):
+    if isinstance(stack, ColumnarTable):
+        print_column_stats(table_column_stats(stack, approx=approx), view)
+    else:
+        print_column_stats(column_stats(stack, schema, approx), view)
+
+
+def print_column_stats(column_map, view=None):
+    """Render numeric and text summaries from a map of column accumulators."""
+    view = view or TableView()
     print(f"\n Total Columns: {len(column_map)}")
+    if view.quiet:
+        return
 
     numeric_summary = []
     text_summary = []
+    headers = ["Column", "Count", "Null%", "Mean", "Min", "Max", "StdDev"]
+    with_quantiles = any(acc.quantiles() for acc in column_map.values())
+    if with_quantiles:
+        headers += [f"P{round(q * 100)}" for q in QUANTILES]
 
-    for head, bag in column_map.items():
-        nums = []
-        texts = []
-
-        for bit in bag:
-            try:
-                nums.append(float(bit))
-            except:
-                if bit not in ('', None):
-                    texts.append(str(bit))
-
-        if nums:
-            c = len(nums)
-            m = sum(nums) / c
-            s = math.sqrt(sum((x - m) ** 2 for x in nums) / c) if c > 1 else 0
-            numeric_summary.append([head, str(c), f"{m:.2f}", str(min(nums)), str(max(nums)), f"{s:.2f}"])
-        elif texts:
-            cluster = Counter(texts)
-            common = cluster.most_common(1)[0]
-            text_summary.append((head, len(texts), len(cluster), f"{common[0]} ({common[1]}x)"))
+    for head, acc in column_map.items():
+        if acc.count:
+            row = [head, acc.count, acc.null_rate, acc.mean, acc.low, acc.high, acc.std]
+            if with_quantiles:
+                row += acc.quantiles() or [None] * len(QUANTILES)
+            numeric_summary.append(row)
+        elif acc.text_count:
+            common = acc.top()
+            text_summary.append((head, acc.text_count, acc.null_rate, acc.unique, f"{common[0]} ({common[1]}x)"))
 
     if numeric_summary:
         banner(" NUMERIC SUMMARY")
-        side_by_side_stats(numeric_summary)
+        side_by_side_stats(numeric_summary, headers, view)
 
     if text_summary:
         banner(" TEXT COLUMNS")
-        for head, count, uniq, top in text_summary:
-            print(f"\n {head}")
-            print(f" ↳ Count: {count}")
-            print(f" ↳ Unique: {uniq}")
-            print(f" ↳ Top: {top}")
+        render_blocks(["Count", "Null%", "Unique", "Top"], text_summary, view)
+
+
+def column_records(column_map):
+    """One plain dict per column from a map of accumulators, for machine-readable output."""
+    records = []
+    for head, acc in column_map.items():
+        if acc.count:
+            record = {"column": head, "type": "numeric", "count": acc.count, "mean": acc.mean,
+                      "std": acc.std, "min": acc.low, "max": acc.high}
+            if acc.quantiles():
+                record.update(zip([f"p{round(q * 100)}" for q in QUANTILES], acc.quantiles()))
+            records.append(record)
+        elif acc.text_count:
+            value, freq = acc.top()
+            record = {"column": head, "type": "text", "count": acc.text_count, "top": value, "top_count": freq}
+            if acc.hll is not None:
+                record.update(unique=round(acc.hll.count()), unique_approx=True)
+            else:
+                record.update(unique=len(acc.seen) if not acc.unique_overflow else acc.unique_limit,
+                              unique_capped=acc.unique_overflow)
+            records.append(record)
+    return records
+
+
+class AggState:
+    """
+    Mergeable partial aggregate for one (group, column) pair.
+
+    Holds a running sum/count/min/max of the numeric values, a bounded
+    Space-Saving table for the mode, and the first value seen as a last
+    resort for columns that are entirely empty.
+    """
+
+    __slots__ = ("total", "count", "low", "high", "filled", "heavy", "first")
+
+    def __init__(self, first=None):
+        self.total = 0.0
+        self.count = 0
+        self.low = None
+        self.high = None
+        self.filled = 0
+        self.heavy = {}
+        self.first = first
+
+    def add(self, v, track_numbers=False, kind=None, top_k=TOP_K):
+        if v == '' or v is None:
+            return
+        x = as_number(v, kind)
+        if x is None:
+            self.add_text(str(v), top_k)
+        else:
+            self.add_number(x, str(v) if track_numbers else None, top_k)
+
+    def add_number(self, x, label=None, top_k=TOP_K):
+        """Count an already converted number; `label` also feeds the mode."""
+        self.filled += 1
+        self.total += x
+        self.count += 1
+        if self.low is None or x < self.low:
+            self.low = x
+        if self.high is None or x > self.high:
+            self.high = x
+        if label is not None:
+            space_saving_add(self.heavy, label, top_k)
+
+    def add_text(self, text, top_k=TOP_K):
+        self.filled += 1
+        space_saving_add(self.heavy, text, top_k)
+
+    def merge(self, other, top_k=TOP_K):
+        self.total += other.total
+        self.count += other.count
+        if other.low is not None and (self.low is None or other.low < self.low):
+            self.low = other.low
+        if other.high is not None and (self.high is None or other.high > self.high):
+            self.high = other.high
+        self.filled += other.filled
+        self.heavy = space_saving_merge(self.heavy, other.heavy, top_k)
+        if self.first in ('', None):
+            self.first = other.first
+        return self
+
+    def mode(self):
+        if self.heavy:
+            return max(self.heavy, key=self.heavy.get)
+        return self.first
+
+    def result(self, func):
+        if func == "count":
+            return self.filled
+        if func == "mode":
+            return self.mode()
+        if not self.count:
+            # non-numeric column: numeric aggregates fall back to the mode
+            return self.mode()
+        if func == "mean":
+            return round(self.total / self.count, 2)
+        if func == "sum":
+            return round(self.total, 2)
+        if func == "min":
+            return self.low
+        if func == "max":
+            return self.high
+        raise ValueError(f"Unknown aggregate: {func}")
+
+
+AGG_FUNCS = ("mean", "sum", "min", "max", "count", "mode")
+
+
+class HashAggregator:
+    """
+    Hash aggregation over a row stream: one AggState per (group, column).
+
+    Only the running state is kept, never the rows. Two aggregators built
+    over different parts of a file can be merged, which is how chunked and
+    parallel runs are combined.
+    """
+
+    def __init__(self, group_keys, aggs=("mean",), schema=None):
+        unknown = [a for a in aggs if a not in AGG_FUNCS]
+        if unknown:
+            raise ValueError(f"Unknown aggregate(s): {', '.join(unknown)}")
+        self.group_keys = list(group_keys)
+        self.aggs = tuple(aggs)
+        self.track_numbers = "mode" in self.aggs
+        self.schema = schema or {}
+        self.groups = {}
+
+    def add(self, row):
+        key = tuple(row.get(col, "MISSING") for col in self.group_keys)
+        bucket = self.groups.get(key)
+        if bucket is None:
+            bucket = self.groups[key] = {}
+        for k, v in row.items():
+            if k in self.group_keys:
+                continue
+            state = bucket.get(k)
+            if state is None:
+                state = bucket[k] = AggState(v)
+            state.add(v, self.track_numbers, self.schema.get(k))
+
+    def update(self, rows):
+        for row in rows:
+            self.add(row)
+        return self
+
+    def merge(self, other):
+        for key, bucket in other.groups.items():
+            mine = self.groups.get(key)
+            if mine is None:
+                self.groups[key] = bucket
+                continue
+            for k, state in bucket.items():
+                if k in mine:
+                    mine[k].merge(state)
+                else:
+                    mine[k] = state
+        return self
+
+    def results(self):
+        """One output row per group; columns are suffixed when several aggs are asked for."""
+        single = len(self.aggs) == 1
+        reduced = []
+        for key, bucket in self.groups.items():
+            agg_row = dict(zip(self.group_keys, key))  # Group columns
+            for k, state in bucket.items():
+                for func in self.aggs:
+                    agg_row[k if single else f"{k}_{func}"] = state.result(func)
+            reduced.append(agg_row)
+        return reduced
+
+
+def group_data(data, group_keys, aggs=("mean",), schema=None):
+    """Aggregate a row stream (or a ColumnarTable) per group without holding the rows themselves."""
+    if isinstance(data, ColumnarTable):
+        return group_table(data, group_keys, aggs).results()
+    return HashAggregator(group_keys, aggs, schema).update(data).results()
+
+
+class TableColumn:
+    """
+    One column of a ColumnarTable.
+
+    Numbers live in an array('d'), text is dictionary-encoded as int codes
+    into a string table, and a bitmap marks which cells are present. A column
+    only grows the arrays it needs; in a column holding both kinds, code -1
+    marks a numeric cell and 0.0 fills the number slot of a text cell.
 
+    Grouping needs each cell's original value. Numbers not written the
+    canonical way ('02134', '4854.0') are rebuilt from the array through one
+    format per column, `fmt` (see number_format), with a bit in `formatted`
+    per cell. Cells no format rebuilds (True, numbers written another way
+    than the column's first one), blanks other than '' and keys absent from
+    the row get a code in `labels` into the `originals` table instead.
+    """
 
-def group_data(data, group_keys):
-    grouped = defaultdict(list)
+    __slots__ = ("kind", "length", "missing", "valid", "numbers", "codes", "strings", "lookup",
+                 "labels", "originals", "original_lookup", "fmt", "formatted")
 
-    for row in data:
-        key = tuple(row.get(col, "MISSING") for col in group_keys)
-        grouped[key].append(row)
+    def __init__(self, kind=None):
+        self.kind = kind
+        self.length = 0
+        self.missing = 0
+        self.valid = bytearray()
+        self.numbers = None
+        self.codes = None
+        self.strings = []
+        self.lookup = {}
+        self.labels = None
+        self.originals = []
+        self.original_lookup = {}
+        self.fmt = None
+        self.formatted = None
 
-    reduced = []
+    def _label(self, i, value):
+        """Remember the original value of cell i (ABSENT for a key the row did not have)."""
+        if self.labels is None:
+            self.labels = array('l', [-1]) * i
+        if value is ABSENT:
+            self.labels.append(ABSENT_CODE)
+            return
+        key = (value.__class__, value)  # keeps True, 1 and 1.0 apart
+        code = self.original_lookup.get(key)
+        if code is None:
+            code = self.original_lookup[key] = len(self.originals)
+            self.originals.append(value)
+        self.labels.append(code)
 
-    for key, group_rows in grouped.items():
-        agg_row = dict(zip(group_keys, key))  # Group columns
+    def _format(self, i, value, x):
+        """Flag cell i as rebuilt by the column format; False when the format can't rebuild `value`."""
+        if self.fmt is None:
+            self.fmt = number_format(value)
+        if self.fmt is None:
+            return False
+        rebuilt = format_number(self.fmt, x)
+        if rebuilt.__class__ is not value.__class__ or rebuilt != value:
+            return False
+        if self.formatted is None:
+            self.formatted = bytearray()
+        if len(self.formatted) <= i >> 3:
+            self.formatted.extend(bytes((i >> 3) + 1 - len(self.formatted)))
+        self.formatted[i >> 3] |= 1 << (i & 7)
+        return True
 
-        temp_bucket = defaultdict(list)
-        for row in group_rows:
-            for k, v in row.items():
-                if k not in group_keys:
-                    temp_bucket[k].append(v)
+    def is_formatted(self, i):
+        f = self.formatted
+        return f is not None and i >> 3 < len(f) and f[i >> 3] >> (i & 7) & 1
 
-        for k, vals in temp_bucket.items():
-            try:
-                numeric_vals = [float(x) for x in vals if isinstance(x, (int, float)) or str(x).replace('.', '', 1).isdigit()]
-                if numeric_vals:
-                    agg_row[k] = round(sum(numeric_vals) / len(numeric_vals), 2)
+    def append(self, value):
+        i = self.length
+        if not i & 7:
+            self.valid.append(0)
+        self.length = i + 1
+
+        if value == '' or value is None or value is ABSENT:
+            self.missing += 1
+            if self.numbers is not None:
+                self.numbers.append(0.0)
+            if self.codes is not None:
+                self.codes.append(-1)
+            if value != '':
+                self._label(i, value)
+            elif self.labels is not None:
+                self.labels.append(-1)
+            return
+
+        self.valid[i >> 3] |= 1 << (i & 7)
+        x = as_number(value, self.kind)
+        if (x is not None and (value.__class__ is not str or value != canonical_text(x))
+                and not self._format(i, value, x)):
+            self._label(i, value)
+        elif self.labels is not None:
+            self.labels.append(-1)
+        if x is None:
+            text = str(value)
+            code = self.lookup.get(text)
+            if code is None:
+                code = self.lookup[text] = len(self.strings)
+                self.strings.append(text)
+            if self.codes is None:
+                self.codes = array('l', [-1]) * i
+            self.codes.append(code)
+            if self.numbers is not None:
+                self.numbers.append(0.0)
+        else:
+            if self.numbers is None:
+                self.numbers = array('d', [0.0]) * i
+            self.numbers.append(x)
+            if self.codes is not None:
+                self.codes.append(-1)
+
+    def is_valid(self, i):
+        return self.valid[i >> 3] >> (i & 7) & 1
+
+    def value(self, i):
+        """Decoded cell i: a float, a string, or None when missing."""
+        if not self.is_valid(i):
+            return None
+        if self.codes is not None and self.codes[i] >= 0:
+            return self.strings[self.codes[i]]
+        return self.numbers[i]
+
+    def original(self, i):
+        """Cell i as the row held it: the CSV text (or decoded JSON value), '' when blank, ABSENT when missing."""
+        code = self.labels[i] if self.labels is not None else -1
+        if code >= 0:
+            return self.originals[code]
+        if code == ABSENT_CODE:
+            return ABSENT
+        if not self.is_valid(i):
+            return ''
+        if self.codes is not None and self.codes[i] >= 0:
+            return self.strings[self.codes[i]]
+        if self.is_formatted(i):
+            return format_number(self.fmt, self.numbers[i])
+        return canonical_text(self.numbers[i])
+
+    def numeric_values(self):
+        """Present numbers; the array itself when the column is dense and purely numeric."""
+        if self.numbers is None:
+            return array('d')
+        if self.codes is None and not self.missing:
+            return self.numbers
+        codes = self.codes
+        return array('d', (x for i, x in enumerate(self.numbers)
+                           if self.is_valid(i) and (codes is None or codes[i] < 0)))
+
+    def code_counts(self):
+        """Counter of string codes over the present text cells."""
+        if self.codes is None:
+            return Counter()
+        counts = Counter(self.codes)
+        counts.pop(-1, None)
+        return counts
+
+    def nbytes(self):
+        """Bytes held by the column: arrays, string and original tables, their lookup dicts and entries."""
+        size = sum(sys.getsizeof(part) for part in (self.valid, self.numbers, self.codes, self.labels, self.formatted)
+                   if part is not None)
+        size += sys.getsizeof(self.strings) + sys.getsizeof(self.lookup)
+        size += sum(sys.getsizeof(s) for s in self.strings) + sum(sys.getsizeof(c) for c in self.lookup.values())
+        size += sys.getsizeof(self.originals) + sys.getsizeof(self.original_lookup)
+        for key, code in self.original_lookup.items():
+            size += sys.getsizeof(key) + sys.getsizeof(key[1]) + sys.getsizeof(code)
+        return size
+
+
+class ColumnarTable:
+    """
+    Compact in-memory table for the pure-Python analyzer: one TableColumn
+    per column instead of one dict per row. Columns that first appear
+    part-way through (e.g. keys of a later nested cell) are back-filled as
+    missing.
+    """
+
+    def __init__(self, schema=None):
+        self.schema = schema or {}
+        self.columns = {}
+        self.nrows = 0
+
+    def append_row(self, row):
+        self.append_values(row, row.values())
+
+    def append_values(self, names, values):
+        """append_row() for parallel name/value sequences, without building a dict."""
+        n = self.nrows
+        for name, value in zip(names, values):
+            col = self.columns.get(name)
+            if col is None:
+                col = self.columns[name] = TableColumn(self.schema.get(name))
+                for _ in range(n):
+                    col.append(ABSENT)
+            col.append(value)
+        self.nrows = n + 1
+        if len(names) < len(self.columns):
+            for col in self.columns.values():
+                if col.length < self.nrows:
+                    col.append(ABSENT)
+
+    @classmethod
+    def from_rows(cls, rows, schema=None):
+        table = cls(schema)
+        for row in rows:
+            table.append_row(row)
+        return table
+
+    @classmethod
+    def from_mmap(cls, path, schema=None, columns=None):
+        """Build the table straight from the memory-mapped tokenizer (see mmap_column_stats)."""
+        table = cls(schema)
+        with MmapCSV(path) as reader:
+            names = columns or reader.fieldnames
+            for fields in reader.records(columns):
+                if any(map(looks_structured, fields)):
+                    table.append_row(flatten_row(dict(zip(names, fields))))
                 else:
-                    agg_row[k] = Counter([str(v) for v in vals if v not in ('', None)]).most_common(1)[0][0]
-            except:
-                agg_row[k] = vals[0]
+                    table.append_values(names, fields)
+        return table
+
+    def nbytes(self):
+        return sys.getsizeof(self.columns) + sum(col.nbytes() for col in self.columns.values())
+
+    def state(self):
+        """Plain-data snapshot (builtins and arrays only), safe to pickle from any entry point."""
+        return {
+            "schema": self.schema,
+            "nrows": self.nrows,
+            "columns": {name: {slot: getattr(col, slot) for slot in TableColumn.__slots__}
+                        for name, col in self.columns.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        table = cls(state["schema"])
+        table.nrows = state["nrows"]
+        for name, slots in state["columns"].items():
+            col = table.columns[name] = TableColumn()
+            for slot, value in slots.items():
+                setattr(col, slot, value)
+        return table
+
+
+def table_column_stats(table, top_k=TOP_K, unique_limit=UNIQUE_LIMIT, approx=False):
+    """Column accumulators computed in bulk from a ColumnarTable's arrays."""
+    columns = ColumnMap(rows=table.nrows)
+    for name, col in table.columns.items():
+        acc = ColumnAccumulator(top_k, unique_limit, col.kind, approx)
+        acc.missing = col.missing
+
+        nums = col.numeric_values()
+        if nums:
+            acc.count = len(nums)
+            acc.mean = math.fsum(nums) / acc.count
+            acc.m2 = math.fsum((x - acc.mean) ** 2 for x in nums)
+            acc.low = min(nums)
+            acc.high = max(nums)
+            if approx:
+                acc.kll.update(nums)
+
+        counts = col.code_counts()
+        if counts:
+            acc.text_count = sum(counts.values())
+            acc.heavy = {col.strings[code]: hits for code, hits in counts.most_common(top_k)}
+            if approx:
+                for code in counts:
+                    acc.hll.add(col.strings[code])
+            elif len(counts) > unique_limit:
+                acc.unique_overflow = True
+            else:
+                acc.seen = {col.strings[code] for code in counts}
+
+        columns[name] = acc
+    return columns
 
-        reduced.append(agg_row)
 
-    return reduced
+def group_table(table, group_keys, aggs=("mean",)):
+    """
+    Hash-aggregate a ColumnarTable column by column, keyed on per-row group
+    ids. Keys, mode labels and which columns a group reports all come from
+    the cells' original values, so the result matches group_data() on rows.
+    """
+    agg = HashAggregator(group_keys, aggs)
+    key_cols = [table.columns.get(k) for k in group_keys]
+
+    def key_part(col, i):
+        v = col.original(i) if col is not None else ABSENT
+        return "MISSING" if v is ABSENT else v
+
+    gids = array('l')
+    keys = {}
+    for i in range(table.nrows):
+        key = tuple(key_part(col, i) for col in key_cols)
+        gid = keys.get(key)
+        if gid is None:
+            gid = keys[key] = len(keys)
+        gids.append(gid)
+    key_list = list(keys)
+    buckets = [agg.groups.setdefault(key, {}) for key in key_list]
+
+    for name, col in table.columns.items():
+        if name in agg.group_keys:
+            continue
+        # a group reports a column when any of its rows had the key, even if blank
+        states = [None] * len(key_list)
+        codes, numbers, strings, labels = col.codes, col.numbers, col.strings, col.labels
+        for i, gid in enumerate(gids):
+            if labels is not None and labels[i] == ABSENT_CODE:
+                continue
+            state = states[gid]
+            if state is None:
+                state = states[gid] = AggState(col.original(i))
+            if not col.is_valid(i):
+                continue
+            if codes is not None and codes[i] >= 0:
+                state.add_text(strings[codes[i]])
+            else:
+                state.add_number(numbers[i], str(col.original(i)) if agg.track_numbers else None)
+        for bucket, state in zip(buckets, states):
+            if state is not None:
+                bucket[name] = state
+
+    return agg
+
+
+def load_table_cached(path, cache):
+    """
+    (ColumnarTable, non-flat columns, cache hit?) for a CSV, through a FlatCache.
+
+    A miss detects, unpacks and types the file as usual and stores the
+    resulting table; a hit skips all parsing.
+    """
+    hit = cache.lookup(path, "pure", ".pkl")
+    if hit:
+        data, meta = hit
+        with open(data, "rb") as f:
+            return ColumnarTable.from_state(pickle.load(f)), meta["non_flat"], True
+
+    bad_cols, raw_rows = detect_structured_columns(read_rows(path))
+    schema, flat_rows = infer_schema(unpack_rows(raw_rows))
+    table = ColumnarTable.from_rows(flat_rows, schema)
+
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            pickle.dump(table.state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    cache.store(path, "pure", ".pkl", write, {"non_flat": bad_cols, "rows": table.nrows})
+    return table, bad_cols, False
+
+
+def summarize_file(path, group_by=None, aggs=("mean",), cache=None, approx=False):
+    """
+    Non-interactive analysis of one CSV for batch use.
+
+    Same passes as the CLI (detect, unpack and summarize in one stream, a
+    second stream for grouping) but returns plain dicts instead of printing
+    tables. With `cache` (a FlatCache or True) the flattened table is
+    reused across runs and both steps read from it; `approx` switches to
+    sketch-based distinct counts and quantiles.
+    """
+    cache = open_cache(cache)
+    if cache:
+        table, bad_cols, _ = load_table_cached(path, cache)
+        records = column_records(table_column_stats(table, approx=approx))
+        groups = group_data(table, list(group_by), aggs) if group_by else None
+        return {"rows": table.nrows, "non_flat": bad_cols, "columns": records, "groups": groups}
+
+    bad_cols, raw_rows = detect_structured_columns(read_rows(path))
+    schema, flat_rows = infer_schema(unpack_rows(raw_rows))
+
+    n_rows = 0
+
+    def counted(rows):
+        nonlocal n_rows
+        for row in rows:
+            n_rows += 1
+            yield row
+
+    records = column_records(column_stats(counted(flat_rows), schema, approx))
+    groups = group_data(load_data_loose(path), list(group_by), aggs, schema) if group_by else None
+    return {"rows": n_rows, "non_flat": bad_cols, "columns": records, "groups": groups}
 
 
 #  Main logic
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Smart CSV Analyzer (pure Python)")
+    parser.add_argument("path", nargs="?", help="CSV file to analyze (prompted for if omitted)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="summarize byte-range chunks in N worker processes")
+    parser.add_argument("--agg", default="mean",
+                        help=f"comma-separated aggregates for grouping ({', '.join(AGG_FUNCS)})")
+    parser.add_argument("--columnar", action="store_true",
+                        help="load the file once into a compact columnar table and reuse it for grouping")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse the flattened table from the on-disk cache (implies --columnar)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append-only files: summarize only rows added since the last --incremental run")
+    parser.add_argument("--state", help="where --incremental keeps its state (default: next to the cache directory)")
+    parser.add_argument("--mmap", action="store_true",
+                        help="read through the memory-mapped tokenizer instead of csv.DictReader")
+    parser.add_argument("--columns", help="with --mmap: comma-separated columns to analyze (others are not decoded)")
+    parser.add_argument("--approx", action="store_true",
+                        help="fixed-memory sketches: approximate unique counts and P50/P90/P99")
+    add_view_arguments(parser)
+    args = parser.parse_args()
+    view = TableView.from_args(args)
+
     banner("Smart CSV Analyzer")
 
-    user_file = input(" Enter path to your CSV file: ").strip().strip('"')
+    user_file = args.path or input(" Enter path to your CSV file: ").strip().strip('"')
 
     if not os.path.isfile(user_file):
         print(" File not found. Please double-check your input.")
@@ -158,18 +1340,51 @@ if __name__ == "__main__":
         print(" Only .csv files are supported.")
     else:
         try:
-            banner(" Detecting malformed columns")
-            bad_cols = detect_structured_columns(user_file)
-            if bad_cols:
-                print(f" Columns with non-flat data: {', '.join(bad_cols)}")
+            table = None
+            if args.cache:
+                banner(" Loading Flattened Data (cached)")
+                table, bad_cols, hit = load_table_cached(user_file, open_cache(True))
+                print(" Reused cached table." if hit else " Parsed file and cached the flattened table.")
+                schema = table.schema
+                if bad_cols:
+                    print(f" Columns with non-flat data: {describe(bad_cols)}")
             else:
-                print(" All columns are flat CSV-style.")
+                banner(" Detecting malformed columns")
+                bad_cols, raw_rows = detect_structured_columns(read_rows(user_file))
+                if bad_cols:
+                    print(f" Columns with non-flat data: {describe(bad_cols)}")
+                else:
+                    print(" All columns are flat CSV-style.")
+
+                banner(" Loading and Flattening Data")
+                schema, flat_rows = infer_schema(unpack_rows(raw_rows))
+
+            kinds = Counter(schema.values())
+            print(" Column types: " + ", ".join(f"{n} {kind}" for kind, n in kinds.items()))
 
-            banner(" Loading and Flattening Data")
-            original_data = load_data_loose(user_file)
+            columns = [c.strip() for c in args.columns.split(",")] if args.mmap and args.columns else None
+            if args.columnar and table is None:
+                if args.mmap:
+                    table = ColumnarTable.from_mmap(user_file, schema, columns)
+                else:
+                    table = ColumnarTable.from_rows(flat_rows, schema)
+            if table is not None:
+                print(f" Columnar table: {table.nrows} rows × {len(table.columns)} columns "
+                      f"(~{table.nbytes() // 1024} KiB)")
 
             banner("DATA ANALYSIS")
-            messy_stats(original_data)
+            if args.incremental:
+                column_map, note = incremental_column_stats(user_file, args.state, args.workers, args.approx)
+                print(f" {note}")
+                print_column_stats(column_map, view)
+            elif table is not None:
+                messy_stats(table, approx=args.approx, view=view)
+            elif args.mmap:
+                print_column_stats(mmap_column_stats(user_file, schema, columns, args.approx), view)
+            elif args.workers > 1:
+                print_column_stats(parallel_column_stats(user_file, args.workers, schema, args.approx), view)
+            else:
+                messy_stats(flat_rows, schema, args.approx, view)
 
             # Ask about aggregation
             banner("Aggregation Options")
@@ -190,11 +1405,20 @@ if __name__ == "__main__":
                     col = input(f"🔹 Enter column name #{i + 1} to group by: ").strip()
                     group_columns.append(col)
 
-                print(f"\n Grouping by: {', '.join(group_columns)}")
-                grouped_data = group_data(original_data, group_columns)
+                aggs = [a.strip() for a in args.agg.split(",") if a.strip()]
+                print(f"\n Grouping by: {', '.join(group_columns)} ({', '.join(aggs)})")
+                # Second streaming pass: only the per-group state is kept
+                if table is not None:
+                    grouped_data = group_data(table, group_columns, aggs)
+                elif args.workers > 1:
+                    grouped_data = parallel_group_data(user_file, group_columns, args.workers, aggs, schema)
+                elif args.mmap:
+                    grouped_data = group_data(mmap_rows(user_file), group_columns, aggs, schema)
+                else:
+                    grouped_data = group_data(load_data_loose(user_file), group_columns, aggs, schema)
 
                 banner("ANALYSIS ON AGGREGATED DATA")
-                messy_stats(grouped_data)
+                messy_stats(grouped_data, view=view)
 
             else:
                 print("Skipped grouping. Task complete.")
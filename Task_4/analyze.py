@@ -0,0 +1,227 @@
+"""
+Headless batch front end for the three Task_4 analyzers.
+
+    python analyze.py exports/*.csv --backend polars --group-by team --out summaries/
+
+or from Python:
+
+    from analyze import analyze
+    results = analyze(["a.csv", "b.csv"], group_by=["team"], backend="pandas")
+
+Files are analyzed concurrently in worker processes, one file per task.
+Each backend module is imported inside the worker that uses it, so
+selecting the pure-Python backend never pays for importing pandas or Polars,
+and nothing here touches input() or a Tk dialog.
+
+Every file produces one summary dict: path, backend, rows, non-flat columns,
+per-column stats and (with group_by) the grouped rows. Failures are reported
+per file instead of stopping the batch.
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib
+import importlib.util
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# backend name -> module implementing summarize_file(path, group_by, **options)
+BACKENDS = {
+    "pure": "Pure_Python_Stats",
+    "pandas": "Pandas_pyhton_Stats",
+    "polars": "Polars_python_Stats",
+}
+
+FORMATS = ("json", "parquet")
+
+
+def to_plain(value):
+    """Recursively turn numpy/pandas scalars into Python ones and NaN into None, so the result is valid JSON."""
+    if isinstance(value, dict):
+        return {str(k): to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        try:
+            value = value.item()
+        except (TypeError, ValueError):
+            return str(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def summarize_one(path, group_by=None, backend="pure", options=None, quiet=True):
+    """Run one backend's summarize_file on one CSV; never raises."""
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    start = time.perf_counter()
+    result = {"path": path, "backend": backend}
+    try:
+        module = importlib.import_module(BACKENDS[backend])
+        # the analyzers report progress on stdout, which would corrupt JSON output
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink if quiet else sys.stderr):
+            summary = module.summarize_file(path, group_by, **(options or {}))
+        result.update(summary)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return to_plain(result)
+
+
+def expand_paths(paths):
+    """Files as given, with glob patterns and directories (their *.csv) expanded, in order and deduplicated."""
+    found = []
+    for entry in paths:
+        if os.path.isdir(entry):
+            matches = sorted(glob.glob(os.path.join(entry, "*.csv")))
+        elif glob.has_magic(entry):
+            matches = sorted(glob.glob(entry))
+        else:
+            matches = [entry]
+        found += [m for m in matches if m not in found]
+    return found
+
+
+def analyze(paths, group_by=None, backend="pure", workers=None, quiet=True, **options):
+    """
+    Summarize many CSV files without any prompts.
+
+    `paths` may mix files, directories and glob patterns. Extra keyword
+    options go to the backend's summarize_file (e.g. chunksize/dtype for
+    pandas, aggs for pure). Returns one summary dict per file, in input order.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r} (choose from {', '.join(BACKENDS)})")
+    if isinstance(paths, str):
+        paths = [paths]
+    files = expand_paths(paths)
+    group_by = list(group_by) if group_by else None
+    workers = workers or min(len(files), os.cpu_count() or 1)
+
+    if workers <= 1 or len(files) <= 1:
+        return [summarize_one(f, group_by, backend, options, quiet) for f in files]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(summarize_one, f, group_by, backend, options, quiet) for f in files]
+        return [future.result() for future in futures]
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def output_stem(out_dir, path, taken):
+    """<out_dir>/<file name without .csv>, suffixed when two inputs share a name."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name, n = stem, 1
+    while name in taken:
+        n += 1
+        name = f"{stem}_{n}"
+    taken.add(name)
+    return os.path.join(out_dir, name)
+
+
+def uniform_records(records):
+    """Stringify any field whose values mix types (e.g. numeric and text 'top' values), so Arrow accepts it."""
+    if not records:
+        return records
+    keys = list(dict.fromkeys(k for r in records for k in r))
+    mixed = set()
+    for k in keys:
+        kinds = {type(r.get(k)) for r in records if r.get(k) is not None}
+        if len(kinds) > 1 and not kinds <= {int, float}:
+            mixed.add(k)
+    return [{k: (str(r[k]) if k in mixed and r.get(k) is not None else r.get(k)) for k in keys} for r in records]
+
+
+def write_parquet(result, stem):
+    """<stem>.columns.parquet with the column stats and, when grouped, <stem>.groups.parquet."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    written = []
+    for part in ("columns", "groups"):
+        records = result.get(part)
+        if not records:
+            continue
+        path = f"{stem}.{part}.parquet"
+        pq.write_table(pa.Table.from_pylist(uniform_records(records)), path)
+        written.append(path)
+    return written
+
+
+def write_results(results, out_dir, fmt):
+    os.makedirs(out_dir, exist_ok=True)
+    taken = set()
+    written = []
+    for result in results:
+        stem = output_stem(out_dir, result["path"], taken)
+        if fmt == "parquet":
+            if "error" not in result:
+                written += write_parquet(result, stem)
+            continue
+        with open(f"{stem}.json", "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        written.append(f"{stem}.json")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize many CSV files without prompts")
+    parser.add_argument("paths", nargs="+", help="CSV files, directories or glob patterns")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="pure", help="analyzer to use")
+    parser.add_argument("--group-by", default="", help="comma-separated columns to group by")
+    parser.add_argument("--workers", type=int, default=0, help="files analyzed at once (default: one per CPU)")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="output format")
+    parser.add_argument("--out", help="directory for one output file per input (JSON goes to stdout if omitted)")
+    parser.add_argument("--chunksize", type=int, default=0, help="pandas only: stream files in chunks of N rows")
+    parser.add_argument("--agg", default="mean", help="pure only: comma-separated aggregates for grouping")
+    parser.add_argument("--cache", action="store_true", help="reuse flattened data from the on-disk cache")
+    parser.add_argument("--approx", action="store_true",
+                        help="approximate distinct counts and p50/p90/p99 from fixed-memory sketches")
+    parser.add_argument("--verbose", action="store_true", help="show the analyzers' progress output on stderr")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.out:
+        parser.error("--format parquet needs --out")
+    if args.format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        parser.error("--format parquet needs pyarrow (pip install pyarrow); use --format json instead")
+
+    options = {"cache": True} if args.cache else {}
+    if args.approx:
+        options["approx"] = True
+    if args.backend == "pandas" and args.chunksize:
+        options["chunksize"] = args.chunksize
+    if args.backend == "pure":
+        options["aggs"] = tuple(a.strip() for a in args.agg.split(",") if a.strip())
+
+    group_by = [c.strip() for c in args.group_by.split(",") if c.strip()]
+    results = analyze(args.paths, group_by, args.backend, args.workers or None,
+                      quiet=not args.verbose, **options)
+
+    if args.out:
+        for path in write_results(results, args.out, args.format):
+            print(path)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    failed = [r for r in results if "error" in r]
+    for r in failed:
+        print(f"{r['path']}: {r['error']}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Benchmark the pure-Python, pandas and Polars analyzers on synthetic CSVs.
+
+Each (backend, dataset) pair runs in a fresh subprocess so imports, caches
+and peak memory do not leak between runs. Inside the child the pipeline is
+split into the same stages the scripts go through - load, detect, unpack,
+summarize, group - and every stage is timed on its own. Results are
+appended to a CSV file, so repeated runs build up a history to compare
+backends by data size and to spot regressions.
+
+    python benchmark.py --rows 10000,100000,1000000 --width 10,40 --json-share 0,0.25
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+BACKENDS = ("pure", "pandas", "polars")
+STAGES = ("load", "detect", "unpack", "summarize", "group")
+
+# Group-by column of generated files and its number of distinct values
+GROUP_COLUMN = "team"
+GROUPS = 50
+
+TEXT_VOCAB = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+
+RESULT_FIELDS = ["run_at", "python", "backend", "version", "rows", "width", "json_share",
+                 "stage", "seconds", "rows_per_s", "peak_rss_mb", "status"]
+
+
+def banner(text):
+    print("\n" + "—" * (len(text) + 4))
+    print(f"| {text} |")
+    print("—" * (len(text) + 4))
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def column_plan(width, json_share):
+    """
+    Column names for a file with `width` data columns besides id and the group column.
+
+    `json_share` of them hold dict cells; one is mixed-type; the rest split
+    between numeric and text.
+    """
+    n_json = round(width * json_share)
+    n_mixed = 1 if width - n_json > 0 else 0
+    rest = width - n_json - n_mixed
+    n_num = (rest + 1) // 2
+    n_text = rest - n_num
+    return ([f"num_{i}" for i in range(n_num)] + [f"txt_{i}" for i in range(n_text)]
+            + ["mixed"] * n_mixed + [f"json_{i}" for i in range(n_json)])
+
+
+def make_cell(name, rng):
+    if name.startswith("num_"):
+        return "" if rng.random() < 0.02 else f"{rng.gauss(100, 25):.3f}"
+    if name.startswith("txt_"):
+        return rng.choice(TEXT_VOCAB)
+    if name == "mixed":
+        return "n/a" if rng.random() < 0.1 else str(rng.randint(0, 1000))
+    # json_*: alternate JSON and Python-repr dict literals, as exports do
+    runs, rate = rng.randint(0, 150), round(rng.uniform(50, 200), 2)
+    if rng.random() < 0.5:
+        return json.dumps({"runs": runs, "rate": rate, "kind": rng.choice(TEXT_VOCAB)})
+    return repr({"runs": runs, "rate": rate, "kind": rng.choice(TEXT_VOCAB)})
+
+
+def generate_csv(path, rows, width, json_share, seed=0):
+    rng = random.Random(seed)
+    columns = column_plan(width, json_share)
+    header = ["id", GROUP_COLUMN] + columns
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(rows):
+            writer.writerow([i, f"g{rng.randrange(GROUPS):03d}"] + [make_cell(c, rng) for c in columns])
+
+
+def dataset_path(data_dir, rows, width, json_share):
+    """Generated files are cached by shape, so reruns skip generation."""
+    path = os.path.join(data_dir, f"bench_{rows}r_{width}w_{int(json_share * 100)}j.csv")
+    if not os.path.isfile(path):
+        print(f" Generating {os.path.basename(path)}...")
+        os.makedirs(data_dir, exist_ok=True)
+        tmp = path + ".part"
+        generate_csv(tmp, rows, width, json_share)
+        os.replace(tmp, path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Backend stages (run inside the child process)
+# ---------------------------------------------------------------------------
+# Each stage materializes its output so the next one is timed on its own,
+# which is not how the streaming CLIs run end to end.
+
+def pure_stages(path, group_col):
+    import Pure_Python_Stats as pp
+
+    state = {}
+
+    def load():
+        state["rows"] = list(pp.read_rows(path))
+
+    def detect():
+        state["bad"], state["rows"] = pp.detect_structured_columns(iter(state["rows"]))
+
+    def unpack():
+        state["flat"] = list(pp.unpack_rows(state["rows"]))
+        state["schema"], _ = pp.infer_schema(iter(state["flat"]))
+
+    def summarize():
+        pp.column_stats(state["flat"], state["schema"])
+
+    def group():
+        pp.group_data(state["flat"], [group_col], ("mean",), state["schema"])
+
+    return "stdlib", [load, detect, unpack, summarize, group]
+
+
+def pandas_stages(path, group_col):
+    import pandas as pd
+    import Pandas_pyhton_Stats as ps
+
+    state = {}
+
+    def load():
+        state["df"] = ps.read_csv(path)
+
+    def detect():
+        state["bad"] = ps.detect_non_flat_columns(state["df"])
+
+    def unpack():
+        state["df"], _ = ps.load_and_unpack(state["df"], state["bad"])
+
+    def summarize():
+        ps.numeric_summary(state["df"])
+        ps.text_summary(state["df"])
+
+    def group():
+        df = state["df"]
+        numeric_cols = df.select_dtypes(include='number').columns.difference([group_col])
+        df.groupby([group_col])[numeric_cols].mean()
+
+    return pd.__version__, [load, detect, unpack, summarize, group]
+
+
+def polars_stages(path, group_col):
+    import polars as pl
+    import Polars_python_Stats as ps
+
+    state = {}
+
+    def load():
+        state["df"] = ps.collect(pl.scan_csv(path, infer_schema_length=10000))
+
+    def detect():
+        state["bad"] = ps.detect_json_columns(state["df"].lazy())
+
+    def unpack():
+        state["df"] = ps.collect(ps.unpack_json_columns(state["df"], state["bad"]))
+
+    def summarize():
+        lf = state["df"].lazy()
+        ps.collect(lf.select(ps.summary_exprs(lf.collect_schema())))
+
+    def group():
+        df = state["df"]
+        numeric_cols = [c for c, t in df.schema.items() if t.is_numeric() and c != group_col]
+        ps.collect(df.lazy().group_by(group_col).agg(pl.col(numeric_cols).mean()))
+
+    return pl.__version__, [load, detect, unpack, summarize, group]
+
+
+STAGE_BUILDERS = {"pure": pure_stages, "pandas": pandas_stages, "polars": polars_stages}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def run_child(backend, path, group_col):
+    """Time each stage of one backend on one file and print the results as JSON."""
+    sys.path.insert(0, HERE)
+    out = {"backend": backend, "version": None, "stages": []}
+    # the analyzers print progress; discard it rather than buffer it
+    sink = open(os.devnull, "w")
+    try:
+        with contextlib.redirect_stdout(sink):
+            version, stages = STAGE_BUILDERS[backend](path, group_col)
+        out["version"] = version
+        for stage in stages:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(sink):
+                stage()
+            seconds = time.perf_counter() - start
+            out["stages"].append({"stage": stage.__name__, "seconds": seconds, "peak_rss_mb": peak_rss_mb()})
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    print(json.dumps(out))
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def run_backend(backend, path, timeout):
+    # the child runs from HERE, so a path relative to our cwd would not resolve there
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", backend, os.path.abspath(path)]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=HERE)
+    except subprocess.TimeoutExpired:
+        return {"backend": backend, "version": None, "stages": [], "error": f"timeout after {timeout}s"}
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode or not lines:
+        tail = proc.stderr.strip().splitlines()[-1:] or [f"exit code {proc.returncode}"]
+        return {"backend": backend, "version": None, "stages": [], "error": tail[0]}
+    return json.loads(lines[-1])
+
+
+def result_rows(result, rows, width, json_share, run_at):
+    base = {
+        "run_at": run_at, "python": platform.python_version(), "backend": result["backend"],
+        "version": result["version"], "rows": rows, "width": width, "json_share": json_share,
+    }
+    out = []
+    for entry in result["stages"]:
+        seconds = entry["seconds"]
+        out.append(dict(base, stage=entry["stage"], seconds=round(seconds, 4),
+                        rows_per_s=round(rows / seconds) if seconds > 0 else None,
+                        peak_rss_mb=entry["peak_rss_mb"], status="ok"))
+    if "error" in result:
+        out.append(dict(base, stage=STAGES[len(result["stages"])] if len(result["stages"]) < len(STAGES) else "",
+                        seconds=None, rows_per_s=None, peak_rss_mb=None, status=result["error"]))
+    return out
+
+
+def append_results(path, rows):
+    new_file = not os.path.isfile(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_results(rows):
+    print(f"\n{'backend':<8}{'rows':>10}{'width':>7}{'json':>6}  {'stage':<10}{'seconds':>10}"
+          f"{'rows/s':>12}{'peak MB':>10}")
+    for r in rows:
+        if r["status"] != "ok":
+            print(f"{r['backend']:<8}{r['rows']:>10}{r['width']:>7}{r['json_share']:>6}  {r['stage']:<10} {r['status']}")
+            continue
+        print(f"{r['backend']:<8}{r['rows']:>10}{r['width']:>7}{r['json_share']:>6}  {r['stage']:<10}"
+              f"{r['seconds']:>10.3f}{r['rows_per_s'] or 0:>12,}{r['peak_rss_mb'] or 0:>10}")
+
+
+def parse_list(text, cast):
+    return [cast(x) for x in text.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Task_4 CSV analyzers")
+    parser.add_argument("--rows", default="10000,100000,1000000",
+                        help="comma-separated row counts (e.g. up to 50000000)")
+    parser.add_argument("--width", default="10", help="comma-separated data-column counts")
+    parser.add_argument("--json-share", default="0.2", help="comma-separated share of JSON-like columns")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma-separated backends to run")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "task4_bench"),
+                        help="where generated CSVs are cached")
+    parser.add_argument("--results", default="benchmark_results.csv", help="CSV file results are appended to")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds allowed per backend run")
+    parser.add_argument("--child", nargs=2, metavar=("BACKEND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], GROUP_COLUMN)
+        return
+
+    backends = parse_list(args.backends, str)
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(sorted(unknown))}")
+
+    banner("TASK_4 ANALYZER BENCHMARK")
+    run_at = datetime.now().isoformat(timespec="seconds")
+    collected = []
+    for rows in parse_list(args.rows, int):
+        for width in parse_list(args.width, int):
+            for share in parse_list(args.json_share, float):
+                path = dataset_path(args.data_dir, rows, width, share)
+                for backend in backends:
+                    print(f" {backend}: {rows} rows × {width} columns, {share:.0%} JSON-like")
+                    result = run_backend(backend, path, args.timeout)
+                    found = result_rows(result, rows, width, share, run_at)
+                    append_results(args.results, found)
+                    collected += found
+
+    print_results(collected)
+    print(f"\n Results appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Structured-cell decoding shared by the Task_4 analyzers.
+
+CSV exports often store nested stats as a dict literal inside one cell,
+either JSON ({"a": 1}) or Python repr ({'a': 1}). ast.literal_eval handles
+both shapes but builds a full syntax tree per cell, which made it the
+hottest call when loading files with dict-valued columns.
+
+parse_cell tries the C-accelerated json decoder first, rewrites simple
+Python literals into JSON so they take the same path, and only falls back
+to ast.literal_eval for anything unusual. Results are memoized because
+exports repeat the same cell text a lot.
+"""
+
+import ast
+import json
+import re
+from functools import lru_cache
+
+# Distinct cell strings remembered by parse_cell
+CACHE_SIZE = 65536
+
+# Single-quoted strings and the Python-only constants, in source order
+PY_TOKEN = re.compile(r"'[^']*'|\b(?:True|False|None)\b")
+PY_TO_JSON = {"True": "true", "False": "false", "None": "null"}
+
+
+def _to_json(match):
+    token = match.group(0)
+    if token[0] == "'":
+        return '"' + token[1:-1] + '"'
+    return PY_TO_JSON[token]
+
+
+def looks_structured(val):
+    """Cheap check for a cell that may hold a dict literal."""
+    return isinstance(val, str) and "{" in val and "}" in val
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    # Python repr of a dict with plain string keys/values: with no double
+    # quotes or backslashes around, swapping the quote style is exact.
+    if '"' not in text and "\\" not in text:
+        try:
+            return json.loads(PY_TOKEN.sub(_to_json, text))
+        except ValueError:
+            pass
+
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+
+
+def parse_cell(val):
+    """
+    Decode a JSON or Python literal stored in a CSV cell.
+
+    Returns the decoded object, or None when the cell is not a literal.
+    Decoded values are cached and shared between identical cells, so treat
+    them as read-only.
+    """
+    if not isinstance(val, str):
+        return None
+    text = val.strip()
+    if not text:
+        return None
+    return _parse(text)
@@ -0,0 +1,120 @@
+"""
+Sampling-based detection of non-flat (dict-valued) columns.
+
+Shared by the three Task_4 analyzers so detection costs the same on a
+10-row file and a 100M-row one: at most `scan_rows` rows are looked at,
+every non-empty cell in them is parsed (parse_cell is memoized), and a
+column stops being sampled as soon as enough of its cells decode to dicts.
+
+The result maps each structured column to a confidence score: the share of
+its scanned non-empty cells that decode to a dict. A sparse column - a few
+dict cells among thousands of plain ones - still gets a (small) score.
+"""
+
+from cell_parser import looks_structured, parse_cell
+
+# Rows looked at per file, whatever its size
+SCAN_ROWS = 20000
+
+# Dict-valued cells that confirm a column without sampling further
+CONFIRM_HITS = 8
+
+
+def is_dict_cell(val):
+    return looks_structured(val) and isinstance(parse_cell(val), dict)
+
+
+class ColumnProbe:
+    """Running count of non-empty and dict-valued cells for one column."""
+
+    __slots__ = ("seen", "hits", "confirmed")
+
+    def __init__(self):
+        self.seen = 0
+        self.hits = 0
+        self.confirmed = False
+
+    def observe(self, val, confirm=CONFIRM_HITS):
+        if val is None or val == '' or val != val:  # val != val catches NaN
+            return
+        self.seen += 1
+        if is_dict_cell(val):
+            self.hits += 1
+            if self.hits >= confirm:
+                self.confirmed = True
+
+    def confidence(self):
+        # every scanned cell was parsed, so the hit count is exact, not an estimate
+        return self.hits / self.seen if self.hits else 0.0
+
+
+class StructureDetector:
+    """
+    Feed cells row-wise (observe_row) or column-wise (observe_column), then
+    call results(). Confirmed columns are skipped from then on.
+    """
+
+    def __init__(self, scan_rows=SCAN_ROWS):
+        self.scan_rows = scan_rows
+        self.probes = {}
+
+    def _probe(self, col):
+        probe = self.probes.get(col)
+        if probe is None:
+            probe = self.probes[col] = ColumnProbe()
+        return probe
+
+    def observe_row(self, row):
+        for col, val in row.items():
+            probe = self._probe(col)
+            if not probe.confirmed:
+                probe.observe(val)
+
+    def observe_column(self, col, values):
+        probe = self._probe(col)
+        for i, val in enumerate(values):
+            if probe.confirmed or i >= self.scan_rows:
+                break
+            probe.observe(val)
+
+    @property
+    def all_confirmed(self):
+        return bool(self.probes) and all(p.confirmed for p in self.probes.values())
+
+    def results(self):
+        """{column: confidence} for columns with any dict-valued cell, in column order."""
+        found = {}
+        for col, probe in self.probes.items():
+            score = probe.confidence()
+            if score > 0:
+                found[col] = score
+        return found
+
+
+def detect_in_rows(rows, scan_rows=SCAN_ROWS):
+    """
+    Detect structured columns from a row stream (dicts), reading at most
+    `scan_rows` rows. Returns (results, consumed) so callers can replay the
+    rows that were read.
+    """
+    detector = StructureDetector(scan_rows)
+    consumed = []
+    for row in rows:
+        consumed.append(row)
+        detector.observe_row(row)
+        if len(consumed) >= scan_rows or detector.all_confirmed:
+            break
+    return detector.results(), consumed
+
+
+def detect_in_columns(columns, scan_rows=SCAN_ROWS):
+    """Detect structured columns from a {column: iterable of cells} mapping."""
+    detector = StructureDetector(scan_rows)
+    for col, values in columns.items():
+        detector.observe_column(col, values)
+    return detector.results()
+
+
+def describe(found):
+    """'col (97%), other (100%)' for printing detection results."""
+    return ", ".join(f"{col} ({score:.0%})" if score >= 0.01 else f"{col} (<1%)" for col, score in found.items())
@@ -0,0 +1,169 @@
+"""
+On-disk cache of flattened, typed analyzer input, keyed by file fingerprint.
+
+Detecting and unpacking dict-valued cells is the expensive part of every
+run, and it is repeated even when the CSV has not changed. FlatCache keeps
+each backend's flattened result next to a small JSON sidecar (detected
+columns, row count) so a repeat run only has to map the cached file back in:
+
+    pandas / Polars   Arrow IPC (Feather v2), read back memory-mapped
+    pure Python       pickled ColumnarTable state (no Arrow dependency)
+
+Entries are keyed by a content hash of the CSV plus its size, so a copied or
+touched file with the same bytes still hits. The hash is memoized per
+(path, size, mtime) to avoid re-reading unchanged files. Hits bump the
+entry's mtime, and the least recently used entries are evicted once the
+directory grows past `max_bytes`. The entry just stored is never evicted by
+its own store() call, so one larger than `max_bytes` is still reused until
+a newer entry pushes it out.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import time
+
+CACHE_DIR = os.environ.get("TASK4_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "task4")
+
+# Total size the cache directory may grow to before old entries are evicted
+MAX_BYTES = int(os.environ.get("TASK4_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+# Bumped whenever the flattened layout changes, so old entries stop matching
+CACHE_VERSION = 3
+
+HASH_BLOCK = 1 << 20
+FINGERPRINTS = "fingerprints.json"
+
+
+def content_hash(path, block=HASH_BLOCK):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class FlatCache:
+    """Fingerprint-keyed, size-bounded LRU store of flattened datasets."""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _memo_path(self):
+        return os.path.join(self.root, FINGERPRINTS)
+
+    def _load_memo(self):
+        try:
+            with open(self._memo_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def fingerprint(self, path):
+        """{size, mtime_ns, digest} of a file; the digest is only recomputed when size or mtime moved."""
+        st = os.stat(path)
+        memo = self._load_memo()
+        key = os.path.abspath(path)
+        seen = memo.get(key)
+        if seen and seen["size"] == st.st_size and seen["mtime_ns"] == st.st_mtime_ns:
+            return seen
+        fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": content_hash(path)}
+        memo[key] = fp
+        write_json(self._memo_path(), memo)
+        return fp
+
+    def _stem(self, path, variant):
+        fp = self.fingerprint(path)
+        return os.path.join(self.root, f"{fp['digest']}-{fp['size']}-{variant}-v{CACHE_VERSION}")
+
+    def lookup(self, path, variant, ext):
+        """(data file, metadata) for a cached entry, or None on a miss."""
+        stem = self._stem(path, variant)
+        data, meta = stem + ext, stem + ".json"
+        if not (os.path.isfile(data) and os.path.isfile(meta)):
+            return None
+        try:
+            with open(meta, encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        for p in (data, meta):
+            os.utime(p, (now, now))  # mark as recently used
+        return data, info
+
+    def store(self, path, variant, ext, write, meta=None):
+        """
+        Cache a flattened dataset: `write(tmp_path)` serializes it, then the
+        entry is published atomically and the cache trimmed to size.
+        Returns the data file, or None when writing failed (the run goes on).
+        """
+        stem = self._stem(path, variant)
+        data = stem + ext
+        tmp = f"{data}.{os.getpid()}.tmp"
+        try:
+            write(tmp)
+            os.replace(tmp, data)
+            write_json(stem + ".json", dict(meta or {}, source=os.path.abspath(path), variant=variant))
+        except Exception as e:
+            print(f" Could not cache flattened data: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return None
+        size = os.path.getsize(data)
+        if size > self.max_bytes:
+            print(f" Cached entry ({size >> 20} MiB) is larger than the cache limit "
+                  f"({self.max_bytes >> 20} MiB); keeping it until the next entry is stored.")
+        self.evict(keep=os.path.basename(stem))
+        return data
+
+    def entries(self):
+        """[(last used, bytes, [files])] per cached entry, oldest first."""
+        groups = {}
+        for name in os.listdir(self.root):
+            if name == FINGERPRINTS or name.endswith(".tmp"):
+                continue
+            full = os.path.join(self.root, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue  # only cache files count; stray directories are left alone
+            stem = os.path.splitext(name)[0]
+            used, size, files = groups.get(stem, (0, 0, []))
+            groups[stem] = (max(used, st.st_mtime), size + st.st_size, files + [full])
+        return sorted(groups.values())
+
+    def evict(self, keep=None):
+        """Drop least recently used entries until the cache fits in max_bytes; the entry `keep` (a stem) stays."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, files in entries:
+            if total <= self.max_bytes:
+                break
+            if keep and os.path.splitext(os.path.basename(files[0]))[0] == keep:
+                continue
+            for f in files:
+                try:
+                    os.remove(f)
+                except OSError:
+                    pass
+            total -= size
+
+
+def open_cache(cache):
+    """Accept a FlatCache, True (default location) or a falsy value (no caching)."""
+    if not cache or isinstance(cache, FlatCache):
+        return cache or None
+    return FlatCache()
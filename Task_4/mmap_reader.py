@@ -0,0 +1,138 @@
+"""
+Memory-mapped CSV tokenizer for the pure-Python analyzer.
+
+csv.DictReader decodes the file through a text layer and builds a new dict,
+with new key strings, for every row. MmapCSV maps the file instead and
+cuts it into lines a block at a time with bytes.split, which runs in C.
+Records without a double quote are split on commas directly and only the
+requested fields are decoded; records with quotes (embedded commas,
+newlines or "" escapes) go through the csv module, so fields come out as
+csv.reader would produce them. Header names are decoded and interned once.
+
+UTF-8 never uses the bytes of ',', '"' or newline inside a multi-byte
+character, so splitting before decoding is safe.
+"""
+
+import csv
+import mmap
+import os
+import sys
+
+# Bytes copied out of the map per split
+BLOCK_BYTES = 4 * 1024 * 1024
+
+
+class MmapCSV:
+    """A read-only mapped CSV file; iterate records() for lists of field strings."""
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b""  # empty files cannot be mapped
+        self.header_end = self._header_end()
+        header = self._map[:self.header_end].decode(encoding).rstrip("\r\n")
+        self.fieldnames = [sys.intern(name) for name in next(csv.reader([header]), [])]
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._map)
+
+    def _header_end(self):
+        """Offset just past the header record (a newline outside quotes)."""
+        mm = self._map
+        quoted = False
+        i = 0
+        j = mm.find(b"\n")
+        while j != -1:
+            quoted ^= mm[i:j].count(b'"') & 1
+            i = j + 1
+            if not quoted:
+                return i
+            j = mm.find(b"\n", i)
+        return len(mm)
+
+    def _lines(self, start, end):
+        """Lines between two offsets, without their '\\n'."""
+        mm = self._map
+        carry = b""
+        pos = start
+        while pos < end:
+            stop = min(pos + BLOCK_BYTES, end)
+            lines = mm[pos:stop].split(b"\n")
+            pos = stop
+            lines[0] = carry + lines[0]
+            carry = lines.pop()
+            yield from lines
+        if carry:
+            yield carry
+
+    def _records(self, start, end):
+        """(record bytes, has quotes) per record; quoted newlines join lines back together."""
+        pending = None
+        for line in self._lines(start, end):
+            if pending is not None:
+                pending.append(line)
+                if line.count(b'"') & 1:
+                    yield b"\n".join(pending), True
+                    pending = None
+            elif b'"' not in line:
+                yield line, False
+            elif line.count(b'"') & 1:
+                pending = [line]
+            else:
+                yield line, True
+        if pending is not None:
+            yield b"\n".join(pending), True
+
+    def records(self, columns=None, start=None, end=None):
+        """
+        Yield one list of field strings per data record, holding only
+        `columns` (default: all, in header order). Missing trailing fields
+        are None, extra ones are dropped and blank lines are skipped.
+        `start`/`end` restrict reading to a record-aligned byte range.
+        Raises ValueError naming any of `columns` the header lacks.
+        """
+        names = self.fieldnames
+        if columns is not None:
+            unknown = [c for c in columns if c not in names]
+            if unknown:
+                raise ValueError(f"Unknown column(s): {', '.join(unknown)} (header has: {', '.join(names)})")
+        index = list(range(len(names))) if columns is None else [names.index(c) for c in columns]
+        width = len(names)
+        every = columns is None
+        enc = self.encoding
+        start = self.header_end if start is None else start
+        end = len(self._map) if end is None else end
+
+        for raw, quoted in self._records(start, end):
+            if raw[-1:] == b"\r":
+                raw = raw[:-1]
+            if not raw:
+                continue
+            if quoted:
+                fields = next(csv.reader([raw.decode(enc)]))
+            elif every:
+                fields = raw.decode(enc).split(",")
+            else:
+                parts = raw.split(b",")
+                if len(parts) < width:
+                    parts += [None] * (width - len(parts))
+                yield [None if parts[i] is None else parts[i].decode(enc) for i in index]
+                continue
+            if len(fields) < width:
+                fields += [None] * (width - len(fields))
+            yield fields[:width] if every else [fields[i] for i in index]
@@ -0,0 +1,149 @@
+"""
+Buffered rendering of the analyzers' stats tables.
+
+Printing a table one row at a time costs a write (and on a terminal a
+redraw) per column, which dominates the run once unpacking has produced
+thousands of columns. render_table() formats the whole table into one
+string and writes it once; render_blocks() does the same for the
+per-column text summaries. A TableView picks what is shown:
+
+    sort       any header, case-insensitive ('variance' = StdDev, 'nulls' = Null%)
+    top        keep the first N rows after sorting
+    match      fnmatch pattern on the column name (e.g. 'stats_*')
+    page       1-based page of page_size rows
+    quiet      render nothing, so the analysis itself stays the bottleneck
+
+Cells are formatted here, so callers pass raw values: floats get two
+decimals, None and NaN print empty, and every column is as wide as its
+widest cell.
+"""
+
+import fnmatch
+import math
+import sys
+from shutil import get_terminal_size
+
+# Sort keys accepted besides the header names themselves
+SORT_ALIASES = {"variance": "stddev", "std": "stddev", "nulls": "null%", "null_rate": "null%", "name": "column"}
+
+
+class TableView:
+    """Which rows of a stats table to show, and whether to render at all."""
+
+    def __init__(self, sort=None, ascending=False, top=0, match=None, page=1, page_size=0, quiet=False):
+        self.sort = sort
+        self.ascending = ascending
+        self.top = top
+        self.match = match
+        self.page = page
+        self.page_size = page_size
+        self.quiet = quiet
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.sort, args.ascending, args.top, args.match, args.page, args.page_size, args.quiet)
+
+
+def add_view_arguments(parser):
+    """The --sort/--top/--match/--page/--quiet options shared by the analyzers."""
+    group = parser.add_argument_group("table output")
+    group.add_argument("--sort", help="sort the stats by this column, largest first (e.g. StdDev, Null%%, Count)")
+    group.add_argument("--ascending", action="store_true", help="sort smallest first")
+    group.add_argument("--top", type=int, default=0, help="show only the first N columns after sorting")
+    group.add_argument("--match", help="show only columns whose name matches this pattern (e.g. 'stats_*')")
+    group.add_argument("--page", type=int, default=1, help="page of --page-size columns to show")
+    group.add_argument("--page-size", type=int, default=0, help="columns per page (default: all)")
+    group.add_argument("--quiet", action="store_true", help="skip rendering the stats tables")
+
+
+def sort_value(value):
+    """Numeric sort key for a cell: numbers, or strings such as '~120', '500+' or '3.5%'; else None."""
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if isinstance(value, int):
+        return float(value)
+    try:
+        return float(str(value).strip(" ~+%"))
+    except ValueError:
+        return None
+
+
+def sort_index(headers, key):
+    key = key.strip().lower()
+    key = SORT_ALIASES.get(key, key)
+    names = [h.lower() for h in headers]
+    return names.index(key) if key in names else None
+
+
+def select_rows(headers, rows, view):
+    """The rows left after the view's filter, sort, top-N and paging, and a note saying what was left out."""
+    total = len(rows)
+    if view.match:
+        rows = [r for r in rows if fnmatch.fnmatchcase(str(r[0]), view.match)]
+
+    idx = sort_index(headers, view.sort) if view.sort else None
+    if idx == 0:
+        rows = sorted(rows, key=lambda r: str(r[0]), reverse=not view.ascending)
+    elif idx is not None:
+        keyed = [(sort_value(r[idx]), r) for r in rows]
+        ranked = sorted((kr for kr in keyed if kr[0] is not None), key=lambda kr: kr[0], reverse=not view.ascending)
+        # rows without a value for the key go last whichever the direction
+        rows = [r for _, r in ranked] + [r for k, r in keyed if k is None]
+
+    if view.top > 0:
+        rows = rows[:view.top]
+
+    notes = []
+    if len(rows) < total:
+        notes.append(f"{len(rows)} of {total} columns")
+    if idx is not None:
+        notes.append(f"sorted by {headers[idx]}" + (" ascending" if view.ascending else ""))
+    if view.page_size > 0 and len(rows) > view.page_size:
+        pages = math.ceil(len(rows) / view.page_size)
+        page = min(max(view.page, 1), pages)
+        rows = rows[(page - 1) * view.page_size:page * view.page_size]
+        notes.append(f"page {page}/{pages}")
+    return rows, ", ".join(notes)
+
+
+def format_cell(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def render_table(headers, rows, view=None, out=None):
+    """Write a side-by-side table of `rows` (lists of raw values, column name first) in one call."""
+    view = view or TableView()
+    if view.quiet:
+        return
+    rows, note = select_rows(headers, rows, view)
+    cells = [[format_cell(v) for v in row] for row in rows]
+    widths = [max([len(h)] + [len(r[i]) for r in cells]) + 2 for i, h in enumerate(headers)]
+    row_format = "".join(f"{{:<{w}}}" for w in widths)
+    rule = get_terminal_size((80, 20)).columns
+
+    lines = ["", "=" * rule, row_format.format(*headers), "-" * rule]
+    lines += [row_format.format(*r) for r in cells]
+    if note:
+        lines.append(f"\n ({note})")
+    (out or sys.stdout).write("\n".join(lines) + "\n")
+
+
+def render_blocks(labels, rows, view=None, out=None):
+    """
+    Write one block per row (column name, then '↳ label: value' lines) in
+    one call; `labels` names the values after the column name.
+    """
+    view = view or TableView()
+    if view.quiet:
+        return
+    rows, note = select_rows(["Column", *labels], rows, view)
+    lines = []
+    for name, *values in rows:
+        lines += ["", f" {name}"] + [f" ↳ {label}: {format_cell(v)}" for label, v in zip(labels, values)]
+    if note:
+        lines.append(f"\n ({note})")
+    (out or sys.stdout).write("\n".join(lines) + "\n")
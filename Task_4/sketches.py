@@ -0,0 +1,168 @@
+"""
+Fixed-memory, mergeable sketches for the --approx summaries.
+
+HyperLogLog estimates distinct counts in 2**p one-byte registers (16 KiB at
+the default p=14, ~0.8% standard error). KLL keeps a few hundred samples
+per column and answers quantile queries with rank error around 1-2%.
+
+Both are plain objects that pickle across worker processes and merge with
+the same error bounds as a single sketch (HyperLogLog merges exactly), so
+per-chunk and per-worker sketches fold together like the other accumulators.
+Values are hashed with blake2b rather than hash(), which is salted per
+process and would make sketches from different workers disagree.
+"""
+
+import hashlib
+import math
+import random
+from itertools import islice
+
+HLL_PRECISION = 14
+KLL_K = 200
+
+# Values KLL.update() takes in per step, so a whole column is never buffered at once
+KLL_BATCH = 4096
+
+# Quantiles reported by the approximate summaries
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def hash64(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Distinct-count estimator with 2**p registers."""
+
+    def __init__(self, p=HLL_PRECISION):
+        self.p = p
+        self.registers = bytearray(1 << p)
+
+    def add(self, value):
+        self.add_hash(hash64(value))
+
+    def add_hash(self, h):
+        p = self.p
+        idx = h >> (64 - p)
+        rest = h & ((1 << (64 - p)) - 1)
+        rank = 64 - p - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def add_hashes(self, hashes):
+        """Bulk add for a numpy uint64 array of hashes (e.g. pandas.util.hash_pandas_object)."""
+        import numpy as np
+
+        p = self.p
+        h = np.asarray(hashes, dtype=np.uint64)
+        idx = (h >> np.uint64(64 - p)).astype(np.intp)
+        rest = h & np.uint64((1 << (64 - p)) - 1)
+        # rest < 2**50 converts to float64 exactly, and frexp's exponent is then its bit
+        # length (0 for 0); log2 would round values just below a power of two up to it
+        bits = np.frexp(rest.astype(np.float64))[1].astype(np.int64)
+        rank = (64 - p - bits + 1).astype(np.uint8)
+        np.maximum.at(np.frombuffer(self.registers, dtype=np.uint8), idx, rank)
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / math.fsum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return estimate
+
+
+class KLL:
+    """
+    Streaming quantile sketch (Karnin, Lang & Liberty): a stack of
+    compactors whose capacity shrinks geometrically with depth; a full
+    compactor sorts itself and promotes every other item one level up.
+    """
+
+    def __init__(self, k=KLL_K, seed=0):
+        self.k = k
+        self.rng = random.Random(seed)
+        self.compactors = []
+        self.n = 0
+        self.size = 0
+        self.max_size = 0
+        self._grow()
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _capacity(self, height):
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _compress(self):
+        for h, items in enumerate(self.compactors):
+            if len(items) >= self._capacity(h):
+                if h + 1 >= len(self.compactors):
+                    self._grow()
+                items.sort()
+                promoted = items[self.rng.random() < 0.5::2]
+                self.compactors[h + 1].extend(promoted)
+                self.size += len(promoted) - len(items)
+                items.clear()
+                break
+
+    def add(self, x):
+        self.compactors[0].append(x)
+        self.n += 1
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def update(self, values, batch=KLL_BATCH):
+        """Add many values (cheaper than add() per value), compacting every `batch` values."""
+        values = iter(values)
+        level0 = self.compactors[0]
+        while True:
+            before = len(level0)
+            level0.extend(islice(values, batch))
+            added = len(level0) - before
+            if not added:
+                break
+            self.n += added
+            self.size += added
+            while self.size >= self.max_size:
+                self._compress()
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for mine, theirs in zip(self.compactors, other.compactors):
+            mine.extend(theirs)
+        self.n += other.n
+        self.size = sum(map(len, self.compactors))
+        while self.size >= self.max_size:
+            self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Approximate values at each quantile in `qs` (0..1); None when empty."""
+        weighted = sorted((x, 1 << h) for h, items in enumerate(self.compactors) for x in items)
+        if not weighted:
+            return [None] * len(qs)
+        total = sum(w for _, w in weighted)
+        out = []
+        for q in qs:
+            target = q * total
+            acc = 0
+            for x, w in weighted:
+                acc += w
+                if acc >= target:
+                    out.append(x)
+                    break
+            else:
+                out.append(weighted[-1][0])
+        return out
@@ -0,0 +1,45 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+import analyze
+
+
+def test_parquet_without_pyarrow_fails_before_analysis(monkeypatch, tmp_path):
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *a: None)
+    monkeypatch.setattr(analyze, "analyze", lambda *a, **k: pytest.fail("analysis ran"))
+    monkeypatch.setattr(sys, "argv", ["analyze.py", "x.csv", "--format", "parquet", "--out", str(tmp_path)])
+    with pytest.raises(SystemExit) as exit_info:
+        analyze.main()
+    assert exit_info.value.code == 2
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    for name, rows in (("a", 4), ("b", 6)):
+        lines = ["id,team,score"] + [f"{i},{'XY'[i % 2]},{i * 2}" for i in range(rows)]
+        (tmp_path / f"{name}.csv").write_text("\n".join(lines) + "\n")
+    return tmp_path
+
+
+def test_analyze_expands_paths_and_keeps_input_order(csv_dir):
+    results = analyze.analyze([str(csv_dir), str(csv_dir / "a.csv")], group_by=["team"], workers=2)
+    assert [os.path.basename(r["path"]) for r in results] == ["a.csv", "b.csv"]
+    assert [r["rows"] for r in results] == [4, 6]
+    assert results[1]["groups"] == [{"team": "X", "id": 2.0, "score": 4.0},
+                                 {"team": "Y", "id": 3.0, "score": 6.0}]
+    json.dumps(results)  # plain values only
+
+
+def test_a_bad_file_is_reported_not_raised(csv_dir):
+    [result] = analyze.analyze([str(csv_dir / "missing.csv")])
+    assert result["error"].startswith("FileNotFoundError")
+
+
+def test_json_output_one_file_per_input(csv_dir, tmp_path):
+    results = analyze.analyze(str(csv_dir / "*.csv"))
+    written = analyze.write_results(results + results[:1], str(tmp_path / "out"), "json")
+    assert [os.path.basename(p) for p in written] == ["a.json", "b.json", "a_2.json"]
@@ -0,0 +1,39 @@
+import csv
+import os
+
+from benchmark import (GROUP_COLUMN, STAGES, column_plan, dataset_path, generate_csv, result_rows,
+                       run_backend)
+
+
+def test_relative_data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = dataset_path("bench_data", rows=50, width=4, json_share=0.25)
+    assert not os.path.isabs(path)
+
+    result = run_backend("pure", path, timeout=120)
+    assert "error" not in result
+    assert [s["stage"] for s in result["stages"]] == list(STAGES)
+
+
+def test_column_plan_shares():
+    plan = column_plan(10, 0.3)
+    assert len(plan) == 10
+    assert sum(c.startswith("json_") for c in plan) == 3 and plan.count("mixed") == 1
+
+
+def test_generated_files_are_deterministic(tmp_path):
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    generate_csv(a, rows=30, width=6, json_share=0.5, seed=4)
+    generate_csv(b, rows=30, width=6, json_share=0.5, seed=4)
+    assert a.read_bytes() == b.read_bytes()
+    with open(a, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 30 and len(rows[0]) == 8 and GROUP_COLUMN in rows[0]
+
+
+def test_a_failed_stage_is_recorded_after_the_finished_ones():
+    result = {"backend": "pure", "version": "x", "error": "boom",
+              "stages": [{"stage": "load", "seconds": 0.5, "peak_rss_mb": 10}]}
+    rows = result_rows(result, rows=100, width=4, json_share=0.0, run_at="now")
+    assert [(r["stage"], r["status"]) for r in rows] == [("load", "ok"), ("detect", "boom")]
+    assert rows[0]["rows_per_s"] == 200
@@ -0,0 +1,36 @@
+import ast
+import json
+
+import pytest
+
+from cell_parser import looks_structured, parse_cell
+
+PYTHON = [
+    "{'a': 1, 'b': 2.5}",
+    "{'a': True, 'b': None, 'c': False}",
+    "{'bat': {'runs': 10, 'sr': 140.5}}",
+    "{'name': \"O'Neil\"}",
+    "{'a': 'True'}",
+    "{'a': [1, 2, (3, 4)]}",
+]
+JSON = ['{"a": 1, "b": [true, null]}', '{"n": {"x": "y"}}', " {} "]
+
+
+@pytest.mark.parametrize("text", PYTHON)
+def test_python_literals_decode_like_literal_eval(text):
+    assert parse_cell(text) == ast.literal_eval(text)
+
+
+@pytest.mark.parametrize("text", JSON)
+def test_json_decodes_like_json(text):
+    assert parse_cell(text) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["", "   ", "{not a dict}", "plain", "{'a': }"])
+def test_non_literals_give_none(text):
+    assert parse_cell(text) is None
+
+
+def test_non_strings_are_not_parsed():
+    assert parse_cell(None) is None and parse_cell(5) is None
+    assert looks_structured("{'a': 1}") and not looks_structured(5)
@@ -0,0 +1,30 @@
+from column_detect import SCAN_ROWS, describe, detect_in_columns, detect_in_rows
+
+
+def test_sparse_dict_column_is_detected():
+    cells = ["plain text"] * (SCAN_ROWS - 3)
+    for i in (10, 9000, SCAN_ROWS - 10):
+        cells.insert(i, '{"a": 1, "b": "x"}')
+    found = detect_in_columns({"meta": cells, "name": ["bob"] * SCAN_ROWS})
+    assert list(found) == ["meta"]
+    assert found["meta"] == 3 / SCAN_ROWS
+    assert describe(found) == "meta (<1%)"
+
+
+def test_sparse_dict_column_in_rows():
+    rows = [{"id": str(i), "meta": '{"k": 2}' if i % 5000 == 0 else "n/a"} for i in range(SCAN_ROWS)]
+    found, consumed = detect_in_rows(iter(rows))
+    assert list(found) == ["meta"]
+    assert found["meta"] == 4 / SCAN_ROWS
+    assert len(consumed) == SCAN_ROWS
+
+
+def test_confirmed_column_scores_share_of_hits():
+    cells = ['{"a": 1}', "x"] * 20
+    found = detect_in_columns({"meta": cells})
+    # confirmed after 8 hits, 15 cells in
+    assert found == {"meta": 8 / 15}
+
+
+def test_flat_columns_report_nothing():
+    assert detect_in_columns({"a": ["1", "", None, "x"], "b": ["[1, 2]"]}) == {}
@@ -0,0 +1,36 @@
+import random
+import statistics
+
+import pytest
+
+import Pure_Python_Stats as pp
+
+
+def test_accumulator_matches_two_pass_stats():
+    rng = random.Random(1)
+    numbers = [rng.gauss(100, 15) for _ in range(5000)]
+    acc = pp.ColumnAccumulator()
+    for x in numbers:
+        acc.add(repr(x))
+    acc.add("")
+    assert acc.count == len(numbers) and acc.missing == 1
+    assert acc.mean == pytest.approx(statistics.fmean(numbers))
+    assert acc.std == pytest.approx(statistics.pstdev(numbers))
+    assert (acc.low, acc.high) == (min(numbers), max(numbers))
+
+
+def test_text_state_stays_bounded():
+    acc = pp.ColumnAccumulator(top_k=8, unique_limit=100)
+    for i in range(1000):
+        acc.add("common" if i % 2 else f"rare{i}")
+    assert len(acc.heavy) <= 8
+    assert acc.top() == ("common", pytest.approx(500, abs=8))
+    assert acc.unique == "100+" and not acc.seen
+
+
+def test_column_stats_reads_a_stream_once():
+    rows = ({"a": str(i), "b": "x" if i % 2 else ""} for i in range(10))
+    columns = pp.column_stats(rows)
+    assert columns.rows == 10
+    assert columns["a"].mean == 4.5
+    assert columns["b"].text_count == 5 and columns["b"].missing == 5
@@ -0,0 +1,47 @@
+from flat_cache import FlatCache
+
+
+def writer(n):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            f.write("x" * n)
+    return write
+
+
+def source(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_oversize_entry_is_kept_until_the_next_store(tmp_path):
+    cache = FlatCache(str(tmp_path / "cache"), max_bytes=1000)
+    big = source(tmp_path, "big.csv", "a\n1\n")
+    assert cache.store(big, "pure", ".pkl", writer(5000))
+    assert cache.lookup(big, "pure", ".pkl")
+
+    small = source(tmp_path, "small.csv", "b\n2\n")
+    cache.store(small, "pure", ".pkl", writer(100))
+    assert cache.lookup(big, "pure", ".pkl") is None
+    assert cache.lookup(small, "pure", ".pkl")
+
+
+def test_directories_in_the_cache_root_are_not_entries(tmp_path):
+    root = tmp_path / "cache"
+    cache = FlatCache(str(root), max_bytes=10)
+    (root / "incremental").mkdir()
+    (root / "incremental" / "state.pkl").write_bytes(b"x" * 100)
+    cache.store(source(tmp_path, "a.csv", "a\n1\n"), "pure", ".pkl", writer(50))
+    cache.store(source(tmp_path, "b.csv", "b\n2\n"), "pure", ".pkl", writer(50))
+    assert all(name.endswith((".pkl", ".json")) for _, _, files in cache.entries() for name in files)
+    assert (root / "incremental" / "state.pkl").exists()
+
+
+def test_incremental_state_is_outside_the_cache(tmp_path):
+    import os
+
+    from flat_cache import CACHE_DIR
+    from Pure_Python_Stats import state_file_for
+
+    state = os.path.normpath(state_file_for(str(tmp_path / "data.csv")))
+    assert not state.startswith(os.path.normpath(CACHE_DIR) + os.sep)
@@ -0,0 +1,60 @@
+import csv
+import pickle
+
+import pytest
+
+from Pure_Python_Stats import (AGG_FUNCS, ColumnarTable, group_data, infer_schema, load_data_loose,
+                               mmap_rows)
+
+ROWS = [
+    {"zip": "02134", "state": "MA", "flag": "True", "amount": "4854.0", "empty": "", "stats": '{"a": 1, "b": true}'},
+    {"zip": "2134", "state": "MA", "flag": "False", "amount": "12", "empty": "", "stats": '{"a": 2}'},
+    {"zip": "", "state": "", "flag": "True", "amount": "", "empty": "", "stats": ""},
+    {"zip": "02134", "state": "MA", "flag": "True", "amount": "4854.0", "empty": "", "stats": '{"a": 1.0, "c": "x"}'},
+    {"zip": "", "state": "NY", "flag": "", "amount": "3.50", "empty": "", "stats": '{"b": false}'},
+    {"zip": "10001", "state": "NY", "flag": "1", "amount": "abc", "empty": "", "stats": ""},
+]
+
+
+@pytest.fixture
+def messy_csv(tmp_path):
+    path = tmp_path / "messy.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(ROWS[0]))
+        writer.writeheader()
+        writer.writerows(ROWS)
+    return str(path)
+
+
+def tables(path):
+    schema, rows = infer_schema(load_data_loose(path))
+    table = ColumnarTable.from_rows(rows, schema)
+    yield "rows", table
+    yield "mmap", ColumnarTable.from_mmap(path, schema)
+    # what --cache reads back
+    yield "cached", ColumnarTable.from_state(pickle.loads(pickle.dumps(table.state())))
+
+
+@pytest.mark.parametrize("keys", [["zip"], ["state", "zip"], ["stats_a"], ["flag"], ["nope"]])
+def test_columnar_grouping_matches_rows(messy_csv, keys):
+    expected = group_data(load_data_loose(messy_csv), keys, AGG_FUNCS)
+    assert expected == group_data(mmap_rows(messy_csv), keys, AGG_FUNCS)
+    for label, table in tables(messy_csv):
+        assert group_data(table, keys, AGG_FUNCS) == expected, label
+
+
+def test_leading_zero_and_blank_keys_stay_apart(messy_csv):
+    for _, table in tables(messy_csv):
+        groups = group_data(table, ["zip"], ("mode", "count"))
+        assert [g["zip"] for g in groups] == ["02134", "2134", "", "10001"]
+        assert groups[0]["amount_mode"] == "4854.0"
+        assert groups[0]["flag_mode"] == "True"
+        assert groups[0]["empty_count"] == 0
+
+
+def test_formatted_numbers_need_no_originals():
+    rows = [{"zip": "%05d" % (i * 37), "price": "%.2f" % (i / 4), "n": i} for i in range(2000)]
+    table = ColumnarTable.from_rows(rows)
+    for name, col in table.columns.items():
+        assert col.originals == [], name
+        assert [col.original(i) for i in range(len(rows))] == [r[name] for r in rows], name
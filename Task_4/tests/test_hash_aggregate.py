@@ -0,0 +1,27 @@
+import random
+from collections import defaultdict
+from statistics import fmean
+
+from Pure_Python_Stats import AGG_FUNCS, HashAggregator, group_data
+
+rng = random.Random(5)
+ROWS = [{"team": rng.choice("ABC"), "score": str(rng.randint(0, 50)) if i % 7 else "",
+         "tag": rng.choice(["x", "y"])} for i in range(600)]
+
+
+def test_means_match_a_direct_computation():
+    scores = defaultdict(list)
+    for row in ROWS:
+        if row["score"]:
+            scores[row["team"]].append(float(row["score"]))
+    result = {g["team"]: g["score"] for g in group_data(ROWS, ["team"])}
+    assert result == {team: round(fmean(xs), 2) for team, xs in scores.items()}
+
+
+def test_merged_parts_equal_one_pass():
+    whole = HashAggregator(["team"], AGG_FUNCS).update(ROWS)
+    merged = HashAggregator(["team"], AGG_FUNCS)
+    for start in range(0, len(ROWS), 100):
+        merged.merge(HashAggregator(["team"], AGG_FUNCS).update(ROWS[start:start + 100]))
+    key = lambda g: g["team"]  # noqa: E731
+    assert sorted(merged.results(), key=key) == sorted(whole.results(), key=key)
@@ -0,0 +1,37 @@
+import pytest
+
+import Pure_Python_Stats as pp
+
+
+@pytest.fixture
+def state(tmp_path):
+    return str(tmp_path / "state.pkl")
+
+
+def test_unterminated_last_record_is_counted_and_reread(tmp_path, state):
+    path = tmp_path / "open.csv"
+    path.write_text("id,v\n1,a\n2,b\n3,c")
+    columns, note = pp.incremental_column_stats(str(path), state)
+    assert columns.rows == 3
+    assert "3 trailing bytes" in note
+
+    with open(path, "a") as f:
+        f.write("x\n4,d\n")
+    columns, note = pp.incremental_column_stats(str(path), state)
+    assert note.startswith("Resumed")
+    assert columns.rows == 4
+    assert set(columns["v"].heavy) == {"a", "b", "cx", "d"}
+
+
+def test_rewrite_in_the_middle_of_the_prefix_restarts(tmp_path, state):
+    path = tmp_path / "big.csv"
+    rows = [f"{i},{'x' * 50}\n" for i in range(20000)]
+    path.write_text("id,v\n" + "".join(rows))
+    pp.incremental_column_stats(str(path), state)
+
+    data = bytearray(path.read_bytes())
+    data[data.index(b"x", len(data) // 2)] = ord("y")
+    path.write_bytes(bytes(data) + b"20000,z\n")
+    columns, note = pp.incremental_column_stats(str(path), state)
+    assert note.startswith("Full pass (already-processed bytes changed)")
+    assert columns.rows == 20001
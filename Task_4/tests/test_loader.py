@@ -0,0 +1,35 @@
+import contextlib
+import io
+
+import pytest
+
+import Pure_Python_Stats as pp
+
+
+@pytest.fixture
+def nested_csv(tmp_path):
+    path = tmp_path / "nested.csv"
+    path.write_text('id,stats\n1,"{""bat"": {""runs"": 5}, ""team"": ""A""}"\n2,plain\n3,\n')
+    return path
+
+
+def test_loading_is_lazy(tmp_path):
+    rows = pp.load_data_loose(str(tmp_path / "missing.csv"))
+    with pytest.raises(FileNotFoundError):
+        next(rows)
+
+
+def test_rows_are_flattened_in_order(nested_csv):
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = list(pp.load_data_loose(str(nested_csv)))
+    assert rows == [
+        {"id": "1", "bat_runs": 5, "stats_team": "A"},
+        {"id": "2", "stats": "plain"},
+        {"id": "3", "stats": ""},
+    ]
+
+
+def test_detection_replays_the_rows_it_sampled(nested_csv):
+    found, rows = pp.detect_structured_columns(pp.read_rows(str(nested_csv)))
+    assert "stats" in found
+    assert [r["id"] for r in rows] == ["1", "2", "3"]
@@ -0,0 +1,12 @@
+import pytest
+
+from mmap_reader import MmapCSV
+
+
+def test_unknown_columns_are_named(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("team,score\nA,1\n")
+    with MmapCSV(str(path)) as reader:
+        assert list(reader.records(["score"])) == [["1"]]
+        with pytest.raises(ValueError, match="Unknown column\\(s\\): x, y"):
+            list(reader.records(["score", "x", "y"]))
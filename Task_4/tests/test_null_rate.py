@@ -0,0 +1,58 @@
+import contextlib
+import io
+import pickle
+
+import pytest
+
+import Pure_Python_Stats as pp
+
+CSV = (
+    "id,team,stats\n"
+    '1,A,"{""bat"": {""runs"": 10}}"\n'
+    '2,,"{""bat"": {""runs"": 20, ""sr"": 1.5}}"\n'
+    "3,B,\n"
+)
+
+
+@pytest.fixture
+def sparse_csv(tmp_path):
+    path = tmp_path / "sparse.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+def null_rates(columns):
+    return {name: round(acc.null_rate, 2) for name, acc in columns.items()}
+
+
+def test_every_mode_counts_absent_keys_as_missing(sparse_csv, tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        schema, rows = pp.infer_schema(pp.load_data_loose(sparse_csv))
+        rows = list(rows)
+        table = pp.ColumnarTable.from_rows(rows, schema)
+        modes = {
+            "rows": pp.column_stats(rows, schema),
+            "mmap": pp.mmap_column_stats(sparse_csv, schema),
+            "chunks": pp.merge_column_stats(
+                pp.summarize_chunk(sparse_csv, a, b, ["id", "team", "stats"], schema)
+                for a, b in pp.split_records(sparse_csv, 3)[1]),
+            "incremental": pp.incremental_column_stats(sparse_csv, str(tmp_path / "state.pkl"))[0],
+            "columnar": pp.table_column_stats(table),
+            "cached": pp.table_column_stats(pp.ColumnarTable.from_state(pickle.loads(pickle.dumps(table.state())))),
+        }
+
+    expected = {"id": 0.0, "team": 33.33, "bat_runs": 33.33, "bat_sr": 66.67}
+    for mode, columns in modes.items():
+        assert {k: v for k, v in null_rates(columns).items() if k in expected} == expected, mode
+        assert columns.rows == 3, mode
+
+
+def test_incremental_resume_keeps_the_row_count(sparse_csv, tmp_path):
+    state = str(tmp_path / "state.pkl")
+    pp.incremental_column_stats(sparse_csv, state)
+    with open(sparse_csv, "a") as f:
+        f.write("4,C,\n")
+    columns, note = pp.incremental_column_stats(sparse_csv, state)
+    assert note.startswith("Resumed")
+    assert columns.rows == 4
+    assert round(columns["bat_sr"].null_rate, 2) == 75.0
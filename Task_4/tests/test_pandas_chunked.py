@@ -0,0 +1,42 @@
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip("pandas")
+import Pandas_pyhton_Stats as pst  # noqa: E402
+
+ROWS = ([f'{i},{"AB"[i % 2]},"{{""runs"": {i}}}"' for i in range(1, 9)]
+        + ["9,A,oops", '10,B,"{""runs"": 10}"'])
+
+
+@pytest.fixture
+def late_bad_csv(tmp_path):
+    path = tmp_path / "late_bad.csv"
+    path.write_text("id,team,stats\n" + "\n".join(ROWS) + "\n")
+    return str(path)
+
+
+def test_later_chunks_unpack_what_the_first_chunk_unpacked(late_bad_csv):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = pst.summarize_file(late_bad_csv, group_by=["team"], chunksize=4)
+    columns = {r["column"]: r for r in result["columns"]}
+    assert "stats" not in columns
+    assert columns["stats_runs"]["count"] == 9
+    assert result["groups"] == [{"team": "A", "id": 5.8, "stats_runs": 5.0},
+                                {"team": "B", "id": 5.2, "stats_runs": 5.2}]
+
+
+def test_chunked_stats_match_one_read(tmp_path):
+    path = tmp_path / "clean.csv"
+    path.write_text("id,team,score\n" + "\n".join(f"{i},{'ABC'[i % 3]},{i * 1.5 if i % 4 else ''}"
+                                                   for i in range(50)) + "\n")
+    with contextlib.redirect_stdout(io.StringIO()):
+        whole = pst.summarize_file(str(path), group_by=["team"])
+        chunked = pst.summarize_file(str(path), group_by=["team"], chunksize=7)
+    whole_columns = {r["column"]: r for r in whole["columns"]}
+    for record in chunked["columns"]:
+        assert record == pytest.approx(whole_columns[record["column"]])
+    assert len(chunked["groups"]) == len(whole["groups"]) == 3
+    for got, want in zip(chunked["groups"], whole["groups"]):
+        assert got == pytest.approx(want)
@@ -0,0 +1,70 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+import Pure_Python_Stats as pp
+
+
+def quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def summary(columns):
+    return {
+        name: (acc.count, pytest.approx(acc.mean), pytest.approx(acc.std), acc.low, acc.high,
+               acc.text_count, acc.missing, acc.heavy, acc.unique)
+        for name, acc in columns.items()
+    }
+
+
+@pytest.fixture
+def wide_csv(tmp_path):
+    rng = random.Random(3)
+    path = tmp_path / "wide.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write("id,team,score,note,stats\r\n")
+        for i in range(3000):
+            score = "" if i % 17 == 0 else f"{rng.gauss(50, 10):.3f}"
+            note = '"two\r\nlines, quoted"' if i % 5 == 0 else rng.choice(["a", "b", "c"])
+            stats = '"{""runs"": %d}"' % rng.randint(0, 99) if i % 3 else ""
+            f.write(f"{i},{rng.choice('ABC')},{score},{note},{stats}\r\n")
+    return str(path)
+
+
+def test_workers_match_the_serial_pass(wide_csv, monkeypatch):
+    monkeypatch.setattr(pp, "CHUNK_BYTES", 8 * 1024)  # force many chunks
+    schema, rows = quiet(pp.infer_schema, pp.load_data_loose(wide_csv))
+    serial = quiet(pp.column_stats, rows, schema)
+    parallel = quiet(pp.parallel_column_stats, wide_csv, 2, schema)
+    assert list(parallel) == list(serial)
+    assert summary(parallel) == summary(serial)
+
+
+def test_quoted_crlf_is_kept_on_every_path(wide_csv):
+    serial = quiet(pp.column_stats, pp.load_data_loose(wide_csv))
+    chunks = pp.merge_column_stats(
+        pp.summarize_chunk(wide_csv, a, b, ["id", "team", "score", "note", "stats"])
+        for a, b in pp.split_records(wide_csv, 4)[1])
+    mmap = pp.mmap_column_stats(wide_csv)
+    for columns in (serial, chunks, mmap):
+        assert "two\r\nlines, quoted" in columns["note"].heavy
+        assert columns["note"].heavy == serial["note"].heavy
+
+
+def test_accumulator_merge_equals_one_pass():
+    rng = random.Random(7)
+    values = [str(rng.uniform(-5, 5)) for _ in range(1000)] + ["x", "y", "", "x"]
+    rng.shuffle(values)
+    whole = pp.ColumnAccumulator()
+    for v in values:
+        whole.add(v)
+    parts = [pp.ColumnAccumulator() for _ in range(4)]
+    for i, v in enumerate(values):
+        parts[i % 4].add(v)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert summary({"c": merged}) == summary({"c": whole})
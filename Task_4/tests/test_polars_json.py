@@ -0,0 +1,37 @@
+import contextlib
+import io
+
+import pytest
+
+pl = pytest.importorskip("polars")
+import Polars_python_Stats as ps  # noqa: E402
+
+CELLS = (['{"a": 1, "s": {"q": 2}}'] * (ps.JSON_INFER_ROWS + 500)
+         + ["{'a': 2, 'late': 'x'}", '{"a": "oops", "s": 5}', '{"a": 3, bad', None,
+            '{"a": 4, "s": {"q": 9, "r": 1}}'])
+
+
+@pytest.fixture
+def frame():
+    return pl.LazyFrame({"id": range(len(CELLS)), "j": CELLS})
+
+
+def test_keys_past_the_sample_are_kept(frame):
+    dtype = ps.infer_struct_dtype(frame, "j")
+    assert ps.field_names(dtype) == {"a", "s", "q", "r", "late"}
+
+
+def test_bad_cells_fall_back_one_by_one(frame):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = ps.unpack_json_columns(frame, ["j"]).collect()
+    tail = df.tail(6).to_dicts()
+    assert [r["j_a"] for r in tail] == [1, 2, None, None, None, 4]
+    assert tail[1]["j_late"] == "x"
+    assert tail[5]["j_s"] == {"q": 9, "r": 1}
+    assert df["j_a"].null_count() == 3
+
+
+def test_decode_batch_isolates_failing_cells():
+    dtype = pl.Struct({"a": pl.Int64})
+    texts = pl.Series("t", ['{"a": 1}', '{"a": [1]}', '{"a": 3}', "{'a': 4}"])
+    assert ps.decode_batch(texts, dtype).struct.field("a").to_list() == [1, None, 3, 4]
@@ -0,0 +1,35 @@
+import contextlib
+import io
+
+import pytest
+
+pl = pytest.importorskip("polars")
+import Polars_python_Stats as ps  # noqa: E402
+
+
+@pytest.fixture
+def team_csv(tmp_path):
+    path = tmp_path / "teams.csv"
+    lines = ["id,team,stats"] + [f'{i},{"AB"[i % 2]},"{{""runs"": {i * 10}}}"' for i in range(1, 7)]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_loading_and_unpacking_stay_lazy(team_csv):
+    with contextlib.redirect_stdout(io.StringIO()):
+        lf = ps.load_csv(team_csv)
+        json_cols = ps.detect_json_columns(lf)
+        unpacked = ps.unpack_json_columns(lf, json_cols)
+    assert isinstance(lf, pl.LazyFrame) and isinstance(unpacked, pl.LazyFrame)
+    assert list(json_cols) == ["stats"]
+    assert ps.collect(unpacked).columns == ["id", "team", "stats_runs"]
+
+
+def test_summarize_file_streams_the_plan(team_csv):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = ps.summarize_file(team_csv, group_by=["team"])
+    assert result["rows"] == 6
+    runs = next(r for r in result["columns"] if r["column"] == "stats_runs")
+    assert (runs["count"], runs["mean"], runs["min"], runs["max"]) == (6, 35.0, 10, 60)
+    assert result["groups"] == [{"team": "A", "id": 4.0, "stats_runs": 40.0},
+                                {"team": "B", "id": 3.0, "stats_runs": 30.0}]
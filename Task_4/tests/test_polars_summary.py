@@ -0,0 +1,40 @@
+import pytest
+
+pl = pytest.importorskip("polars")
+import Polars_python_Stats as ps  # noqa: E402
+
+FRAME = pl.DataFrame({
+    "n": [1.5, None, 3.0, 3.0, -2.0],
+    "k": [1, 2, 2, 2, None],
+    "s": ["a", "b", None, "b", "c"],
+})
+
+
+def per_column(df):
+    """What the old loop computed, one Series at a time."""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        vc = s.drop_nulls().value_counts(sort=True).row(0)
+        stats = {"count": s.count(), "unique": s.drop_nulls().n_unique(), "top": vc[0], "top_count": vc[1]}
+        if s.dtype.is_numeric():
+            stats.update(mean=s.mean(), std=s.std(), min=s.min(), max=s.max())
+        out[col] = stats
+    return out
+
+
+def test_one_query_matches_per_column_loop():
+    n_rows, records = ps.column_stats(FRAME)
+    assert n_rows == 5
+    expected = per_column(FRAME)
+    for record in records:
+        want = expected[record["column"]]
+        assert {k: record[k] for k in want} == pytest.approx(want)
+        assert record["type"] == ("numeric" if "mean" in want else "text")
+
+
+def test_approx_adds_quantiles():
+    _, records = ps.column_stats(FRAME, approx=True)
+    k = next(r for r in records if r["column"] == "k")
+    assert k["unique"] == 2 and k["unique_approx"]
+    assert k["p50"] == 2
@@ -0,0 +1,30 @@
+import pytest
+
+import Pure_Python_Stats as pp
+
+
+@pytest.mark.parametrize("values, kind", [
+    (["1", "2", 3], "int"),
+    (["1", "2.5"], "float"),
+    (["1e3"], "float"),
+    (["a", "b"], "text"),
+    (["1", "b"], "mixed"),
+])
+def test_sniff_kind(values, kind):
+    assert pp.sniff_kind(values) == kind
+
+
+def test_text_columns_skip_float_only_for_impossible_leads():
+    assert pp.as_number("abc", "text") is None
+    assert pp.as_number(" 12", "text") == 12.0
+    assert pp.as_number("nan", "text") != pp.as_number("nan", "text")  # still parsed: NaN
+    assert pp.as_number("12", None) == 12.0
+
+
+def test_schema_sample_is_replayed_and_contradictions_demote():
+    rows = [{"n": str(i)} for i in range(5)] + [{"n": "oops"}]
+    schema, stream = pp.infer_schema(rows, sample_size=3)
+    assert schema == {"n": "int"}
+    columns = pp.column_stats(stream, schema)
+    assert columns.rows == 6
+    assert columns["n"].kind == "mixed" and columns["n"].text_count == 1
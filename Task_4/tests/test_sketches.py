@@ -0,0 +1,27 @@
+import pytest
+
+from sketches import KLL, HyperLogLog
+
+
+def test_add_hashes_matches_add_hash_near_powers_of_two():
+    np = pytest.importorskip("numpy")
+    p = 14
+    # low bits just below, at and above powers of two, where float log2 rounds up
+    rests = [0, 1, 2, 3] + [v for b in range(2, 50) for v in ((1 << b) - 1, 1 << b, (1 << b) + 1)]
+    hashes = [(i % (1 << p)) << (64 - p) | r for i, r in enumerate(rests) if r < 1 << (64 - p)]
+
+    one = HyperLogLog(p)
+    for h in hashes:
+        one.add_hash(h)
+    bulk = HyperLogLog(p)
+    bulk.add_hashes(np.array(hashes, dtype=np.uint64))
+    assert bulk.registers == one.registers
+
+
+def test_kll_update_is_bounded_and_accurate():
+    sketch = KLL(k=200)
+    sketch.update(iter(range(100000)), batch=1000)
+    assert sketch.n == 100000
+    assert sum(map(len, sketch.compactors)) < sketch.max_size
+    p50, p90 = sketch.quantiles([0.5, 0.9])
+    assert abs(p50 - 50000) < 3000 and abs(p90 - 90000) < 3000